@@ -17,6 +17,33 @@ class Settings(BaseSettings):
     max_upload_size_mb: int = Field(25, alias="MAX_UPLOAD_SIZE_MB")
     storage_bucket: Optional[str] = Field(None, alias="STORAGE_BUCKET")
     cors_origins: str = Field("http://localhost:8888", alias="CORS_ORIGINS")
+    document_store_path: str = Field("/tmp/rag-documents.sqlite3", alias="DOCUMENT_STORE_PATH")
+    upsert_batch_max_vectors: int = Field(100, alias="UPSERT_BATCH_MAX_VECTORS")
+    upsert_batch_max_bytes: int = Field(2 * 1024 * 1024, alias="UPSERT_BATCH_MAX_BYTES")
+    upsert_concurrency: int = Field(4, alias="UPSERT_CONCURRENCY")
+    answer_cache_enabled: bool = Field(True, alias="ANSWER_CACHE_ENABLED")
+    answer_cache_max_entries: int = Field(1024, alias="ANSWER_CACHE_MAX_ENTRIES")
+    answer_cache_ttl_seconds: float = Field(3600, alias="ANSWER_CACHE_TTL_SECONDS")
+    answer_cache_semantic_threshold: float = Field(0.95, alias="ANSWER_CACHE_SEMANTIC_THRESHOLD")
+    batch_max_questions: int = Field(5000, alias="BATCH_MAX_QUESTIONS")
+    batch_concurrency: int = Field(8, alias="BATCH_CONCURRENCY")
+    openai_requests_per_minute: int = Field(500, alias="OPENAI_REQUESTS_PER_MINUTE")
+    openai_tokens_per_minute: int = Field(200000, alias="OPENAI_TOKENS_PER_MINUTE")
+    openai_max_concurrency: int = Field(16, alias="OPENAI_MAX_CONCURRENCY")
+    openai_max_retries: int = Field(4, alias="OPENAI_MAX_RETRIES")
+    hedging_enabled: bool = Field(False, alias="HEDGING_ENABLED")
+    hedge_percentile: float = Field(95.0, alias="HEDGE_PERCENTILE")
+    hedge_min_delay_ms: int = Field(50, alias="HEDGE_MIN_DELAY_MS")
+    hedge_max_delay_ms: int = Field(2000, alias="HEDGE_MAX_DELAY_MS")
+    circuit_failure_threshold: int = Field(5, alias="CIRCUIT_FAILURE_THRESHOLD")
+    circuit_reset_seconds: float = Field(30.0, alias="CIRCUIT_RESET_SECONDS")
+    metrics_trace_memory: bool = Field(False, alias="METRICS_TRACE_MEMORY")
+    summary_index_enabled: bool = Field(False, alias="SUMMARY_INDEX_ENABLED")
+    summary_pages_per_section: int = Field(5, alias="SUMMARY_PAGES_PER_SECTION")
+    summary_model: str = Field("gpt-4o-mini", alias="SUMMARY_MODEL")
+    extractive_answers_enabled: bool = Field(False, alias="EXTRACTIVE_ANSWERS_ENABLED")
+    extractive_confidence_threshold: float = Field(0.8, alias="EXTRACTIVE_CONFIDENCE_THRESHOLD")
+    warmup_on_startup: bool = Field(False, alias="WARMUP_ON_STARTUP")
 
     class Config:
         env_file = ".env"
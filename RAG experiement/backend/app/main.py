@@ -1,15 +1,32 @@
-from fastapi import FastAPI
+import time
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
 from .routers import uploads, chat
 from .config import get_settings
+from .services import metrics
 
 settings = get_settings()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.warmup_on_startup:
+        from .services.warmup import warm_up
+
+        await run_in_threadpool(warm_up)
+    yield
+
+
 app = FastAPI(
     title="RAG Experiment API",
     version="0.1.0",
     description="Backend service for uploading PDFs and running GPT-powered retrieval augmented question answering.",
+    lifespan=lifespan,
 )
 
 # Parse CORS origins from comma-separated string and drop empties
@@ -31,6 +48,35 @@ app.include_router(uploads.router, prefix="/api/uploads", tags=["uploads"])
 app.include_router(chat.router, prefix="/api/chat", tags=["chat"])
 
 
+@app.middleware("http")
+async def record_request_timings(request: Request, call_next):
+    token = metrics.start_request_timings()
+    started = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        timings = metrics.finish_request_timings(token)
+    elapsed = time.perf_counter() - started
+
+    route = request.scope.get("route")
+    path = getattr(route, "path", "unmatched")
+    metrics.observe(
+        "http_request_duration_seconds",
+        elapsed,
+        method=request.method,
+        route=path,
+        status=response.status_code,
+    )
+    header = metrics.server_timing_header(timings + [("total", elapsed)])
+    response.headers["Server-Timing"] = header
+    return response
+
+
 @app.get("/healthz")
 async def healthcheck():
     return {"status": "ok"}
+
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def prometheus_metrics() -> PlainTextResponse:
+    return PlainTextResponse(metrics.render_prometheus(), media_type="text/plain; version=0.0.4")
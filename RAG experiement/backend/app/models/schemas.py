@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Any, Optional
+from typing import Any, Literal, Optional
 from uuid import UUID
 
 from pydantic import BaseModel, Field
@@ -20,6 +20,14 @@ class ChatRequest(BaseModel):
     )
 
 
+class BatchChatRequest(BaseModel):
+    questions: list[str] = Field(..., min_length=1, description="Questions to answer over the same documents.")
+    session_id: Optional[UUID] = Field(None, description="Conversation session identifier.")
+    document_ids: Optional[list[UUID]] = Field(
+        None, description="Limit retrieval to a subset of previously uploaded documents."
+    )
+
+
 class Citation(BaseModel):
     document_id: UUID
     page: int
@@ -33,6 +41,21 @@ class ChatResponse(BaseModel):
     citations: list[Citation]
     created_at: datetime
     usage: Optional[dict[str, Any]] = None
+    degraded: bool = Field(
+        False, description="True when a dependency was unavailable and the answer is partial."
+    )
+    answer_path: Literal["generated", "summary", "extractive", "degraded"] = Field(
+        "generated",
+        description="How the answer was produced: generated from retrieved chunks, generated from "
+        "document summaries, extracted verbatim from a chunk without a completion call, or degraded.",
+    )
+
+
+class BatchChatResult(BaseModel):
+    index: int = Field(..., description="Position of the question in the request.")
+    question: str
+    response: Optional[ChatResponse] = None
+    error: Optional[str] = None
 
 
 class ErrorResponse(BaseModel):
@@ -1,9 +1,13 @@
 from __future__ import annotations
 
+from typing import Iterator
+
 from fastapi import APIRouter, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 
-from ..models.schemas import ChatRequest, ChatResponse
-from ..services.qa import answer_question
+from ..models.schemas import BatchChatRequest, BatchChatResult, ChatRequest, ChatResponse
+from ..services.qa import answer_question, answer_questions
 
 router = APIRouter()
 
@@ -15,8 +19,38 @@ router = APIRouter()
     summary="Ask a question over previously ingested documents",
 )
 async def chat_with_documents(payload: ChatRequest) -> ChatResponse:
-    return answer_question(
+    # Run in the threadpool so concurrent identical questions can coalesce
+    # instead of serialising on the event loop.
+    return await run_in_threadpool(
+        answer_question,
         question=payload.question,
         document_ids=payload.document_ids,
         session_id=payload.session_id,
     )
+
+
+@router.post(
+    "/qa/batch",
+    status_code=status.HTTP_200_OK,
+    summary="Ask many questions over the same documents, streamed back as NDJSON",
+    response_class=StreamingResponse,
+)
+async def chat_batch(payload: BatchChatRequest) -> StreamingResponse:
+    results = answer_questions(
+        questions=payload.questions,
+        document_ids=payload.document_ids,
+        session_id=payload.session_id,
+    )
+
+    def ndjson() -> Iterator[str]:
+        # Sync iterator: Starlette drains it in the threadpool.
+        for index, response, error in results:
+            result = BatchChatResult(
+                index=index,
+                question=payload.questions[index],
+                response=response,
+                error=error,
+            )
+            yield result.model_dump_json() + "\n"
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
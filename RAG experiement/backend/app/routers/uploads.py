@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from fastapi import APIRouter, File, UploadFile, status, HTTPException
+from fastapi.concurrency import run_in_threadpool
 
 from ..models.schemas import UploadResponse
 from ..services.ingestion import ingest_pdf
@@ -16,7 +17,8 @@ router = APIRouter()
 )
 async def upload_pdf(file: UploadFile = File(...)) -> UploadResponse:
     try:
-        document_id = ingest_pdf(file)
+        # Extraction and embedding are blocking; keep them off the event loop.
+        document_id = await run_in_threadpool(ingest_pdf, file)
         return UploadResponse(document_id=document_id, message="PDF ingested successfully.")
     except HTTPException:
         # Re-raise HTTPExceptions from the ingestion service
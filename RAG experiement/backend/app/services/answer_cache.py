@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+import math
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Hashable, Iterable, Optional, Sequence
+from uuid import UUID
+
+from ..config import get_settings
+from ..models.schemas import ChatResponse
+
+_cache: Optional[AnswerCache] = None
+_cache_lock = threading.Lock()
+
+DocumentSetKey = tuple[str, ...]
+
+
+def normalize_question(question: str) -> str:
+    collapsed = re.sub(r"\s+", " ", question).strip().lower()
+    return collapsed.rstrip("?!. ")
+
+
+def document_set_key(document_ids: Iterable[UUID | str]) -> DocumentSetKey:
+    return tuple(sorted({str(document_id) for document_id in document_ids}))
+
+
+def _norm(vector: Sequence[float]) -> float:
+    return math.sqrt(sum(value * value for value in vector))
+
+
+def _cosine(left: Sequence[float], left_norm: float, right: Sequence[float], right_norm: float) -> float:
+    if not left_norm or not right_norm:
+        return 0.0
+    return sum(a * b for a, b in zip(left, right)) / (left_norm * right_norm)
+
+
+@dataclass
+class _Entry:
+    response: ChatResponse
+    versions: tuple[int, ...]
+    expires_at: float
+    embedding: Optional[list[float]] = None
+    embedding_norm: float = 0.0
+
+
+class AnswerCache:
+    """Two-tier answer cache keyed by (document set, normalized question).
+
+    The exact tier is an LRU over normalized questions. The semantic tier scans
+    entries for the same document set and returns the closest one whose query
+    embedding clears the similarity threshold. Entries remember the ingest
+    version of every document in their set, so re-ingesting a document
+    invalidates them without a scan.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float, semantic_threshold: float) -> None:
+        self.max_entries = max(max_entries, 1)
+        self.ttl_seconds = ttl_seconds
+        self.semantic_threshold = semantic_threshold
+        self._entries: OrderedDict[tuple[DocumentSetKey, str], _Entry] = OrderedDict()
+        self._by_document_set: dict[DocumentSetKey, set[str]] = {}
+        self._versions: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def snapshot(self, doc_key: DocumentSetKey) -> tuple[int, ...]:
+        with self._lock:
+            return tuple(self._versions.get(document_id, 0) for document_id in doc_key)
+
+    def _is_live(self, doc_key: DocumentSetKey, entry: _Entry, now: float) -> bool:
+        if entry.expires_at < now:
+            return False
+        current = tuple(self._versions.get(document_id, 0) for document_id in doc_key)
+        return current == entry.versions
+
+    def _drop(self, key: tuple[DocumentSetKey, str]) -> None:
+        self._entries.pop(key, None)
+        questions = self._by_document_set.get(key[0])
+        if questions is not None:
+            questions.discard(key[1])
+            if not questions:
+                del self._by_document_set[key[0]]
+
+    def get_exact(self, doc_key: DocumentSetKey, normalized: str) -> Optional[ChatResponse]:
+        key = (doc_key, normalized)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if not self._is_live(doc_key, entry, time.monotonic()):
+                self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry.response
+
+    def get_semantic(self, doc_key: DocumentSetKey, embedding: Sequence[float]) -> Optional[ChatResponse]:
+        query_norm = _norm(embedding)
+        now = time.monotonic()
+        best_key: Optional[tuple[DocumentSetKey, str]] = None
+        best_score = self.semantic_threshold
+        with self._lock:
+            for question in list(self._by_document_set.get(doc_key, ())):
+                key = (doc_key, question)
+                entry = self._entries[key]
+                if not self._is_live(doc_key, entry, now):
+                    self._drop(key)
+                    continue
+                if entry.embedding is None:
+                    continue
+                score = _cosine(embedding, query_norm, entry.embedding, entry.embedding_norm)
+                if score >= best_score:
+                    best_key, best_score = key, score
+            if best_key is None:
+                return None
+            self._entries.move_to_end(best_key)
+            return self._entries[best_key].response
+
+    def put(
+        self,
+        doc_key: DocumentSetKey,
+        normalized: str,
+        response: ChatResponse,
+        versions: tuple[int, ...],
+        embedding: Optional[list[float]] = None,
+    ) -> None:
+        entry = _Entry(
+            response=response,
+            versions=versions,
+            expires_at=time.monotonic() + self.ttl_seconds,
+            embedding=embedding,
+            embedding_norm=_norm(embedding) if embedding else 0.0,
+        )
+        key = (doc_key, normalized)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            self._by_document_set.setdefault(doc_key, set()).add(normalized)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+
+    def invalidate_document(self, document_id: UUID | str) -> None:
+        """Drop answers for every document set containing ``document_id``, lazily via its version."""
+        with self._lock:
+            document_key = str(document_id)
+            self._versions[document_key] = self._versions.get(document_key, 0) + 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_document_set.clear()
+
+
+@dataclass
+class _Call:
+    event: threading.Event = field(default_factory=threading.Event)
+    result: Any = None
+    error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Coalesce concurrent calls with the same key into a single execution."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+
+def get_answer_cache() -> AnswerCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = AnswerCache(
+                    max_entries=get_settings().answer_cache_max_entries,
+                    ttl_seconds=get_settings().answer_cache_ttl_seconds,
+                    semantic_threshold=get_settings().answer_cache_semantic_threshold,
+                )
+    return _cache
+
+
+def invalidate_document(document_id: UUID | str) -> None:
+    """Called after a document is (re-)ingested.
+
+    Document ids are derived from the file's content, so uploading or bulk
+    ingesting the same PDF again reuses its id and this call retires answers
+    built on the old chunks. The cache lives in one process: a re-ingest run
+    by ``bulk_ingest.py`` only reaches the server's cache through the TTL.
+    """
+    get_answer_cache().invalidate_document(document_id)
@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Optional, Sequence
+from uuid import UUID
+
+from ..config import get_settings
+
+_connection: Optional[sqlite3.Connection] = None
+_lock = threading.Lock()
+
+# SQLite caps the number of bound parameters per statement (999 on older builds).
+_MAX_LOOKUP_PARAMS = 900
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS chunks (
+    id TEXT PRIMARY KEY,
+    document_id TEXT NOT NULL,
+    chunk_index INTEGER NOT NULL,
+    page INTEGER NOT NULL,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS chunks_document_id ON chunks (document_id);
+CREATE TABLE IF NOT EXISTS summaries (
+    id TEXT PRIMARY KEY,
+    document_id TEXT NOT NULL,
+    level INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    first_page INTEGER NOT NULL,
+    last_page INTEGER NOT NULL,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS summaries_document_id ON summaries (document_id);
+"""
+
+
+def chunk_id(document_id: UUID | str, idx: int) -> str:
+    return f"{document_id}:{idx}"
+
+
+def get_connection() -> sqlite3.Connection:
+    global _connection
+    if _connection is not None:
+        return _connection
+
+    with _lock:
+        if _connection is None:
+            path = Path(get_settings().document_store_path)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(str(path), check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(_SCHEMA)
+            _connection = connection
+    return _connection
+
+
+def put_chunks(
+    document_id: UUID,
+    chunks: Sequence[str],
+    pages: Sequence[int],
+) -> list[str]:
+    if len(chunks) != len(pages):
+        raise ValueError("Page metadata must align with chunks.")
+
+    rows = [
+        (chunk_id(document_id, idx), str(document_id), idx, page, chunk)
+        for idx, (chunk, page) in enumerate(zip(chunks, pages))
+    ]
+    connection = get_connection()
+    with _lock, connection:
+        connection.executemany(
+            "INSERT OR REPLACE INTO chunks (id, document_id, chunk_index, page, text) "
+            "VALUES (?, ?, ?, ?, ?)",
+            rows,
+        )
+    return [row[0] for row in rows]
+
+
+def get_chunks(ids: Sequence[str]) -> dict[str, dict]:
+    """Fetch stored chunks for the given vector ids in as few queries as possible."""
+    if not ids:
+        return {}
+
+    unique_ids = list(dict.fromkeys(ids))
+    connection = get_connection()
+    found: dict[str, dict] = {}
+    with _lock:
+        for start in range(0, len(unique_ids), _MAX_LOOKUP_PARAMS):
+            window = unique_ids[start : start + _MAX_LOOKUP_PARAMS]
+            placeholders = ",".join("?" * len(window))
+            rows = connection.execute(
+                "SELECT id, document_id, chunk_index, page, text FROM chunks "
+                f"WHERE id IN ({placeholders})",
+                window,
+            ).fetchall()
+            for row_id, document_id, chunk_index, page, text in rows:
+                found[row_id] = {
+                    "document_id": document_id,
+                    "chunk_index": chunk_index,
+                    "page": page,
+                    "text": text,
+                }
+    return found
+
+
+def put_summaries(document_id: UUID | str, summaries: Sequence[dict]) -> None:
+    rows = [
+        (
+            summary["id"],
+            str(document_id),
+            summary["level"],
+            summary["position"],
+            summary["first_page"],
+            summary["last_page"],
+            summary["text"],
+        )
+        for summary in summaries
+    ]
+    connection = get_connection()
+    with _lock, connection:
+        connection.executemany(
+            "INSERT OR REPLACE INTO summaries "
+            "(id, document_id, level, position, first_page, last_page, text) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+
+
+def get_summaries(ids: Sequence[str]) -> dict[str, dict]:
+    if not ids:
+        return {}
+
+    unique_ids = list(dict.fromkeys(ids))
+    connection = get_connection()
+    found: dict[str, dict] = {}
+    with _lock:
+        for start in range(0, len(unique_ids), _MAX_LOOKUP_PARAMS):
+            window = unique_ids[start : start + _MAX_LOOKUP_PARAMS]
+            placeholders = ",".join("?" * len(window))
+            rows = connection.execute(
+                "SELECT id, document_id, level, position, first_page, last_page, text FROM summaries "
+                f"WHERE id IN ({placeholders})",
+                window,
+            ).fetchall()
+            for row_id, document_id, level, position, first_page, last_page, text in rows:
+                found[row_id] = {
+                    "document_id": document_id,
+                    "level": level,
+                    "position": position,
+                    "first_page": first_page,
+                    "last_page": last_page,
+                    "text": text,
+                }
+    return found
+
+
+def has_document(document_id: UUID | str) -> bool:
+    connection = get_connection()
+    with _lock:
+        row = connection.execute(
+            "SELECT 1 FROM chunks WHERE document_id = ? LIMIT 1", (str(document_id),)
+        ).fetchone()
+    return row is not None
+
+
+def delete_document(document_id: UUID | str) -> None:
+    connection = get_connection()
+    with _lock, connection:
+        connection.execute("DELETE FROM chunks WHERE document_id = ?", (str(document_id),))
+        connection.execute("DELETE FROM summaries WHERE document_id = ?", (str(document_id),))
@@ -2,28 +2,47 @@ from __future__ import annotations
 
 from typing import Sequence
 
-from .openai_client import get_client
 from ..config import get_settings
+from . import metrics, resilience
+from .openai_client import create_embeddings
+from .scheduler import Priority
 
-_settings = get_settings()
+# OpenAI accepts at most 2048 inputs per embeddings request.
+MAX_INPUTS_PER_REQUEST = 2048
 
 
-def embed_chunks(chunks: Sequence[str]) -> list[list[float]]:
+def embed_chunks(
+    chunks: Sequence[str],
+    priority: Priority = Priority.BACKGROUND,
+) -> list[list[float]]:
     if not chunks:
         return []
 
-    client = get_client()
-    response = client.embeddings.create(
-        input=list(chunks),
-        model=_settings.embedding_model,
-    )
-    return [item.embedding for item in response.data]
+    embeddings: list[list[float]] = []
+    for start in range(0, len(chunks), MAX_INPUTS_PER_REQUEST):
+        window = chunks[start : start + MAX_INPUTS_PER_REQUEST]
+        response = resilience.call(
+            "openai_embeddings",
+            lambda: create_embeddings(window, model=get_settings().embedding_model, priority=priority),
+        )
+        embeddings.extend(item.embedding for item in response.data)
+    return embeddings
+
+
+def embed_queries(queries: Sequence[str]) -> list[list[float]]:
+    with metrics.span("embed_query"):
+        return embed_chunks(queries, priority=Priority.INTERACTIVE)
 
 
 def embed_query(query: str) -> list[float]:
-    client = get_client()
-    response = client.embeddings.create(
-        input=[query],
-        model=_settings.embedding_model,
-    )
+    with metrics.span("embed_query"):
+        response = resilience.call(
+            "openai_embeddings",
+            lambda: create_embeddings(
+                [query],
+                model=get_settings().embedding_model,
+                priority=Priority.INTERACTIVE,
+            ),
+            hedge=True,
+        )
     return response.data[0].embedding
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+from ..config import get_settings
+
+# Only the best few chunks are scanned; a verbatim answer further down is rare.
+_CANDIDATE_CHUNKS = 3
+# Weight of lexical overlap against the chunk's retrieval score.
+_LEXICAL_WEIGHT = 0.75
+# A runner-up this close to the best sentence makes the lookup ambiguous.
+_AMBIGUITY_MARGIN = 0.05
+# The answer must add at least this many content words beyond the question itself.
+_MIN_NOVEL_TERMS = 2
+
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+")
+_TOKEN = re.compile(r"[a-z0-9]+")
+_SUFFIXES = ("ing", "es", "ed", "s")
+_STOPWORDS = frozenset(
+    """a about after all also an and any are as at be been by can could did do does for from had has have
+    how i if in into is it its long many may much must no not of on or our shall should so than that the their
+    them then there these they this those to under was we were what when where which who whom whose why will
+    with within would you your""".split()
+)
+
+
+@dataclass
+class ExtractiveAnswer:
+    sentence: str
+    match_index: int
+    confidence: float
+
+
+def _stem(token: str) -> str:
+    for suffix in _SUFFIXES:
+        if len(token) > len(suffix) + 3 and token.endswith(suffix):
+            return token[: -len(suffix)]
+    return token
+
+
+def content_terms(text: str) -> set[str]:
+    return {_stem(token) for token in _TOKEN.findall(text.lower()) if token not in _STOPWORDS}
+
+
+def split_sentences(text: str) -> list[str]:
+    return [sentence.strip() for sentence in _SENTENCE_BOUNDARY.split(text) if sentence.strip()]
+
+
+def score_sentence(question_terms: set[str], sentence: str, relative_score: float) -> float:
+    """Blend the share of question terms the sentence contains with its chunk's retrieval score.
+
+    ``relative_score`` is the chunk's similarity to the query divided by the
+    best match's, which keeps the threshold independent of the embedding
+    model's score range.
+    """
+    if not question_terms:
+        return 0.0
+    terms = content_terms(sentence)
+    if len(terms - question_terms) < _MIN_NOVEL_TERMS:
+        return 0.0
+    lexical = len(question_terms & terms) / len(question_terms)
+    semantic = min(max(relative_score, 0.0), 1.0)
+    return _LEXICAL_WEIGHT * lexical + (1 - _LEXICAL_WEIGHT) * semantic
+
+
+def extract_answer(question: str, matches: Sequence[dict]) -> Optional[ExtractiveAnswer]:
+    """Return the sentence that answers ``question`` verbatim, if one clearly does.
+
+    Candidates are the sentences of the top retrieved chunks. Nothing is
+    returned unless the best one clears ``EXTRACTIVE_CONFIDENCE_THRESHOLD``
+    and no different sentence scores almost as well.
+    """
+    question_terms = content_terms(question)
+    candidates = matches[:_CANDIDATE_CHUNKS]
+    best_score = max((float(match.get("score", 0.0)) for match in candidates), default=0.0)
+    scored: list[tuple[float, str, int]] = []
+    for match_index, match in enumerate(candidates):
+        metadata = match.get("metadata") or {}
+        relative = float(match.get("score", 0.0)) / best_score if best_score > 0 else 0.0
+        for sentence in split_sentences(metadata.get("text", "")):
+            scored.append((score_sentence(question_terms, sentence, relative), sentence, match_index))
+    if not scored:
+        return None
+
+    scored.sort(key=lambda item: item[0], reverse=True)
+    confidence, sentence, match_index = scored[0]
+    if confidence < get_settings().extractive_confidence_threshold:
+        return None
+    # Overlapping chunks repeat sentences, so only a different sentence counts as a rival.
+    runner_up = next((score for score, other, _ in scored[1:] if other != sentence), 0.0)
+    if confidence - runner_up < _AMBIGUITY_MARGIN:
+        return None
+    return ExtractiveAnswer(sentence=sentence, match_index=match_index, confidence=confidence)
@@ -1,18 +1,20 @@
 from __future__ import annotations
 
+import hashlib
 import io
 import re
-from uuid import UUID, uuid4
+from uuid import NAMESPACE_URL, UUID, uuid5
 
-import pdfplumber
 from fastapi import HTTPException, UploadFile, status
 
 from ..config import get_settings
+from . import metrics
+from .answer_cache import invalidate_document
 from .chunker import chunk_text
 from .embeddings import embed_chunks
-from .vector_store import upsert_chunks
-
-_settings = get_settings()
+from .resilience import CircuitOpenError
+from .summaries import build_summary_index
+from .vector_store import clear_document, upsert_chunks
 
 
 def _read_file_bytes(upload: UploadFile) -> bytes:
@@ -23,15 +25,17 @@ def _read_file_bytes(upload: UploadFile) -> bytes:
             detail="Uploaded file appears to be empty.",
         )
     size_mb = len(file_bytes) / (1024 * 1024)
-    if size_mb > _settings.max_upload_size_mb:
+    if size_mb > get_settings().max_upload_size_mb:
         raise HTTPException(
             status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-            detail=f"File exceeds {_settings.max_upload_size_mb}MB limit.",
+            detail=f"File exceeds {get_settings().max_upload_size_mb}MB limit.",
         )
     return file_bytes
 
 
 def _extract_text_from_pdf(file_bytes: bytes) -> list[tuple[int, str]]:
+    import pdfplumber
+
     page_text: list[tuple[int, str]] = []
     with pdfplumber.open(io.BytesIO(file_bytes)) as pdf:
         for index, page in enumerate(pdf.pages, start=1):
@@ -45,24 +49,15 @@ def _extract_text_from_pdf(file_bytes: bytes) -> list[tuple[int, str]]:
     return page_text
 
 
-def ingest_pdf(upload: UploadFile) -> UUID:
-    if upload.content_type not in {"application/pdf"}:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Only PDF uploads are supported.",
-        )
-
-    file_bytes = _read_file_bytes(upload)
-    pages = _extract_text_from_pdf(file_bytes)
-    document_id = uuid4()
-
+def chunk_pages(pages: list[tuple[int, str]]) -> tuple[list[str], list[int]]:
+    """Chunk extracted pages and attribute each chunk to the page it starts on."""
     combined_text = "\n\n".join(f"[Page {page}] {text}" for page, text in pages)
 
     raw_chunks = list(
         chunk_text(
             combined_text,
-            chunk_size=_settings.chunk_size,
-            chunk_overlap=_settings.chunk_overlap,
+            chunk_size=get_settings().chunk_size,
+            chunk_overlap=get_settings().chunk_overlap,
         )
     )
     chunks: list[str] = []
@@ -74,13 +69,53 @@ def ingest_pdf(upload: UploadFile) -> UUID:
         if cleaned_chunk:
             chunks.append(cleaned_chunk)
             page_numbers.append(page_number)
+    return chunks, page_numbers
 
-    embeddings = embed_chunks(chunks)
-    upsert_chunks(
-        document_id=document_id,
-        chunks=chunks,
-        embeddings=embeddings,
-        pages=page_numbers,
-    )
+
+def document_id_for(sha256: str) -> UUID:
+    """Stable document id for a file's content, so ingesting the same bytes again reuses it."""
+    return uuid5(NAMESPACE_URL, sha256)
+
+
+def ingest_pdf(upload: UploadFile) -> UUID:
+    if upload.content_type not in {"application/pdf"}:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Only PDF uploads are supported.",
+        )
+
+    with metrics.memory_sample("ingest_pdf"):
+        with metrics.span("read"):
+            file_bytes = _read_file_bytes(upload)
+        metrics.increment("ingest_bytes_total", len(file_bytes))
+        with metrics.span("extract"):
+            pages = _extract_text_from_pdf(file_bytes)
+        metrics.increment("ingest_pages_total", len(pages))
+        # Uploading the same PDF again re-ingests it under its existing id. Documents are
+        # content-addressed and not owned by an uploader, so identical files share one id.
+        document_id = document_id_for(hashlib.sha256(file_bytes).hexdigest())
+
+        with metrics.span("chunk"):
+            chunks, page_numbers = chunk_pages(pages)
+        metrics.increment("ingest_chunks_total", len(chunks))
+
+        try:
+            with metrics.span("embed"):
+                embeddings = embed_chunks(chunks)
+        except CircuitOpenError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=str(exc),
+            ) from exc
+        clear_document(document_id)
+        upsert_chunks(
+            document_id=document_id,
+            chunks=chunks,
+            embeddings=embeddings,
+            pages=page_numbers,
+        )
+        if get_settings().summary_index_enabled:
+            build_summary_index(document_id, pages)
+        invalidate_document(document_id)
 
     return document_id
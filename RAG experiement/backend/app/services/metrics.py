@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import bisect
+import contextvars
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
+
+from ..config import get_settings
+
+LabelSet = tuple[tuple[str, str], ...]
+
+_lock = threading.Lock()
+_counters: dict[tuple[str, LabelSet], float] = {}
+_gauges: dict[tuple[str, LabelSet], float] = {}
+_histograms: dict[tuple[str, LabelSet], _Histogram] = {}
+_memory_lock = threading.Lock()
+
+# Per-request list of (stage, seconds) used for the Server-Timing header.
+_request_timings: contextvars.ContextVar[Optional[list[tuple[str, float]]]] = contextvars.ContextVar(
+    "request_timings", default=None
+)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class _Histogram:
+    def __init__(self, buckets: tuple[float, ...]) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+
+def _label_set(labels: dict[str, Any]) -> LabelSet:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def increment(name: str, amount: float = 1.0, **labels: Any) -> None:
+    key = (name, _label_set(labels))
+    with _lock:
+        _counters[key] = _counters.get(key, 0.0) + amount
+
+
+def set_gauge(name: str, value: float, **labels: Any) -> None:
+    with _lock:
+        _gauges[(name, _label_set(labels))] = value
+
+
+def observe(name: str, value: float, buckets: tuple[float, ...] = DEFAULT_BUCKETS, **labels: Any) -> None:
+    key = (name, _label_set(labels))
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = _Histogram(buckets)
+        histogram.observe(value)
+
+
+def counter_value(name: str, **labels: Any) -> float:
+    with _lock:
+        return _counters.get((name, _label_set(labels)), 0.0)
+
+
+@contextmanager
+def span(stage: str, **labels: Any) -> Iterator[None]:
+    """Time a pipeline stage into ``stage_duration_seconds`` and the current request's timings."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        observe("stage_duration_seconds", elapsed, stage=stage, **labels)
+        timings = _request_timings.get()
+        if timings is not None:
+            timings.append((stage, elapsed))
+
+
+@contextmanager
+def memory_sample(operation: str) -> Iterator[None]:
+    """Record the tracemalloc peak during ``operation`` when METRICS_TRACE_MEMORY is on.
+
+    tracemalloc is process-wide, so concurrent operations share one peak; the
+    gauge is an upper bound rather than an exact per-request figure.
+    """
+    if not get_settings().metrics_trace_memory:
+        yield
+        return
+
+    with _memory_lock:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+    try:
+        yield
+    finally:
+        _, peak = tracemalloc.get_traced_memory()
+        set_gauge("peak_memory_bytes", max(peak - baseline, 0), operation=operation)
+
+
+def start_request_timings() -> contextvars.Token:
+    return _request_timings.set([])
+
+
+def finish_request_timings(token: contextvars.Token) -> list[tuple[str, float]]:
+    timings = _request_timings.get() or []
+    _request_timings.reset(token)
+    return timings
+
+
+def server_timing_header(timings: list[tuple[str, float]]) -> str:
+    totals: dict[str, float] = {}
+    for stage, seconds in timings:
+        totals[stage] = totals.get(stage, 0.0) + seconds
+    return ", ".join(f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in totals.items())
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: LabelSet, extra: Optional[tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in pairs) + "}"
+
+
+def render_prometheus() -> str:
+    """Render every metric in the Prometheus text exposition format (0.0.4)."""
+    lines: list[str] = []
+    with _lock:
+        counters = sorted(_counters.items())
+        gauges = sorted(_gauges.items())
+        histograms = sorted(_histograms.items(), key=lambda item: item[0])
+        histogram_rows = [
+            (key, histogram.buckets, list(histogram.counts), histogram.total, histogram.count)
+            for key, histogram in histograms
+        ]
+
+    typed: set[str] = set()
+    for (name, labels), value in counters:
+        if name not in typed:
+            lines.append(f"# TYPE {name} counter")
+            typed.add(name)
+        lines.append(f"{name}{_format_labels(labels)} {value:g}")
+    for (name, labels), value in gauges:
+        if name not in typed:
+            lines.append(f"# TYPE {name} gauge")
+            typed.add(name)
+        lines.append(f"{name}{_format_labels(labels)} {value:g}")
+    for (name, labels), buckets, counts, total, count in histogram_rows:
+        if name not in typed:
+            lines.append(f"# TYPE {name} histogram")
+            typed.add(name)
+        cumulative = 0
+        for bound, bucket_count in zip(buckets, counts):
+            cumulative += bucket_count
+            lines.append(f"{name}_bucket{_format_labels(labels, ('le', f'{bound:g}'))} {cumulative}")
+        lines.append(f"{name}_bucket{_format_labels(labels, ('le', '+Inf'))} {count}")
+        lines.append(f"{name}_sum{_format_labels(labels)} {total:g}")
+        lines.append(f"{name}_count{_format_labels(labels)} {count}")
+    return "\n".join(lines) + "\n"
+
+
+def snapshot() -> dict[str, list[dict[str, Any]]]:
+    with _lock:
+        counters = [
+            {"name": name, "labels": dict(labels), "value": value}
+            for (name, labels), value in sorted(_counters.items())
+        ]
+        gauges = [
+            {"name": name, "labels": dict(labels), "value": value}
+            for (name, labels), value in sorted(_gauges.items())
+        ]
+        histograms = [
+            {"name": name, "labels": dict(labels), "count": histogram.count, "sum": histogram.total}
+            for (name, labels), histogram in sorted(_histograms.items(), key=lambda item: item[0])
+        ]
+    return {"counters": counters, "gauges": gauges, "histograms": histograms}
@@ -1,15 +1,62 @@
 from __future__ import annotations
 
-from openai import OpenAI
+from typing import TYPE_CHECKING, Any, Sequence
 
 from ..config import get_settings
+from . import metrics
+from .scheduler import Priority, estimate_tokens, get_scheduler
+
+if TYPE_CHECKING:
+    from openai import OpenAI
 
-_settings = get_settings()
 _client: OpenAI | None = None
 
+# Completions are charged against the token budget for their output as well.
+_COMPLETION_TOKEN_ALLOWANCE = 512
+
 
 def get_client() -> OpenAI:
     global _client
     if _client is None:
-        _client = OpenAI(api_key=_settings.openai_api_key)
+        # Imported here: the SDK is the single most expensive import in the app.
+        from openai import OpenAI
+
+        # Retries are owned by the scheduler so 429s back off together instead of per call.
+        _client = OpenAI(api_key=get_settings().openai_api_key, max_retries=0)
     return _client
+
+
+def create_embeddings(
+    inputs: Sequence[str],
+    model: str,
+    priority: Priority = Priority.INTERACTIVE,
+) -> Any:
+    client = get_client()
+    response = get_scheduler().run(
+        lambda: client.embeddings.with_raw_response.create(input=list(inputs), model=model),
+        estimated_tokens=estimate_tokens(*inputs),
+        priority=priority,
+    )
+    if getattr(response, "usage", None):
+        metrics.increment("openai_tokens_total", response.usage.prompt_tokens, model=model, kind="embedding")
+    return response
+
+
+def create_chat_completion(
+    messages: list[dict[str, str]],
+    model: str,
+    priority: Priority = Priority.INTERACTIVE,
+) -> Any:
+    client = get_client()
+    response = get_scheduler().run(
+        lambda: client.chat.completions.with_raw_response.create(model=model, messages=messages),
+        estimated_tokens=estimate_tokens(*(message["content"] for message in messages))
+        + _COMPLETION_TOKEN_ALLOWANCE,
+        priority=priority,
+    )
+    if getattr(response, "usage", None):
+        metrics.increment("openai_tokens_total", response.usage.prompt_tokens, model=model, kind="prompt")
+        metrics.increment(
+            "openai_tokens_total", response.usage.completion_tokens, model=model, kind="completion"
+        )
+    return response
@@ -1,18 +1,24 @@
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from typing import Any, Iterable, Optional
+from typing import Any, Iterable, Iterator, Optional, Sequence
 from uuid import UUID, uuid4
 
 from fastapi import HTTPException, status
 
 from ..config import get_settings
 from ..models.schemas import ChatResponse, Citation
-from .embeddings import embed_query
-from .openai_client import get_client
+from . import metrics, resilience
+from .answer_cache import SingleFlight, document_set_key, get_answer_cache, normalize_question
+from .embeddings import embed_queries, embed_query
+from .extractive import extract_answer
+from .openai_client import create_chat_completion
+from .resilience import CircuitOpenError
+from .summaries import is_broad_question, retrieve_summaries
 from .vector_store import similarity_search
 
-_settings = get_settings()
+_in_flight = SingleFlight()
 
 BASE_PROMPT = """You are a helpful assistant that answers questions using the provided context.
 Use only the supplied context snippets to craft your answer.
@@ -25,6 +31,14 @@ Context:
 User question: {question}
 """
 
+DEGRADED_RETRIEVAL_ANSWER = (
+    "Document search is temporarily unavailable, so I can't answer right now. Please try again shortly."
+)
+DEGRADED_GENERATION_ANSWER = (
+    "Answer generation is temporarily unavailable. The passages below are the most relevant "
+    "matches for your question."
+)
+
 
 def format_context(snippets: Iterable[dict]) -> tuple[str, list[Citation]]:
     formatted_chunks: list[str] = []
@@ -35,9 +49,12 @@ def format_context(snippets: Iterable[dict]) -> tuple[str, list[Citation]]:
         page_value = metadata.get("page", 0)
         document_id_str = metadata.get("document_id")
         chunk_index = metadata.get("chunk_index", 0)
-        formatted_chunks.append(
-            f"[Doc {document_id_str} | Page {page_value} | Chunk {chunk_index}] {text}"
-        )
+        if "pages" in metadata:
+            formatted_chunks.append(f"[Doc {document_id_str} | Pages {metadata['pages']} | Summary] {text}")
+        else:
+            formatted_chunks.append(
+                f"[Doc {document_id_str} | Page {page_value} | Chunk {chunk_index}] {text}"
+            )
 
         doc_uuid: UUID
         if document_id_str:
@@ -59,6 +76,36 @@ def format_context(snippets: Iterable[dict]) -> tuple[str, list[Citation]]:
     return "\n\n".join(formatted_chunks), citations
 
 
+def _reissue(response: ChatResponse, session_id: Optional[UUID]) -> ChatResponse:
+    return response.model_copy(
+        update={"session_id": session_id or uuid4(), "created_at": datetime.utcnow()}
+    )
+
+
+def _degraded_response(
+    session_id: Optional[UUID],
+    answer: str,
+    citations: Optional[list[Citation]] = None,
+) -> ChatResponse:
+    return ChatResponse(
+        session_id=session_id or uuid4(),
+        answer=answer,
+        citations=citations or [],
+        created_at=datetime.utcnow(),
+        degraded=True,
+        answer_path="degraded",
+    )
+
+
+def _validate_document_ids(document_ids: Optional[list[UUID]]) -> list[UUID]:
+    if not document_ids:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="At least one document_id is required to run retrieval.",
+        )
+    return document_ids
+
+
 def answer_question(
     question: str,
     document_ids: Optional[list[UUID]] = None,
@@ -70,32 +117,177 @@ def answer_question(
             detail="Question cannot be empty.",
         )
 
-    if not document_ids:
+    document_ids = _validate_document_ids(document_ids)
+    with metrics.memory_sample("answer_question"):
+        return _answer(question, document_ids, session_id)
+
+
+def answer_questions(
+    questions: Sequence[str],
+    document_ids: Optional[list[UUID]] = None,
+    session_id: Optional[UUID] = None,
+) -> Iterator[tuple[int, Optional[ChatResponse], Optional[str]]]:
+    """Answer many questions over the same documents, yielding results as they complete.
+
+    Yields ``(index, response, error)`` tuples in completion order. Questions
+    are embedded in one multi-input request and then retrieved and answered
+    on a pool bounded by ``BATCH_CONCURRENCY``. Validation of the batch as a
+    whole happens eagerly so callers can reject it before streaming starts.
+    """
+    document_ids = _validate_document_ids(document_ids)
+    if len(questions) > get_settings().batch_max_questions:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="At least one document_id is required to run retrieval.",
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"A batch may contain at most {get_settings().batch_max_questions} questions.",
         )
+    return _answer_batch(list(questions), document_ids, session_id)
+
 
+def _answer_batch(
+    questions: list[str],
+    document_ids: list[UUID],
+    session_id: Optional[UUID],
+) -> Iterator[tuple[int, Optional[ChatResponse], Optional[str]]]:
+    cache = get_answer_cache() if get_settings().answer_cache_enabled else None
+    doc_key = document_set_key(document_ids)
+
+    pending: list[int] = []
+    for index, question in enumerate(questions):
+        if not question.strip():
+            yield index, None, "Question cannot be empty."
+            continue
+        cached = cache.get_exact(doc_key, normalize_question(question)) if cache else None
+        if cached is not None:
+            yield index, _reissue(cached, session_id), None
+            continue
+        pending.append(index)
+
+    if not pending:
+        return
+
+    try:
+        embeddings = embed_queries([questions[index] for index in pending])
+    except CircuitOpenError:
+        for index in pending:
+            yield index, _degraded_response(session_id, DEGRADED_RETRIEVAL_ANSWER), None
+        return
+    workers = max(min(get_settings().batch_concurrency, len(pending)), 1)
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        futures = {
+            executor.submit(_answer, questions[index], document_ids, session_id, embedding): index
+            for index, embedding in zip(pending, embeddings)
+        }
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                yield index, future.result(), None
+            except HTTPException as exc:
+                yield index, None, str(exc.detail)
+            except Exception as exc:  # noqa: BLE001 - one bad question must not sink the batch
+                yield index, None, str(exc)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _answer(
+    question: str,
+    document_ids: list[UUID],
+    session_id: Optional[UUID] = None,
+    query_embedding: Optional[list[float]] = None,
+) -> ChatResponse:
+    try:
+        return _answer_cached(question, document_ids, session_id, query_embedding)
+    except CircuitOpenError:
+        return _degraded_response(session_id, DEGRADED_RETRIEVAL_ANSWER)
+
+
+def _answer_cached(
+    question: str,
+    document_ids: list[UUID],
+    session_id: Optional[UUID] = None,
+    query_embedding: Optional[list[float]] = None,
+) -> ChatResponse:
+    if not get_settings().answer_cache_enabled:
+        return _answer_uncached(question, document_ids, session_id, query_embedding)
+
+    cache = get_answer_cache()
+    doc_key = document_set_key(document_ids)
+    normalized = normalize_question(question)
+    with metrics.span("cache_lookup"):
+        cached = cache.get_exact(doc_key, normalized)
+    if cached is not None:
+        metrics.increment("answer_cache_hits_total", tier="exact")
+        return _reissue(cached, session_id)
+
+    def compute() -> ChatResponse:
+        versions = cache.snapshot(doc_key)
+        embedding = query_embedding if query_embedding is not None else embed_query(question)
+        with metrics.span("cache_lookup"):
+            similar = cache.get_semantic(doc_key, embedding)
+        if similar is not None:
+            metrics.increment("answer_cache_hits_total", tier="semantic")
+            return similar
+        response = _answer_uncached(question, document_ids, session_id, embedding)
+        if not response.degraded:
+            cache.put(doc_key, normalized, response, versions, embedding=embedding)
+        return response
+
+    return _reissue(_in_flight.do((doc_key, normalized), compute), session_id)
+
+
+def _answer_uncached(
+    question: str,
+    document_ids: list[UUID],
+    session_id: Optional[UUID] = None,
+    query_embedding: Optional[list[float]] = None,
+) -> ChatResponse:
     namespace = str(document_ids[0])
-    query_embedding = embed_query(question)
-    matches = similarity_search(
-        query_embedding=query_embedding,
-        top_k=_settings.max_context_chunks,
-        namespace=namespace,
-    )
+    if query_embedding is None:
+        query_embedding = embed_query(question)
+    matches: list[dict] = []
+    # Broad questions are answered from the document's precomputed summaries, when it has them.
+    if get_settings().summary_index_enabled and is_broad_question(question):
+        matches = retrieve_summaries(query_embedding, namespace)
+    answer_path = "summary" if matches else "generated"
+    if not matches:
+        matches = similarity_search(
+            query_embedding=query_embedding,
+            top_k=get_settings().max_context_chunks,
+            namespace=namespace,
+        )
     context, citations = format_context(matches)
 
-    client = get_client()
-    completion = client.chat.completions.create(
-        model=_settings.gpt_model,
-        messages=[
-            {
-                "role": "system",
-                "content": "You are a retrieval augmented assistant. Only answer with information from the provided context.",
-            },
-            {"role": "user", "content": BASE_PROMPT.format(context=context, question=question)},
-        ],
-    )
+    if answer_path == "generated" and get_settings().extractive_answers_enabled:
+        with metrics.span("extractive"):
+            extracted = extract_answer(question, matches)
+        if extracted is not None:
+            metrics.increment("qa_route_total", route="extractive")
+            citation = citations[extracted.match_index].model_copy(update={"snippet": extracted.sentence})
+            return ChatResponse(
+                session_id=session_id or uuid4(),
+                answer=extracted.sentence,
+                citations=[citation],
+                created_at=datetime.utcnow(),
+                answer_path="extractive",
+            )
+    metrics.increment("qa_route_total", route="summary" if answer_path == "summary" else "chunks")
+
+    messages = [
+        {
+            "role": "system",
+            "content": "You are a retrieval augmented assistant. Only answer with information from the provided context.",
+        },
+        {"role": "user", "content": BASE_PROMPT.format(context=context, question=question)},
+    ]
+    try:
+        with metrics.span("generate"):
+            completion = resilience.call(
+                "openai_chat",
+                lambda: create_chat_completion(model=get_settings().gpt_model, messages=messages),
+            )
+    except CircuitOpenError:
+        return _degraded_response(session_id, DEGRADED_GENERATION_ANSWER, citations)
 
     answer = completion.choices[0].message.content or ""
     response_session_id = session_id or uuid4()
@@ -113,4 +305,5 @@ def answer_question(
         citations=citations,
         created_at=datetime.utcnow(),
         usage=usage,
+        answer_path=answer_path,
     )
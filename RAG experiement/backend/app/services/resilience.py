@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Optional, TypeVar
+
+from ..config import get_settings
+from . import metrics
+
+_breakers: dict[str, CircuitBreaker] = {}
+_trackers: dict[str, LatencyTracker] = {}
+_registry_lock = threading.Lock()
+_hedge_executor: Optional[ThreadPoolExecutor] = None
+
+T = TypeVar("T")
+
+# Below this many samples the percentile is too noisy to drive hedging.
+_MIN_SAMPLES_FOR_PERCENTILE = 20
+
+
+class CircuitOpenError(RuntimeError):
+    def __init__(self, dependency: str) -> None:
+        super().__init__(f"{dependency} is temporarily unavailable (circuit open).")
+        self.dependency = dependency
+
+
+class CircuitBreaker:
+    """Classic closed / open / half-open breaker for one external dependency."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, dependency: str, failure_threshold: int, reset_seconds: float) -> None:
+        self.dependency = dependency
+        self.failure_threshold = max(failure_threshold, 1)
+        self.reset_seconds = reset_seconds
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def _transition(self, state: str) -> None:
+        if state != self.state:
+            self.state = state
+            metrics.increment("circuit_breaker_transitions_total", dependency=self.dependency, state=state)
+
+    def before_call(self) -> None:
+        with self._lock:
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_seconds:
+                self._transition(self.HALF_OPEN)
+            if self.state == self.OPEN or (self.state == self.HALF_OPEN and self._trial_in_flight):
+                metrics.increment("circuit_breaker_rejections_total", dependency=self.dependency)
+                raise CircuitOpenError(self.dependency)
+            if self.state == self.HALF_OPEN:
+                self._trial_in_flight = True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self._trial_in_flight = False
+            self._transition(self.CLOSED)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+                self._transition(self.OPEN)
+
+
+class LatencyTracker:
+    """Rolling window of recent call durations for one dependency."""
+
+    def __init__(self, window: int = 512) -> None:
+        self._samples: deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        with self._lock:
+            if len(self._samples) < _MIN_SAMPLES_FOR_PERCENTILE:
+                return None
+            ordered = sorted(self._samples)
+        rank = min(int(round(pct / 100.0 * (len(ordered) - 1))), len(ordered) - 1)
+        return ordered[rank]
+
+
+def _transport_errors() -> tuple[type[BaseException], ...]:
+    errors: list[type[BaseException]] = [ConnectionError, TimeoutError]
+    # Imported here: the SDKs are only loaded once a call has already failed.
+    try:
+        from openai import APIConnectionError  # also covers APITimeoutError
+
+        errors.append(APIConnectionError)
+    except ImportError:
+        pass
+    try:
+        from urllib3.exceptions import HTTPError  # Pinecone's transport; HTTP statuses are not raised as these
+
+        errors.append(HTTPError)
+    except ImportError:
+        pass
+    return tuple(errors)
+
+
+def is_dependency_failure(exc: BaseException) -> bool:
+    """Whether ``exc`` says the dependency is unhealthy: transport errors, timeouts, 429s and 5xx.
+
+    Other 4xx responses are the caller's fault and leave the breaker alone.
+    """
+    status = getattr(exc, "status_code", None) or getattr(exc, "status", None)
+    if isinstance(status, int):
+        return status in (408, 429) or status >= 500
+    return isinstance(exc, _transport_errors())
+
+
+def get_breaker(dependency: str) -> CircuitBreaker:
+    with _registry_lock:
+        breaker = _breakers.get(dependency)
+        if breaker is None:
+            breaker = _breakers[dependency] = CircuitBreaker(
+                dependency,
+                failure_threshold=get_settings().circuit_failure_threshold,
+                reset_seconds=get_settings().circuit_reset_seconds,
+            )
+        return breaker
+
+
+def get_tracker(dependency: str) -> LatencyTracker:
+    with _registry_lock:
+        tracker = _trackers.get(dependency)
+        if tracker is None:
+            tracker = _trackers[dependency] = LatencyTracker()
+        return tracker
+
+
+def _get_hedge_executor() -> ThreadPoolExecutor:
+    global _hedge_executor
+    with _registry_lock:
+        if _hedge_executor is None:
+            _hedge_executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="hedge")
+        return _hedge_executor
+
+
+def hedge_delay(dependency: str) -> float:
+    min_delay = get_settings().hedge_min_delay_ms / 1000.0
+    max_delay = get_settings().hedge_max_delay_ms / 1000.0
+    observed = get_tracker(dependency).percentile(get_settings().hedge_percentile)
+    if observed is None:
+        return max_delay
+    return min(max(observed, min_delay), max_delay)
+
+
+def _timed(dependency: str, fn: Callable[[], T]) -> Callable[[], T]:
+    def run() -> T:
+        started = time.perf_counter()
+        result = fn()
+        get_tracker(dependency).observe(time.perf_counter() - started)
+        return result
+
+    return run
+
+
+def _hedged(dependency: str, fn: Callable[[], T]) -> T:
+    executor = _get_hedge_executor()
+    primary = executor.submit(_timed(dependency, fn))
+    done, _ = wait([primary], timeout=hedge_delay(dependency))
+    if done:
+        return primary.result()
+
+    metrics.increment("hedge_requests_total", dependency=dependency)
+    hedge = executor.submit(_timed(dependency, fn))
+    attempts: dict[Future, str] = {primary: "primary", hedge: "hedge"}
+    pending = set(attempts)
+    error: Optional[BaseException] = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                metrics.increment("hedge_wins_total", dependency=dependency, winner=attempts[future])
+                return future.result()
+            error = future.exception()
+    assert error is not None
+    raise error
+
+
+def call(dependency: str, fn: Callable[[], T], hedge: bool = False) -> T:
+    """Run ``fn`` behind the dependency's circuit breaker, hedging it when enabled.
+
+    Only pass ``hedge=True`` for idempotent calls: a hedged call may run twice.
+    """
+    breaker = get_breaker(dependency)
+    breaker.before_call()
+    try:
+        if hedge and get_settings().hedging_enabled:
+            result = _hedged(dependency, fn)
+        else:
+            result = _timed(dependency, fn)()
+    except Exception as exc:
+        if not is_dependency_failure(exc):
+            # The dependency answered; the request itself was bad.
+            breaker.record_success()
+            raise
+        breaker.record_failure()
+        metrics.increment("dependency_failures_total", dependency=dependency)
+        raise
+    breaker.record_success()
+    return result
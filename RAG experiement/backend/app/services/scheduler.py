@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+import heapq
+import itertools
+import re
+import threading
+import time
+from enum import IntEnum
+from typing import Any, Callable, Mapping, Optional, TypeVar
+
+from ..config import get_settings
+
+_scheduler: Optional[RateLimitScheduler] = None
+_scheduler_lock = threading.Lock()
+
+T = TypeVar("T")
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_DURATION_SECONDS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+class Priority(IntEnum):
+    """Lower values are served first."""
+
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+
+def estimate_tokens(*texts: str) -> int:
+    # ~4 characters per token for English text, plus a little per-message overhead.
+    return sum(len(text) // 4 + 4 for text in texts)
+
+
+def parse_duration(value: Optional[str]) -> Optional[float]:
+    """Parse OpenAI reset headers such as ``"1s"``, ``"6m0s"`` or ``"20ms"``."""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * _DURATION_SECONDS[unit] for amount, unit in parts)
+
+
+def _header_int(headers: Mapping[str, str], name: str) -> Optional[int]:
+    value = headers.get(name)
+    if value is None:
+        return None
+    try:
+        return int(float(value))
+    except ValueError:
+        return None
+
+
+class TokenBucket:
+    """Per-minute budget refilled continuously, as OpenAI enforces it."""
+
+    def __init__(self, per_minute: float) -> None:
+        self.capacity = max(per_minute, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self.updated
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.capacity / 60.0)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        self._refill(now)
+        # A single request larger than the whole bucket must still be allowed through.
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) * 60.0 / self.capacity
+
+    def consume(self, amount: float) -> None:
+        self.tokens -= min(amount, self.capacity)
+
+    def sync(self, limit: Optional[int], remaining: Optional[int], now: float) -> None:
+        self._refill(now)
+        if limit:
+            self.capacity = float(limit)
+        if remaining is not None:
+            self.tokens = min(self.tokens, float(remaining))
+
+
+class RateLimitScheduler:
+    """Shared gate for OpenAI calls.
+
+    Each call waits for its turn in priority order, for room in the request and
+    token buckets, and for a free concurrency slot. The concurrency limit grows
+    by one after healthy responses and halves on a 429 (AIMD), and the buckets
+    are re-synced from the ``x-ratelimit-*`` response headers so the scheduler
+    tracks the real quota rather than the configured guess.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int,
+        tokens_per_minute: int,
+        max_concurrency: int,
+        max_retries: int = 4,
+    ) -> None:
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_concurrency = max(max_concurrency, 1)
+        self.concurrency_limit = self.max_concurrency
+        self.max_retries = max_retries
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self._queue: list[tuple[int, int]] = []
+        self._sequence = itertools.count()
+        self._cond = threading.Condition()
+
+    def acquire(self, estimated_tokens: int, priority: Priority) -> None:
+        ticket = (int(priority), next(self._sequence))
+        with self._cond:
+            heapq.heappush(self._queue, ticket)
+            try:
+                while True:
+                    now = time.monotonic()
+                    wait = None
+                    if self._queue[0] == ticket and self.in_flight < self.concurrency_limit:
+                        wait = max(
+                            self.paused_until - now,
+                            self.requests.wait_time(1, now),
+                            self.tokens.wait_time(estimated_tokens, now),
+                        )
+                        if wait <= 0:
+                            self.requests.consume(1)
+                            self.tokens.consume(estimated_tokens)
+                            self.in_flight += 1
+                            return
+                    self._cond.wait(timeout=wait)
+            finally:
+                self._queue.remove(ticket)
+                heapq.heapify(self._queue)
+                self._cond.notify_all()
+
+    def release(
+        self,
+        headers: Optional[Mapping[str, str]] = None,
+        rate_limited: bool = False,
+    ) -> None:
+        with self._cond:
+            self.in_flight -= 1
+            now = time.monotonic()
+            if rate_limited:
+                self.concurrency_limit = max(self.concurrency_limit // 2, 1)
+                retry_after = parse_duration((headers or {}).get("retry-after"))
+                reset = parse_duration((headers or {}).get("x-ratelimit-reset-requests"))
+                self.paused_until = max(self.paused_until, now + (retry_after or reset or 1.0))
+            elif headers:
+                self._observe(headers, now)
+                if self.concurrency_limit < self.max_concurrency:
+                    self.concurrency_limit += 1
+            self._cond.notify_all()
+
+    def _observe(self, headers: Mapping[str, str], now: float) -> None:
+        self.requests.sync(
+            _header_int(headers, "x-ratelimit-limit-requests"),
+            _header_int(headers, "x-ratelimit-remaining-requests"),
+            now,
+        )
+        self.tokens.sync(
+            _header_int(headers, "x-ratelimit-limit-tokens"),
+            _header_int(headers, "x-ratelimit-remaining-tokens"),
+            now,
+        )
+
+    def run(
+        self,
+        call: Callable[[], Any],
+        estimated_tokens: int,
+        priority: Priority = Priority.INTERACTIVE,
+    ) -> Any:
+        """Run an OpenAI ``with_raw_response`` call under the scheduler and return the parsed body."""
+        from openai import APIConnectionError, InternalServerError, RateLimitError
+
+        attempt = 0
+        while True:
+            self.acquire(estimated_tokens, priority)
+            try:
+                raw = call()
+            except RateLimitError as exc:
+                self.release(exc.response.headers, rate_limited=True)
+                if attempt >= self.max_retries:
+                    raise
+            except (APIConnectionError, InternalServerError):
+                self.release()
+                if attempt >= self.max_retries:
+                    raise
+                time.sleep(min(2**attempt * 0.5, 8.0))
+            except BaseException:
+                self.release()
+                raise
+            else:
+                self.release(raw.headers)
+                return raw.parse()
+            attempt += 1
+
+
+def get_scheduler() -> RateLimitScheduler:
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = RateLimitScheduler(
+                    requests_per_minute=get_settings().openai_requests_per_minute,
+                    tokens_per_minute=get_settings().openai_tokens_per_minute,
+                    max_concurrency=get_settings().openai_max_concurrency,
+                    max_retries=get_settings().openai_max_retries,
+                )
+    return _scheduler
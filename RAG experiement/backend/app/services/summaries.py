@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Sequence
+from uuid import UUID
+
+from ..config import get_settings
+from . import metrics, resilience
+from .embeddings import embed_chunks
+from .openai_client import create_chat_completion
+from .scheduler import Priority
+from .vector_store import hydrate_summaries, summary_search, upsert_summaries
+
+logger = logging.getLogger(__name__)
+
+# Summaries combined into one parent summary at each level of the tree.
+_ROLLUP_FANOUT = 8
+# Upper bound on the text sent for a single section, to keep each prompt small.
+_MAX_SECTION_CHARS = 16000
+_SUMMARY_WORKERS = 4
+# Summaries put in front of the model for a broad question, document summary included.
+SUMMARY_CONTEXT_SIZE = 4
+
+SECTION_PROMPT = """Summarize the following pages of a document in 4-6 sentences.
+Mention the main topics, findings and any names, figures or dates a reader would search for.
+
+Pages {first_page}-{last_page}:
+{text}
+"""
+
+ROLLUP_PROMPT = """The following are summaries of consecutive parts of one document.
+Combine them into a single summary of 5-8 sentences covering what the document is about
+and its most important points.
+
+{text}
+"""
+
+# Broad questions are matched against the whole question, so a cue word inside a
+# specific lookup ("what does the overview say about pricing?") does not count.
+_LEAD_IN = r"(?:(?:please|can you|could you|would you|give me|provide|write|i want|i'd like)\s+)*"
+_DOCUMENT = r"(?:it|(?:this|the|that|your)\s+(?:document|doc|file|pdf|paper|report|article|text|book|contract))"
+_POINTS = r"(?:main|key|major|central)\s+(?:points?|topics?|themes?|ideas?|findings?|takeaways?|arguments?)"
+_OF_DOCUMENT = rf"(?:\s+(?:of|for|in|from)\s+{_DOCUMENT})?"
+_TRAILER = r"(?:,?\s+(?:please|for me|briefly))*"
+
+_BROAD_PATTERNS = [
+    re.compile(pattern + _TRAILER)
+    for pattern in (
+        rf"{_LEAD_IN}(?:what(?:'s|\s+is)\s+)?(?:an?\s+|the\s+)?(?:short\s+|brief\s+|quick\s+|high[- ]level\s+)?"
+        rf"(?:summary|overview|tl;?dr|gist|synopsis){_OF_DOCUMENT}",
+        rf"{_LEAD_IN}(?:summari[sz]e|give an overview of)(?:\s+{_DOCUMENT}|\s+(?:the|its)\s+{_POINTS}{_OF_DOCUMENT})?",
+        rf"what(?:'s|\s+is|\s+are)\s+{_DOCUMENT}\s+(?:all\s+)?about",
+        rf"what(?:'s|\s+is|\s+are|\s+were)\s+(?:the|its)\s+{_POINTS}{_OF_DOCUMENT}",
+        rf"what\s+does\s+{_DOCUMENT}\s+(?:cover|discuss|describe)",
+    )
+]
+
+
+def is_broad_question(question: str) -> bool:
+    """Heuristic for questions about a whole document rather than a specific fact."""
+    normalized = " ".join(question.lower().split()).rstrip("?.! ")
+    return any(pattern.fullmatch(normalized) for pattern in _BROAD_PATTERNS)
+
+
+def document_summary_id(document_id: UUID | str) -> str:
+    return f"{document_id}:summary:document"
+
+
+def _summary_id(document_id: UUID | str, level: int, position: int) -> str:
+    return f"{document_id}:summary:{level}:{position}"
+
+
+def _summarize(prompt: str) -> str:
+    completion = resilience.call(
+        "openai_chat",
+        lambda: create_chat_completion(
+            messages=[{"role": "user", "content": prompt}],
+            model=get_settings().summary_model,
+            priority=Priority.BACKGROUND,
+        ),
+    )
+    return (completion.choices[0].message.content or "").strip()
+
+
+def _section_prompt(section: Sequence[tuple[int, str]]) -> str:
+    text = "\n\n".join(f"[Page {page}] {page_text}" for page, page_text in section)
+    return SECTION_PROMPT.format(
+        first_page=section[0][0],
+        last_page=section[-1][0],
+        text=text[:_MAX_SECTION_CHARS],
+    )
+
+
+def build_summary_tree(document_id: UUID, pages: list[tuple[int, str]]) -> list[dict]:
+    """Summarize page ranges, then roll them up level by level into one document summary.
+
+    Level 0 holds one summary per ``SUMMARY_PAGES_PER_SECTION`` pages. Each
+    higher level summarizes up to ``_ROLLUP_FANOUT`` summaries of the level
+    below, until a single root remains.
+    """
+    pages = [(page, text) for page, text in pages if text.strip()]
+    if not pages:
+        return []
+
+    size = max(get_settings().summary_pages_per_section, 1)
+    sections = [pages[start : start + size] for start in range(0, len(pages), size)]
+
+    summaries: list[dict] = []
+    with ThreadPoolExecutor(max_workers=_SUMMARY_WORKERS) as executor:
+        texts = list(executor.map(_summarize, [_section_prompt(section) for section in sections]))
+        level = [
+            {
+                "id": _summary_id(document_id, 0, position),
+                "level": 0,
+                "position": position,
+                "first_page": section[0][0],
+                "last_page": section[-1][0],
+                "text": text,
+            }
+            for position, (section, text) in enumerate(zip(sections, texts))
+        ]
+
+        depth = 0
+        while len(level) > 1:
+            summaries.extend(level)
+            depth += 1
+            groups = [level[start : start + _ROLLUP_FANOUT] for start in range(0, len(level), _ROLLUP_FANOUT)]
+            prompts = [
+                ROLLUP_PROMPT.format(
+                    text="\n\n".join(
+                        f"Pages {child['first_page']}-{child['last_page']}: {child['text']}" for child in group
+                    )
+                )
+                for group in groups
+            ]
+            texts = list(executor.map(_summarize, prompts))
+            level = [
+                {
+                    "id": _summary_id(document_id, depth, position),
+                    "level": depth,
+                    "position": position,
+                    "first_page": group[0]["first_page"],
+                    "last_page": group[-1]["last_page"],
+                    "text": text,
+                }
+                for position, (group, text) in enumerate(zip(groups, texts))
+            ]
+
+    root = dict(level[0], id=document_summary_id(document_id))
+    summaries.append(root)
+    return summaries
+
+
+def build_summary_index(document_id: UUID, pages: list[tuple[int, str]]) -> int:
+    """Build, embed and store the summary tree for a document. Returns the number of summaries.
+
+    Failures are logged rather than raised: the chunks are already indexed,
+    and broad questions fall back to ordinary retrieval without summaries.
+    """
+    try:
+        with metrics.span("summarize"):
+            summaries = build_summary_tree(document_id, pages)
+            embeddings = embed_chunks([summary["text"] for summary in summaries])
+        upsert_summaries(document_id, summaries, embeddings)
+    except Exception:  # noqa: BLE001 - the document is usable without its summaries
+        logger.warning("Building summaries for %s failed", document_id, exc_info=True)
+        metrics.increment("summary_failures_total")
+        return 0
+    metrics.increment("summaries_total", len(summaries))
+    return len(summaries)
+
+
+def retrieve_summaries(
+    query_embedding: list[float],
+    document_id: UUID | str,
+    top_k: int = SUMMARY_CONTEXT_SIZE,
+) -> list[dict]:
+    """Return the document summary followed by the section summaries closest to the query."""
+    matches = summary_search(query_embedding, top_k=top_k, document_id=document_id)
+    root_id = document_summary_id(document_id)
+    root = [match for match in matches if match["id"] == root_id]
+    if not root:
+        root = hydrate_summaries([{"id": root_id, "score": 1.0}])
+        if not root:
+            return []
+    others = [match for match in matches if match["id"] != root_id]
+    return root + others[: max(top_k - 1, 0)]
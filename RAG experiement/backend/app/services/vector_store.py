@@ -1,27 +1,82 @@
 from __future__ import annotations
 
-from typing import Optional, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Optional, Sequence
 from uuid import UUID
 
-from pinecone import Index, Pinecone
-
 from ..config import get_settings
+from . import document_store, metrics, resilience
+
+if TYPE_CHECKING:
+    from pinecone import Index, Pinecone
 
-_settings = get_settings()
 _pinecone_client: Optional[Pinecone] = None
 _index: Optional[Index] = None
 
+# Rough JSON size of one float in an upsert payload ("-0.0123456789,").
+_BYTES_PER_VALUE = 14
+_BYTES_PER_VECTOR_OVERHEAD = 256
+
 
 def get_index() -> Index:
     global _pinecone_client, _index
     if _index is not None:
         return _index
 
-    _pinecone_client = Pinecone(api_key=_settings.pinecone_api_key)
-    _index = _pinecone_client.Index(_settings.pinecone_index_name)
+    from pinecone import Pinecone
+
+    _pinecone_client = Pinecone(api_key=get_settings().pinecone_api_key)
+    _index = _pinecone_client.Index(get_settings().pinecone_index_name)
     return _index
 
 
+def _estimate_vector_bytes(vector: dict) -> int:
+    return len(vector["values"]) * _BYTES_PER_VALUE + _BYTES_PER_VECTOR_OVERHEAD
+
+
+def batch_vectors(vectors: Sequence[dict]) -> list[list[dict]]:
+    """Split vectors into batches bounded by both vector count and payload size."""
+    max_vectors = max(get_settings().upsert_batch_max_vectors, 1)
+    max_bytes = max(get_settings().upsert_batch_max_bytes, 1)
+
+    batches: list[list[dict]] = []
+    current: list[dict] = []
+    current_bytes = 0
+    for vector in vectors:
+        size = _estimate_vector_bytes(vector)
+        if current and (len(current) >= max_vectors or current_bytes + size > max_bytes):
+            batches.append(current)
+            current = []
+            current_bytes = 0
+        current.append(vector)
+        current_bytes += size
+    if current:
+        batches.append(current)
+    return batches
+
+
+def clear_document(document_id: UUID | str) -> None:
+    """Remove the chunk and summary vectors and stored text of an earlier ingest, if any.
+
+    Document ids come from the file's content, so re-ingesting a PDF reuses
+    its namespaces; leftovers from a run with other chunk settings would
+    otherwise keep matching.
+    """
+    if not document_store.has_document(document_id):
+        return
+    index = get_index()
+    with metrics.span("delete"):
+        for namespace in (str(document_id), summary_namespace(document_id)):
+            try:
+                index.delete(delete_all=True, namespace=namespace)
+            except Exception as exc:
+                # Pinecone answers 404 for a namespace that holds no vectors.
+                if getattr(exc, "status", None) != 404:
+                    raise
+    with metrics.span("document_store"):
+        document_store.delete_document(document_id)
+
+
 def upsert_chunks(
     document_id: UUID,
     chunks: Sequence[str],
@@ -33,10 +88,12 @@ def upsert_chunks(
     if len(chunks) != len(pages):
         raise ValueError("Page metadata must align with chunks.")
 
-    index = get_index()
+    # Text lives in the local document store; the index only carries ids and small filters.
+    with metrics.span("document_store"):
+        vector_ids = document_store.put_chunks(document_id, chunks, pages)
+
     vectors = []
-    for idx, (chunk, embedding, page) in enumerate(zip(chunks, embeddings, pages)):
-        vector_id = f"{document_id}:{idx}"
+    for idx, (vector_id, embedding, page) in enumerate(zip(vector_ids, embeddings, pages)):
         vectors.append(
             {
                 "id": vector_id,
@@ -45,12 +102,113 @@ def upsert_chunks(
                     "document_id": str(document_id),
                     "chunk_index": idx,
                     "page": page,
-                    "text": chunk,
                 },
             }
         )
-    if vectors:
-        index.upsert(vectors=vectors, namespace=str(document_id))
+    _upsert_vectors(vectors, namespace=str(document_id))
+
+
+def summary_namespace(document_id: UUID | str) -> str:
+    return f"{document_id}:summaries"
+
+
+def upsert_summaries(
+    document_id: UUID,
+    summaries: Sequence[dict],
+    embeddings: Sequence[list[float]],
+) -> None:
+    """Store summaries and index them in the document's summary namespace."""
+    if len(summaries) != len(embeddings):
+        raise ValueError("Summaries and embeddings must have identical length.")
+
+    with metrics.span("document_store"):
+        document_store.put_summaries(document_id, summaries)
+    vectors = [
+        {
+            "id": summary["id"],
+            "values": embedding,
+            "metadata": {
+                "document_id": str(document_id),
+                "level": summary["level"],
+                "page": summary["first_page"],
+            },
+        }
+        for summary, embedding in zip(summaries, embeddings)
+    ]
+    _upsert_vectors(vectors, namespace=summary_namespace(document_id))
+
+
+def _upsert_vectors(vectors: list[dict], namespace: str) -> None:
+    if not vectors:
+        return
+
+    index = get_index()
+    batches = batch_vectors(vectors)
+    with metrics.span("upsert"):
+        if len(batches) == 1:
+            index.upsert(vectors=batches[0], namespace=namespace)
+            return
+
+        workers = max(min(get_settings().upsert_concurrency, len(batches)), 1)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(index.upsert, vectors=batch, namespace=namespace)
+                for batch in batches
+            ]
+            for future in futures:
+                future.result()
+
+
+def hydrate_matches(matches: Sequence[dict]) -> list[dict]:
+    """Attach chunk text from the document store to query matches in one bulk lookup."""
+    stored = document_store.get_chunks([match["id"] for match in matches])
+    hydrated: list[dict] = []
+    for match in matches:
+        metadata = dict(match.get("metadata") or {})
+        record = stored.get(match["id"])
+        if record is not None:
+            metadata.setdefault("document_id", record["document_id"])
+            metadata.setdefault("chunk_index", record["chunk_index"])
+            metadata.setdefault("page", record["page"])
+            metadata["text"] = record["text"]
+        hydrated.append({"id": match["id"], "score": match.get("score", 0.0), "metadata": metadata})
+    return hydrated
+
+
+def hydrate_summaries(matches: Sequence[dict]) -> list[dict]:
+    """Like :func:`hydrate_matches`, for matches from a summary namespace."""
+    stored = document_store.get_summaries([match["id"] for match in matches])
+    hydrated: list[dict] = []
+    for match in matches:
+        record = stored.get(match["id"])
+        if record is None:
+            continue
+        metadata = {
+            "document_id": record["document_id"],
+            "chunk_index": record["position"],
+            "page": record["first_page"],
+            "pages": f"{record['first_page']}-{record['last_page']}",
+            "level": record["level"],
+            "text": record["text"],
+        }
+        hydrated.append({"id": match["id"], "score": match.get("score", 0.0), "metadata": metadata})
+    return hydrated
+
+
+def _query(query_embedding: list[float], top_k: int, namespace: str) -> list[dict]:
+    index = get_index()
+    with metrics.span("vector_query"):
+        response = resilience.call(
+            "pinecone",
+            lambda: index.query(
+                namespace=namespace,
+                vector=query_embedding,
+                top_k=top_k,
+                include_metadata=True,
+            ),
+            hedge=True,
+        )
+    return response["matches"]  # type: ignore[index]
 
 
 def similarity_search(
@@ -58,11 +216,16 @@ def similarity_search(
     top_k: int,
     namespace: str,
 ) -> list[dict]:
-    index = get_index()
-    response = index.query(
-        namespace=namespace,
-        vector=query_embedding,
-        top_k=top_k,
-        include_metadata=True,
-    )
-    return response["matches"]  # type: ignore[index]
+    matches = _query(query_embedding, top_k, namespace)
+    with metrics.span("hydrate"):
+        return hydrate_matches(matches)
+
+
+def summary_search(
+    query_embedding: list[float],
+    top_k: int,
+    document_id: UUID | str,
+) -> list[dict]:
+    matches = _query(query_embedding, top_k, summary_namespace(document_id))
+    with metrics.span("hydrate"):
+        return hydrate_summaries(matches)
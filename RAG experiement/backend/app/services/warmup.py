@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from . import document_store, metrics
+
+logger = logging.getLogger(__name__)
+
+
+def _import_pdfplumber() -> None:
+    import pdfplumber  # noqa: F401
+
+
+def _open_openai() -> None:
+    from .openai_client import get_client
+
+    get_client()
+
+
+def _open_pinecone() -> None:
+    from .vector_store import get_index
+
+    # Resolving the index host and opening the connection pool is the slow part
+    # of the first query, so make one cheap call here.
+    get_index().describe_index_stats()
+
+
+_TARGETS: dict[str, Callable[[], None]] = {
+    "pdfplumber": _import_pdfplumber,
+    "openai": _open_openai,
+    "pinecone": _open_pinecone,
+    "document_store": document_store.get_connection,
+}
+
+
+def _run(name: str, target: Callable[[], None]) -> None:
+    started = time.perf_counter()
+    try:
+        target()
+    except Exception:  # noqa: BLE001 - warm-up is best effort; the request path retries
+        logger.warning("Warm-up of %s failed", name, exc_info=True)
+        metrics.increment("warmup_failures_total", target=name)
+        return
+    metrics.set_gauge("warmup_duration_seconds", time.perf_counter() - started, target=name)
+
+
+def warm_up() -> None:
+    """Import the heavy SDKs and open every client in parallel, ignoring failures."""
+    with ThreadPoolExecutor(max_workers=len(_TARGETS)) as pool:
+        for name, target in _TARGETS.items():
+            pool.submit(_run, name, target)
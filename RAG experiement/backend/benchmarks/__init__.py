@@ -0,0 +1 @@
+"""Offline benchmarks for the RAG backend (no OpenAI or Pinecone calls)."""
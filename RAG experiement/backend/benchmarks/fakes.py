@@ -0,0 +1,274 @@
+"""Deterministic offline stand-ins for the OpenAI client and the Pinecone index.
+
+Call ``configure_environment()`` before anything imports ``app`` (settings are
+read at import time), then ``install()`` to swap the fakes into the
+``get_client()`` / ``get_index()`` singletons.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import math
+import os
+import re
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import Any, Optional, Sequence
+
+DEFAULT_DIMENSION = 256
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def configure_environment(document_store_path: Optional[str] = None) -> None:
+    """Provide placeholder credentials and an isolated document store for offline runs."""
+    os.environ.setdefault("PINECONE_API_KEY", "offline")
+    os.environ.setdefault("PINECONE_INDEX_NAME", "offline")
+    os.environ.setdefault("PINECONE_ENVIRONMENT", "offline")
+    os.environ.setdefault("OPENAI_API_KEY", "offline")
+    # Offline runs should measure our own overhead, not the scheduler's quota guesses.
+    os.environ.setdefault("OPENAI_REQUESTS_PER_MINUTE", "10000000")
+    os.environ.setdefault("OPENAI_TOKENS_PER_MINUTE", "10000000000")
+    os.environ.setdefault("OPENAI_MAX_CONCURRENCY", "64")
+    if document_store_path is None:
+        document_store_path = os.path.join(tempfile.mkdtemp(prefix="rag-bench-"), "documents.sqlite3")
+    os.environ["DOCUMENT_STORE_PATH"] = document_store_path
+
+
+def hash_embedding(text: str, dimension: int = DEFAULT_DIMENSION) -> list[float]:
+    """Signed feature-hashing bag of words, L2-normalised.
+
+    Texts that share words land close together, so retrieval quality is
+    meaningful even though no model is involved.
+    """
+    vector = [0.0] * dimension
+    for token in _TOKEN.findall(text.lower()):
+        digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+        bucket = int.from_bytes(digest[:4], "little") % dimension
+        vector[bucket] += 1.0 if digest[4] & 1 else -1.0
+    norm = math.sqrt(sum(value * value for value in vector))
+    if norm:
+        vector = [value / norm for value in vector]
+    return vector
+
+
+def _count_tokens(text: str) -> int:
+    return max(len(text) // 4, 1)
+
+
+@dataclass
+class Latency:
+    """Simulated latency: a fixed base plus a per-item component, in seconds."""
+
+    base: float = 0.0
+    per_item: float = 0.0
+
+    def sleep(self, items: int = 1) -> None:
+        delay = self.base + self.per_item * items
+        if delay > 0:
+            time.sleep(delay)
+
+
+class _RawResponse:
+    """Mimics the object returned by the SDK's ``with_raw_response`` calls."""
+
+    def __init__(self, parsed: Any, headers: Optional[dict[str, str]] = None) -> None:
+        self._parsed = parsed
+        self.headers = headers or {}
+
+    def parse(self) -> Any:
+        return self._parsed
+
+
+class _Embeddings:
+    def __init__(self, owner: FakeOpenAI) -> None:
+        self._owner = owner
+        self.with_raw_response = SimpleNamespace(create=self._create_raw)
+
+    def create(self, input: Sequence[str] | str, model: str, **_: Any) -> Any:
+        inputs = [input] if isinstance(input, str) else list(input)
+        self._owner.record("embeddings", len(inputs))
+        self._owner.embedding_latency.sleep(len(inputs))
+        data = [
+            SimpleNamespace(index=i, embedding=hash_embedding(text, self._owner.dimension))
+            for i, text in enumerate(inputs)
+        ]
+        tokens = sum(_count_tokens(text) for text in inputs)
+        return SimpleNamespace(data=data, model=model, usage=SimpleNamespace(prompt_tokens=tokens, total_tokens=tokens))
+
+    def _create_raw(self, **kwargs: Any) -> _RawResponse:
+        return _RawResponse(self.create(**kwargs))
+
+
+class _Completions:
+    def __init__(self, owner: FakeOpenAI) -> None:
+        self._owner = owner
+        self.with_raw_response = SimpleNamespace(create=self._create_raw)
+
+    def create(self, model: str, messages: list[dict[str, str]], **_: Any) -> Any:
+        prompt = "\n".join(message["content"] for message in messages)
+        prompt_tokens = _count_tokens(prompt)
+        self._owner.record("completions", 1, prompt_tokens)
+        self._owner.completion_latency.sleep(prompt_tokens)
+        # Echo the tail of the user message so the answer is deterministic and cheap.
+        content = "Echo: " + messages[-1]["content"][-self._owner.echo_chars :]
+        usage = SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=_count_tokens(content))
+        message = SimpleNamespace(role="assistant", content=content)
+        return SimpleNamespace(choices=[SimpleNamespace(index=0, message=message)], model=model, usage=usage)
+
+    def _create_raw(self, **kwargs: Any) -> _RawResponse:
+        return _RawResponse(self.create(**kwargs))
+
+
+class FakeOpenAI:
+    """Covers the subset of ``openai.OpenAI`` the backend uses."""
+
+    def __init__(
+        self,
+        dimension: int = DEFAULT_DIMENSION,
+        embedding_latency: Optional[Latency] = None,
+        completion_latency: Optional[Latency] = None,
+        echo_chars: int = 200,
+    ) -> None:
+        self.dimension = dimension
+        self.embedding_latency = embedding_latency or Latency()
+        self.completion_latency = completion_latency or Latency()
+        self.echo_chars = echo_chars
+        self.embeddings = _Embeddings(self)
+        self.chat = SimpleNamespace(completions=_Completions(self))
+        self.calls: dict[str, int] = {"embeddings": 0, "embedding_inputs": 0, "completions": 0, "prompt_tokens": 0}
+        self._lock = threading.Lock()
+
+    def record(self, kind: str, items: int, prompt_tokens: int = 0) -> None:
+        with self._lock:
+            self.calls[kind] += 1
+            if kind == "embeddings":
+                self.calls["embedding_inputs"] += items
+            self.calls["prompt_tokens"] += prompt_tokens
+
+
+def _matches_filter(metadata: dict, flt: Optional[dict]) -> bool:
+    if not flt:
+        return True
+    for key, condition in flt.items():
+        value = metadata.get(key)
+        if isinstance(condition, dict):
+            for op, expected in condition.items():
+                if op == "$eq" and value != expected:
+                    return False
+                if op == "$ne" and value == expected:
+                    return False
+                if op == "$in" and value not in expected:
+                    return False
+                if op == "$nin" and value in expected:
+                    return False
+        elif value != condition:
+            return False
+    return True
+
+
+class FakeIndex:
+    """In-memory brute-force stand-in for ``pinecone.Index``."""
+
+    def __init__(
+        self,
+        upsert_latency: Optional[Latency] = None,
+        query_latency: Optional[Latency] = None,
+    ) -> None:
+        self.upsert_latency = upsert_latency or Latency()
+        self.query_latency = query_latency or Latency()
+        self.namespaces: dict[str, dict[str, tuple[list[float], dict]]] = {}
+        self.calls: dict[str, int] = {"upsert": 0, "upserted_vectors": 0, "query": 0}
+        self._lock = threading.Lock()
+
+    def upsert(self, vectors: Sequence[dict], namespace: str = "", **_: Any) -> dict:
+        self.upsert_latency.sleep(len(vectors))
+        with self._lock:
+            self.calls["upsert"] += 1
+            self.calls["upserted_vectors"] += len(vectors)
+            store = self.namespaces.setdefault(namespace, {})
+            for vector in vectors:
+                store[vector["id"]] = (list(vector["values"]), dict(vector.get("metadata") or {}))
+        return {"upserted_count": len(vectors)}
+
+    def query(
+        self,
+        vector: Sequence[float],
+        top_k: int,
+        namespace: str = "",
+        include_metadata: bool = False,
+        filter: Optional[dict] = None,
+        **_: Any,
+    ) -> dict:
+        self.query_latency.sleep()
+        with self._lock:
+            self.calls["query"] += 1
+            items = list(self.namespaces.get(namespace, {}).items())
+        query_norm = math.sqrt(sum(value * value for value in vector)) or 1.0
+        scored = []
+        for vector_id, (values, metadata) in items:
+            if not _matches_filter(metadata, filter):
+                continue
+            norm = math.sqrt(sum(value * value for value in values)) or 1.0
+            score = sum(a * b for a, b in zip(vector, values)) / (norm * query_norm)
+            scored.append((score, vector_id, metadata))
+        scored.sort(key=lambda item: item[0], reverse=True)
+        matches = [
+            {"id": vector_id, "score": score, "metadata": dict(metadata) if include_metadata else {}}
+            for score, vector_id, metadata in scored[:top_k]
+        ]
+        return {"matches": matches, "namespace": namespace}
+
+    def delete(self, namespace: str = "", delete_all: bool = False, ids: Optional[Sequence[str]] = None, **_: Any) -> dict:
+        with self._lock:
+            if delete_all:
+                self.namespaces.pop(namespace, None)
+            else:
+                store = self.namespaces.get(namespace, {})
+                for vector_id in ids or ():
+                    store.pop(vector_id, None)
+        return {}
+
+    def describe_index_stats(self) -> dict:
+        with self._lock:
+            namespaces = {name: {"vector_count": len(store)} for name, store in self.namespaces.items()}
+        return {
+            "namespaces": namespaces,
+            "total_vector_count": sum(item["vector_count"] for item in namespaces.values()),
+        }
+
+
+def add_latency_arguments(parser: argparse.ArgumentParser) -> None:
+    group = parser.add_argument_group("simulated latency")
+    group.add_argument("--embedding-latency-ms", type=float, default=0.0)
+    group.add_argument("--embedding-latency-per-input-ms", type=float, default=0.0)
+    group.add_argument("--completion-latency-ms", type=float, default=0.0)
+    group.add_argument("--upsert-latency-ms", type=float, default=0.0)
+    group.add_argument("--query-latency-ms", type=float, default=0.0)
+
+
+def build_from_args(args: argparse.Namespace) -> tuple[FakeOpenAI, FakeIndex]:
+    client = FakeOpenAI(
+        embedding_latency=Latency(args.embedding_latency_ms / 1000, args.embedding_latency_per_input_ms / 1000),
+        completion_latency=Latency(args.completion_latency_ms / 1000),
+    )
+    index = FakeIndex(
+        upsert_latency=Latency(args.upsert_latency_ms / 1000),
+        query_latency=Latency(args.query_latency_ms / 1000),
+    )
+    return client, index
+
+
+def install(client: Optional[FakeOpenAI] = None, index: Optional[FakeIndex] = None) -> tuple[FakeOpenAI, FakeIndex]:
+    """Swap fakes into the backend's client singletons and return them."""
+    from app.services import openai_client, vector_store
+
+    client = client or FakeOpenAI()
+    index = index or FakeIndex()
+    openai_client._client = client  # type: ignore[assignment]
+    vector_store._index = index  # type: ignore[assignment]
+    return client, index
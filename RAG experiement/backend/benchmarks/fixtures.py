@@ -0,0 +1,150 @@
+"""Generated PDF fixture corpus for offline benchmarks.
+
+PDFs are written by a tiny built-in writer (Helvetica text only) so the corpus
+needs no extra dependencies and is byte-for-byte reproducible. Every document
+contains a set of planted facts, which gives later benchmarks a labelled
+question set with known answers.
+"""
+
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass
+from pathlib import Path
+
+FIXTURE_DIR = Path(__file__).resolve().parent / ".fixtures"
+
+LINES_PER_PAGE = 55
+WORDS_PER_LINE = 14
+
+# Corpus name -> page count.
+CORPUS_SIZES = {"small": 2, "medium": 8, "large": 30}
+
+_VOCABULARY = (
+    "agreement party services delivery schedule revenue margin quarter region customer supplier "
+    "warranty liability audit report board committee policy review budget forecast capital risk "
+    "compliance operations platform release roadmap pricing contract renewal invoice payment "
+    "security incident vendor analysis market growth strategy product launch support training "
+    "inventory logistics quality standard process metric target benchmark portfolio investment"
+).split()
+
+
+@dataclass(frozen=True)
+class PlantedFact:
+    sentence: str
+    question: str
+    answer: str
+
+
+FACTS = (
+    PlantedFact(
+        "The termination notice period is sixty days from written notice.",
+        "What is the termination notice period?",
+        "sixty days",
+    ),
+    PlantedFact(
+        "The annual license fee is forty two thousand dollars payable in advance.",
+        "How much is the annual license fee?",
+        "forty two thousand dollars",
+    ),
+    PlantedFact(
+        "The governing law of this agreement is the law of the State of Delaware.",
+        "Which law governs the agreement?",
+        "State of Delaware",
+    ),
+    PlantedFact(
+        "The warranty period for hardware components is eighteen months after delivery.",
+        "How long is the hardware warranty period?",
+        "eighteen months",
+    ),
+    PlantedFact(
+        "The primary data center is located in Frankfurt with a backup site in Dublin.",
+        "Where is the primary data center located?",
+        "Frankfurt",
+    ),
+    PlantedFact(
+        "Invoices are due within thirty business days of receipt.",
+        "When are invoices due?",
+        "thirty business days",
+    ),
+)
+
+
+@dataclass(frozen=True)
+class Fixture:
+    name: str
+    path: Path
+    pages: int
+    # 1-based page number on which each planted fact appears, aligned with FACTS.
+    fact_pages: tuple[int, ...]
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_pdf(path: Path, pages: list[list[str]]) -> None:
+    """Write a minimal, valid PDF with one Helvetica text block per page."""
+    objects: list[bytes] = []
+    page_count = len(pages)
+    font_id = 3
+    first_page_id = 4
+    page_ids = [first_page_id + 2 * i for i in range(page_count)]
+
+    objects.append(b"<< /Type /Catalog /Pages 2 0 R >>")
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids)
+    objects.append(f"<< /Type /Pages /Kids [{kids}] /Count {page_count} >>".encode())
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    for page_id, lines in zip(page_ids, pages):
+        body = ["BT", "/F1 10 Tf", "12 TL", "50 760 Td"]
+        for line in lines:
+            body.append(f"({_escape(line)}) Tj T*")
+        body.append("ET")
+        stream = "\n".join(body).encode("latin-1")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 {font_id} 0 R >> >> /Contents {page_id + 1} 0 R >>".encode()
+        )
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, obj in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode() + obj + b"\nendobj\n"
+    xref_at = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref_at}\n%%EOF\n".encode()
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(bytes(out))
+
+
+def _filler_line(rng: random.Random) -> str:
+    words = [rng.choice(_VOCABULARY) for _ in range(WORDS_PER_LINE)]
+    return " ".join(words).capitalize() + "."
+
+
+def build_fixture(name: str, page_count: int, seed: int = 0) -> Fixture:
+    rng = random.Random(f"{name}:{seed}")
+    fact_pages = tuple(
+        1 + (i * page_count) // len(FACTS) if page_count > 1 else 1 for i in range(len(FACTS))
+    )
+    pages: list[list[str]] = []
+    for page_number in range(1, page_count + 1):
+        lines = [_filler_line(rng) for _ in range(LINES_PER_PAGE)]
+        facts_here = [fact for fact, fact_page in zip(FACTS, fact_pages) if fact_page == page_number]
+        for fact, line_number in zip(facts_here, rng.sample(range(LINES_PER_PAGE), len(facts_here))):
+            lines[line_number] = fact.sentence
+        pages.append(lines)
+
+    path = FIXTURE_DIR / f"{name}-{page_count}p-s{seed}.pdf"
+    if not path.exists():
+        write_pdf(path, pages)
+    return Fixture(name=name, path=path, pages=page_count, fact_pages=fact_pages)
+
+
+def build_corpus(sizes: dict[str, int] | None = None, seed: int = 0) -> list[Fixture]:
+    return [build_fixture(name, pages, seed) for name, pages in (sizes or CORPUS_SIZES).items()]
@@ -0,0 +1,90 @@
+"""Check the cold-start import cost of ``app.main`` against a budget.
+
+Usage (from ``backend/``)::
+
+    python -m benchmarks.import_budget
+    python -m benchmarks.import_budget --budget-ms 900 --top 15
+
+Runs ``python -X importtime -c "import app.main"`` in a fresh interpreter
+(placeholder credentials, no network) and parses the cumulative times it
+prints. Exits non-zero when the import exceeds ``--budget-ms`` or when a
+module that should only load on first use (the OpenAI and Pinecone SDKs,
+pdfplumber) is imported eagerly, so it can gate CI.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Optional
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Top-level packages that must stay out of the import graph of app.main.
+DEFERRED_MODULES = ("openai", "pinecone", "pdfplumber")
+
+_PLACEHOLDER_ENV = {
+    "PINECONE_API_KEY": "import-budget",
+    "PINECONE_INDEX_NAME": "import-budget",
+    "PINECONE_ENVIRONMENT": "import-budget",
+    "OPENAI_API_KEY": "import-budget",
+}
+
+
+def measure_imports(target: str = "app.main") -> dict[str, float]:
+    """Return cumulative import time in milliseconds for every module loaded by ``target``."""
+    env = {**os.environ, **_PLACEHOLDER_ENV}
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Importing {target} failed:\n{completed.stderr}")
+
+    cumulative: dict[str, float] = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:") :].split("|")
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue  # the header row
+        module = fields[2].strip()
+        cumulative[module] = int(fields[1]) / 1000.0
+    return cumulative
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=1000.0, help="Maximum cumulative import time of app.main.")
+    parser.add_argument("--top", type=int, default=10, help="Slowest modules to list.")
+    args = parser.parse_args(argv)
+
+    cumulative = measure_imports()
+    total = cumulative.get("app.main", 0.0)
+    print(f"{'module':<48} {'cumulative ms':>14}")
+    for module, elapsed in sorted(cumulative.items(), key=lambda item: item[1], reverse=True)[: args.top]:
+        print(f"{module:<48} {elapsed:>14.1f}")
+
+    failures = []
+    if total > args.budget_ms:
+        failures.append(f"import app.main took {total:.0f} ms (budget {args.budget_ms:.0f} ms)")
+    eager = sorted({module.split(".")[0] for module in cumulative} & set(DEFERRED_MODULES))
+    if eager:
+        failures.append(f"imported eagerly: {', '.join(eager)}")
+
+    print()
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if not failures:
+        print(f"OK: import app.main took {total:.0f} ms (budget {args.budget_ms:.0f} ms)")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
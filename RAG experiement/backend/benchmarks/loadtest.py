@@ -0,0 +1,229 @@
+"""Concurrent load test for the FastAPI app with mixed upload / QA traffic.
+
+Usage (from ``backend/``)::
+
+    # In-process: the ASGI app runs on this event loop with the offline fakes.
+    python -m benchmarks.loadtest --concurrency 1,4,16 --stage-seconds 10 --completion-latency-ms 300
+
+    # Over localhost against ``python -m benchmarks.serve`` (or any running instance).
+    python -m benchmarks.loadtest --base-url http://127.0.0.1:8000 --concurrency 8,32
+
+Each concurrency level runs for ``--stage-seconds``. Every virtual user loops,
+choosing an upload with probability ``--upload-ratio`` and a question
+otherwise. The report gives throughput, p50/p95/p99 latency and error rate
+per endpoint and level. In-process runs also report event-loop lag, which
+jumps when a handler blocks the loop.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Optional
+
+from . import fakes
+from .run import RESULTS_DIR, _git_revision, percentile
+
+UPLOAD_PATH = "/api/uploads/pdf"
+QA_PATH = "/api/chat/qa"
+_LAG_INTERVAL = 0.01
+
+
+@dataclass
+class EndpointStats:
+    latencies: list[float] = field(default_factory=list)
+    errors: int = 0
+    statuses: dict[int, int] = field(default_factory=lambda: defaultdict(int))
+
+    def summary(self, seconds: float) -> dict[str, Any]:
+        count = len(self.latencies)
+        return {
+            "requests": count,
+            "throughput_rps": count / seconds if seconds > 0 else 0.0,
+            "p50_ms": percentile(self.latencies, 50) * 1000,
+            "p95_ms": percentile(self.latencies, 95) * 1000,
+            "p99_ms": percentile(self.latencies, 99) * 1000,
+            "error_rate": self.errors / count if count else 0.0,
+            "statuses": dict(self.statuses),
+        }
+
+
+async def _upload(client: Any, pdf_bytes: bytes) -> Any:
+    files = {"file": ("loadtest.pdf", pdf_bytes, "application/pdf")}
+    return await client.post(UPLOAD_PATH, files=files)
+
+
+async def _virtual_user(
+    client: Any,
+    deadline: float,
+    rng: random.Random,
+    args: argparse.Namespace,
+    pdf_bytes: bytes,
+    document_ids: list[str],
+    questions: list[str],
+    stats: dict[str, EndpointStats],
+) -> None:
+    while time.perf_counter() < deadline:
+        is_upload = rng.random() < args.upload_ratio
+        endpoint = UPLOAD_PATH if is_upload else QA_PATH
+        started = time.perf_counter()
+        try:
+            if is_upload:
+                response = await _upload(client, pdf_bytes)
+            else:
+                payload = {"question": rng.choice(questions), "document_ids": [rng.choice(document_ids)]}
+                response = await client.post(QA_PATH, json=payload)
+            status = response.status_code
+        except Exception:  # noqa: BLE001 - transport failures count as errors
+            status = 0
+        elapsed = time.perf_counter() - started
+
+        bucket = stats[endpoint]
+        bucket.latencies.append(elapsed)
+        bucket.statuses[status] += 1
+        if status == 0 or status >= 400:
+            bucket.errors += 1
+        elif is_upload:
+            document_ids.append(response.json()["document_id"])
+
+
+async def _measure_loop_lag(stop: asyncio.Event, samples: list[float]) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(_LAG_INTERVAL)
+        samples.append(max(time.perf_counter() - started - _LAG_INTERVAL, 0.0))
+
+
+async def run_load(args: argparse.Namespace) -> list[dict[str, Any]]:
+    import httpx
+
+    from .fixtures import FACTS, build_fixture
+
+    pdf_bytes = build_fixture("loadtest", args.pages).path.read_bytes()
+    questions = [fact.question for fact in FACTS]
+
+    if args.base_url:
+        transport = None
+        base_url = args.base_url
+        in_process = False
+    else:
+        fakes.install(*fakes.build_from_args(args))
+        from app.main import app
+
+        transport = httpx.ASGITransport(app=app)
+        base_url = "http://loadtest"
+        in_process = True
+
+    levels = [int(level) for level in args.concurrency.split(",")]
+    timeout = httpx.Timeout(args.timeout)
+    limits = httpx.Limits(max_connections=max(levels) * 2)
+    rows: list[dict[str, Any]] = []
+    async with httpx.AsyncClient(transport=transport, base_url=base_url, timeout=timeout, limits=limits) as client:
+        seed = await _upload(client, pdf_bytes)
+        seed.raise_for_status()
+        document_ids = [seed.json()["document_id"]]
+
+        for level in levels:
+            stats: dict[str, EndpointStats] = defaultdict(EndpointStats)
+            lag_samples: list[float] = []
+            stop = asyncio.Event()
+            lag_task = asyncio.create_task(_measure_loop_lag(stop, lag_samples)) if in_process else None
+
+            started = time.perf_counter()
+            deadline = started + args.stage_seconds
+            users = [
+                _virtual_user(
+                    client,
+                    deadline,
+                    random.Random(f"{args.seed}:{level}:{user}"),
+                    args,
+                    pdf_bytes,
+                    document_ids,
+                    questions,
+                    stats,
+                )
+                for user in range(level)
+            ]
+            await asyncio.gather(*users)
+            elapsed = time.perf_counter() - started
+            stop.set()
+            if lag_task is not None:
+                await lag_task
+
+            for endpoint, endpoint_stats in sorted(stats.items()):
+                row = {"concurrency": level, "endpoint": endpoint, "seconds": elapsed, **endpoint_stats.summary(elapsed)}
+                if in_process:
+                    row["loop_lag_p99_ms"] = percentile(lag_samples, 99) * 1000
+                    row["loop_lag_max_ms"] = max(lag_samples, default=0.0) * 1000
+                rows.append(row)
+    return rows
+
+
+def print_table(rows: list[dict[str, Any]]) -> None:
+    header = (
+        f"{'conc':>5} {'endpoint':<18} {'reqs':>7} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} "
+        f"{'p99 ms':>9} {'errors':>7} {'lag p99':>9}"
+    )
+    print(header)
+    print("-" * len(header))
+    for row in rows:
+        lag = f"{row['loop_lag_p99_ms']:>9.1f}" if "loop_lag_p99_ms" in row else f"{'-':>9}"
+        print(
+            f"{row['concurrency']:>5} {row['endpoint']:<18} {row['requests']:>7} {row['throughput_rps']:>9.1f} "
+            f"{row['p50_ms']:>9.1f} {row['p95_ms']:>9.1f} {row['p99_ms']:>9.1f} "
+            f"{row['error_rate']:>6.1%} {lag}"
+        )
+
+
+def parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", help="Target a running server instead of the in-process app.")
+    parser.add_argument("--concurrency", default="1,4,16", help="Comma-separated concurrency ramp.")
+    parser.add_argument("--stage-seconds", type=float, default=10.0)
+    parser.add_argument("--upload-ratio", type=float, default=0.1)
+    parser.add_argument("--pages", type=int, default=4, help="Pages in the uploaded fixture PDF.")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--answer-cache", action="store_true", help="Leave the answer cache on (off by default).")
+    parser.add_argument("--output", type=Path, default=RESULTS_DIR)
+    fakes.add_latency_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    args = parse_args(argv)
+    if not args.answer_cache:
+        # Repeated fixture questions would otherwise measure the cache, not the pipeline.
+        os.environ.setdefault("ANSWER_CACHE_ENABLED", "false")
+    fakes.configure_environment()
+
+    rows = asyncio.run(run_load(args))
+    print_table(rows)
+
+    revision = _git_revision()
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    payload = {
+        "revision": revision,
+        "created_at": stamp,
+        "target": args.base_url or "in-process",
+        "parameters": {key: str(value) for key, value in vars(args).items()},
+        "results": rows,
+    }
+    args.output.mkdir(parents=True, exist_ok=True)
+    path = args.output / f"loadtest-{stamp}-{revision}.json"
+    path.write_text(json.dumps(payload, indent=2))
+    print(f"\nSaved {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
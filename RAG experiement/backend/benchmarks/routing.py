@@ -0,0 +1,65 @@
+"""Check which questions are routed to the summary index.
+
+Usage (from ``backend/``)::
+
+    python -m benchmarks.routing
+
+Runs ``is_broad_question`` over whole-document questions, which should be
+answered from summaries, and specific lookups that only mention a cue word
+("overview", "summary", "about", "key findings"), plus the planted-fact
+questions of the benchmark corpus, which should go to chunk retrieval.
+Exits non-zero on any misrouted question, so it can gate CI.
+"""
+
+from __future__ import annotations
+
+import sys
+from typing import Optional
+
+from .fixtures import FACTS
+
+BROAD_QUESTIONS = (
+    "What is this report about?",
+    "what's it about",
+    "Summarize the key findings",
+    "Summarise this document, please.",
+    "summarize",
+    "Can you give me a short summary of the paper?",
+    "Give an overview of the document",
+    "Overview",
+    "TL;DR",
+    "What is the gist?",
+    "What are the main points?",
+    "What are the key takeaways of this report?",
+    "What does this document cover?",
+)
+
+SPECIFIC_QUESTIONS = (
+    "What does the overview say about pricing?",
+    "What is the overview section's budget?",
+    "What is the total in the summary table?",
+    "Who wrote the executive summary?",
+    "Is there a summary of the warranty terms?",
+    "Summarize the revenue figures in section 3",
+    "What is the main point of contact's email?",
+    "What are the key findings about revenue in Q3?",
+    "What does the contract say about termination?",
+    "What is the report's conclusion about Delaware law?",
+    *(fact.question for fact in FACTS),
+)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    from app.services.summaries import is_broad_question
+
+    failures = [f"routed to chunks: {question!r}" for question in BROAD_QUESTIONS if not is_broad_question(question)]
+    failures += [f"routed to summaries: {question!r}" for question in SPECIFIC_QUESTIONS if is_broad_question(question)]
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if not failures:
+        print(f"OK: {len(BROAD_QUESTIONS)} broad and {len(SPECIFIC_QUESTIONS)} specific questions routed as expected")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
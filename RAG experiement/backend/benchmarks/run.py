@@ -0,0 +1,276 @@
+"""Offline stage-level benchmarks for the RAG backend.
+
+Usage (from ``backend/``)::
+
+    python -m benchmarks.run
+    python -m benchmarks.run --sizes small,medium --repeat 5 --embedding-latency-ms 40
+    python -m benchmarks.run --compare benchmarks/results/<previous>.json
+    python -m benchmarks.run --completion-latency-ms 800   # generated vs extractive QA
+
+Every stage runs against the deterministic fakes in ``benchmarks.fakes``, so
+the numbers reflect the backend's own overhead plus whatever latency is
+simulated on the command line. Results are written as JSON so runs on
+different commits can be compared.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from . import fakes
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+
+def measure(fn: Callable[[], Any], repeat: int, trace_memory: bool = True) -> tuple[Any, dict[str, float]]:
+    """Time ``fn`` over ``repeat`` runs, then sample its tracemalloc peak in one extra run.
+
+    Memory is traced separately because tracemalloc slows allocation-heavy
+    code (pdfplumber in particular) enough to distort the timings.
+    """
+    durations: list[float] = []
+    result: Any = None
+    # Don't bill the previous stage's garbage to this one.
+    gc.collect()
+    for _ in range(max(repeat, 1)):
+        started = time.perf_counter()
+        result = fn()
+        durations.append(time.perf_counter() - started)
+    peak = 0
+    if trace_memory:
+        tracemalloc.start()
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return result, {
+        "best_seconds": min(durations),
+        "mean_seconds": statistics.fmean(durations),
+        "peak_memory_bytes": peak,
+    }
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = min(int(round(pct / 100.0 * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[rank]
+
+
+def _rate(amount: float, seconds: float) -> float:
+    return amount / seconds if seconds > 0 else 0.0
+
+
+def run_benchmarks(args: argparse.Namespace) -> list[dict[str, Any]]:
+    from uuid import uuid4
+
+    from app.config import get_settings
+    from app.services import embeddings, ingestion, qa, vector_store
+
+    from .fixtures import CORPUS_SIZES, FACTS, build_corpus
+
+    sizes = {name: CORPUS_SIZES[name] for name in args.sizes.split(",")} if args.sizes else None
+    corpus = build_corpus(sizes)
+    client, index = fakes.install(*fakes.build_from_args(args))
+
+    results: list[dict[str, Any]] = []
+    for fixture in corpus:
+        file_bytes = fixture.path.read_bytes()
+
+        pages, stats = measure(lambda: ingestion._extract_text_from_pdf(file_bytes), args.repeat, not args.no_memory)
+        results.append(
+            {
+                "stage": "extract",
+                "fixture": fixture.name,
+                **stats,
+                "pages_per_second": _rate(len(pages), stats["best_seconds"]),
+                "kilobytes_per_second": _rate(len(file_bytes) / 1024, stats["best_seconds"]),
+            }
+        )
+
+        (chunks, page_numbers), stats = measure(lambda: ingestion.chunk_pages(pages), args.repeat, not args.no_memory)
+        results.append(
+            {
+                "stage": "chunk",
+                "fixture": fixture.name,
+                **stats,
+                "chunks": len(chunks),
+                "chunks_per_second": _rate(len(chunks), stats["best_seconds"]),
+            }
+        )
+
+        requests_before = client.calls["embeddings"]
+        vectors, stats = measure(lambda: embeddings.embed_chunks(chunks), args.repeat, not args.no_memory)
+        results.append(
+            {
+                "stage": "embed",
+                "fixture": fixture.name,
+                **stats,
+                "requests": client.calls["embeddings"] - requests_before,
+                "chunks_per_second": _rate(len(chunks), stats["best_seconds"]),
+            }
+        )
+
+        document_id = uuid4()
+        upserts_before = index.calls["upsert"]
+        _, stats = measure(
+            lambda: vector_store.upsert_chunks(document_id, chunks, vectors, page_numbers),
+            args.repeat,
+            not args.no_memory,
+        )
+        results.append(
+            {
+                "stage": "upsert",
+                "fixture": fixture.name,
+                **stats,
+                "upsert_requests": index.calls["upsert"] - upserts_before,
+                "vectors_per_second": _rate(len(vectors), stats["best_seconds"]),
+            }
+        )
+
+        query_vectors = embeddings.embed_queries([fact.question for fact in FACTS])
+        latencies: list[float] = []
+
+        def retrieve() -> None:
+            for query_vector in query_vectors:
+                started = time.perf_counter()
+                vector_store.similarity_search(query_vector, top_k=6, namespace=str(document_id))
+                latencies.append(time.perf_counter() - started)
+
+        _, stats = measure(retrieve, args.repeat, not args.no_memory)
+        results.append(
+            {
+                "stage": "retrieval",
+                "fixture": fixture.name,
+                **stats,
+                "queries_per_second": _rate(len(query_vectors), stats["best_seconds"]),
+                "p50_ms": percentile(latencies, 50) * 1000,
+                "p95_ms": percentile(latencies, 95) * 1000,
+            }
+        )
+
+        # The same questions answered with and without the extractive fast path.
+        settings = get_settings()
+        enabled = settings.extractive_answers_enabled
+        for path in ("generated", "extractive"):
+            settings.extractive_answers_enabled = path == "extractive"
+            responses: list[Any] = []
+            latencies = []
+
+            def answer_all() -> None:
+                responses.clear()
+                for fact in FACTS:
+                    started = time.perf_counter()
+                    responses.append(qa.answer_question(fact.question, [document_id]))
+                    latencies.append(time.perf_counter() - started)
+
+            _, stats = measure(answer_all, args.repeat, not args.no_memory)
+            extracted = [
+                (fact, response) for fact, response in zip(FACTS, responses) if response.answer_path == "extractive"
+            ]
+            correct = sum(fact.answer.lower() in response.answer.lower() for fact, response in extracted)
+            results.append(
+                {
+                    "stage": f"qa_{path}",
+                    "fixture": fixture.name,
+                    **stats,
+                    "questions_per_second": _rate(len(FACTS), stats["best_seconds"]),
+                    "p50_ms": percentile(latencies, 50) * 1000,
+                    "p95_ms": percentile(latencies, 95) * 1000,
+                    "extractive_rate": len(extracted) / len(FACTS),
+                    "extractive_precision": correct / len(extracted) if extracted else 0.0,
+                }
+            )
+        settings.extractive_answers_enabled = enabled
+    return results
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _key(result: dict[str, Any]) -> tuple[str, str]:
+    return result["stage"], result.get("fixture", "")
+
+
+def print_table(results: list[dict[str, Any]], baseline: Optional[list[dict[str, Any]]] = None) -> None:
+    previous = {_key(result): result for result in baseline or []}
+    header = f"{'stage':<10} {'fixture':<8} {'best ms':>10} {'peak KiB':>10}  throughput"
+    if baseline is not None:
+        header += "  (vs baseline)"
+    print(header)
+    print("-" * len(header))
+    for result in results:
+        throughput = ", ".join(
+            f"{key}={value:,.1f}" for key, value in result.items() if key.endswith("_per_second")
+        )
+        line = (
+            f"{result['stage']:<10} {result.get('fixture', ''):<8} "
+            f"{result['best_seconds'] * 1000:>10.2f} {result['peak_memory_bytes'] / 1024:>10.0f}  {throughput}"
+        )
+        before = previous.get(_key(result))
+        if before and before["best_seconds"] > 0:
+            change = (result["best_seconds"] - before["best_seconds"]) / before["best_seconds"] * 100
+            line += f"  ({change:+.1f}% time)"
+        print(line)
+
+
+def parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="", help="Comma-separated corpus sizes (small,medium,large).")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc sampling run.")
+    fakes.add_latency_arguments(parser)
+    parser.add_argument("--output", type=Path, default=RESULTS_DIR, help="Directory for the JSON results.")
+    parser.add_argument("--compare", type=Path, help="Previous results JSON to diff against.")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    args = parse_args(argv)
+    # Repeated questions would otherwise be served from the answer cache after the first run.
+    os.environ.setdefault("ANSWER_CACHE_ENABLED", "false")
+    # Settings are cached on first use, so this must run before any app code.
+    fakes.configure_environment()
+    results = run_benchmarks(args)
+
+    baseline = None
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())["results"]
+    print_table(results, baseline)
+
+    revision = _git_revision()
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    payload = {
+        "revision": revision,
+        "created_at": stamp,
+        "python": platform.python_version(),
+        "parameters": {key: str(value) for key, value in vars(args).items()},
+        "results": results,
+    }
+    args.output.mkdir(parents=True, exist_ok=True)
+    path = args.output / f"{stamp}-{revision}.json"
+    path.write_text(json.dumps(payload, indent=2))
+    print(f"\nSaved {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
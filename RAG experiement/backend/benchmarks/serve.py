@@ -0,0 +1,40 @@
+"""Run the FastAPI app on localhost with the offline fakes installed.
+
+Usage (from ``backend/``)::
+
+    python -m benchmarks.serve --port 8000 --embedding-latency-ms 40 --completion-latency-ms 300
+
+Pair with ``python -m benchmarks.loadtest --base-url http://127.0.0.1:8000``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+from typing import Optional
+
+from . import fakes
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--answer-cache", action="store_true", help="Leave the answer cache on (off by default).")
+    fakes.add_latency_arguments(parser)
+    args = parser.parse_args(argv)
+
+    if not args.answer_cache:
+        os.environ.setdefault("ANSWER_CACHE_ENABLED", "false")
+    fakes.configure_environment()
+    fakes.install(*fakes.build_from_args(args))
+
+    import uvicorn
+
+    from app.main import app
+
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
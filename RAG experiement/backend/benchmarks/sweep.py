@@ -0,0 +1,196 @@
+"""Sweep chunking and retrieval settings over the fixture corpus.
+
+Usage (from ``backend/``)::
+
+    python -m benchmarks.sweep
+    python -m benchmarks.sweep --chunk-sizes 200,400,800 --overlaps 0,60,120 --contexts 2,4,6 --sizes small,medium
+
+For every ``CHUNK_SIZE`` / ``CHUNK_OVERLAP`` pair the corpus is re-chunked,
+embedded and indexed. Each ``MAX_CONTEXT_CHUNKS`` value is then scored on the
+planted-fact questions. Pages are extracted once and embeddings are cached by
+text, so only chunking, indexing and retrieval are repeated. The table marks
+the Pareto-optimal rows over every objective in ``OBJECTIVES``: no other row
+is at least as good on all of them and better on one.
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Optional, Sequence
+from uuid import uuid4
+
+from . import fakes
+from .run import RESULTS_DIR, _git_revision, percentile
+
+
+def _ints(value: str) -> list[int]:
+    return [int(item) for item in value.split(",") if item]
+
+
+class EmbeddingCache:
+    """Embed each distinct text once across the whole sweep."""
+
+    def __init__(self) -> None:
+        self.vectors: dict[str, list[float]] = {}
+
+    def embed(self, texts: Sequence[str]) -> list[list[float]]:
+        from app.services.embeddings import embed_chunks
+
+        missing = list(dict.fromkeys(text for text in texts if text not in self.vectors))
+        for text, vector in zip(missing, embed_chunks(missing)):
+            self.vectors[text] = vector
+        return [self.vectors[text] for text in texts]
+
+
+# Row key and whether higher is better. Timings are wall-clock measurements, so
+# rows that differ only by noise in them can both end up on the front.
+OBJECTIVES: tuple[tuple[str, bool], ...] = (
+    ("hit_rate", True),
+    ("prompt_tokens_per_question", False),
+    ("indexed_tokens", False),
+    ("retrieval_p95_ms", False),
+    ("ingest_seconds", False),
+)
+
+
+def dominates(left: dict[str, Any], right: dict[str, Any]) -> bool:
+    deltas = [(left[key] - right[key]) * (1 if higher else -1) for key, higher in OBJECTIVES]
+    return all(delta >= 0 for delta in deltas) and any(delta > 0 for delta in deltas)
+
+
+def mark_pareto(rows: list[dict[str, Any]]) -> None:
+    for row in rows:
+        row["pareto"] = not any(dominates(other, row) for other in rows if other is not row)
+
+
+def run_sweep(args: argparse.Namespace) -> list[dict[str, Any]]:
+    from app.config import get_settings
+    from app.services import ingestion, qa, vector_store
+    from app.services.scheduler import estimate_tokens
+
+    from .fixtures import CORPUS_SIZES, FACTS, build_corpus
+
+    sizes = {name: CORPUS_SIZES[name] for name in args.sizes.split(",")} if args.sizes else None
+    corpus = build_corpus(sizes)
+    fakes.install(*fakes.build_from_args(args))
+    cache = EmbeddingCache()
+    settings = get_settings()
+
+    pages_by_fixture = {fixture.name: ingestion._extract_text_from_pdf(fixture.path.read_bytes()) for fixture in corpus}
+    question_vectors = cache.embed([fact.question for fact in FACTS])
+
+    rows: list[dict[str, Any]] = []
+    for chunk_size, chunk_overlap in itertools.product(_ints(args.chunk_sizes), _ints(args.overlaps)):
+        if chunk_overlap >= chunk_size:
+            continue
+        settings.chunk_size = chunk_size
+        settings.chunk_overlap = chunk_overlap
+
+        namespaces: list[str] = []
+        chunk_count = 0
+        indexed_tokens = 0
+        ingest_seconds = 0.0
+        for fixture in corpus:
+            started = time.perf_counter()
+            chunks, page_numbers = ingestion.chunk_pages(pages_by_fixture[fixture.name])
+            vectors = cache.embed(chunks)
+            document_id = uuid4()
+            vector_store.upsert_chunks(document_id, chunks, vectors, page_numbers)
+            ingest_seconds += time.perf_counter() - started
+            namespaces.append(str(document_id))
+            chunk_count += len(chunks)
+            indexed_tokens += estimate_tokens(*chunks)
+
+        for max_context in _ints(args.contexts):
+            hits = 0
+            prompt_tokens = 0
+            latencies: list[float] = []
+            for namespace in namespaces:
+                for fact, query_vector in zip(FACTS, question_vectors):
+                    started = time.perf_counter()
+                    matches = vector_store.similarity_search(query_vector, top_k=max_context, namespace=namespace)
+                    latencies.append(time.perf_counter() - started)
+                    context, _ = qa.format_context(matches)
+                    prompt_tokens += estimate_tokens(qa.BASE_PROMPT.format(context=context, question=fact.question))
+                    hits += any(fact.answer in match["metadata"].get("text", "") for match in matches)
+            questions = len(namespaces) * len(FACTS)
+            rows.append(
+                {
+                    "chunk_size": chunk_size,
+                    "chunk_overlap": chunk_overlap,
+                    "max_context_chunks": max_context,
+                    "chunks": chunk_count,
+                    "indexed_tokens": indexed_tokens,
+                    "ingest_seconds": ingest_seconds,
+                    "retrieval_p50_ms": percentile(latencies, 50) * 1000,
+                    "retrieval_p95_ms": percentile(latencies, 95) * 1000,
+                    "prompt_tokens_per_question": prompt_tokens / questions,
+                    "hit_rate": hits / questions,
+                }
+            )
+    mark_pareto(rows)
+    return rows
+
+
+def print_table(rows: list[dict[str, Any]]) -> None:
+    header = (
+        f"{'':1} {'size':>5} {'overlap':>7} {'k':>3} {'chunks':>7} {'idx tok':>8} {'ingest s':>9} "
+        f"{'p95 ms':>7} {'prompt tok':>10} {'hit rate':>8}"
+    )
+    print(header)
+    print("-" * len(header))
+    ordered = sorted(rows, key=lambda row: (-row["hit_rate"], row["prompt_tokens_per_question"]))
+    for row in ordered:
+        print(
+            f"{'*' if row['pareto'] else '':1} {row['chunk_size']:>5} {row['chunk_overlap']:>7} "
+            f"{row['max_context_chunks']:>3} {row['chunks']:>7} {row['indexed_tokens']:>8} "
+            f"{row['ingest_seconds']:>9.3f} {row['retrieval_p95_ms']:>7.2f} "
+            f"{row['prompt_tokens_per_question']:>10.0f} {row['hit_rate']:>8.1%}"
+        )
+    print(
+        "\n* Pareto-optimal on hit rate, prompt tokens per question, indexed tokens, "
+        "p95 retrieval latency and ingest time."
+    )
+
+
+def parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunk-sizes", default="200,400,800", help="CHUNK_SIZE values, in words.")
+    parser.add_argument("--overlaps", default="0,60,120", help="CHUNK_OVERLAP values, in words.")
+    parser.add_argument("--contexts", default="2,4,6,10", help="MAX_CONTEXT_CHUNKS values.")
+    parser.add_argument("--sizes", default="small,medium", help="Comma-separated corpus sizes (small,medium,large).")
+    parser.add_argument("--output", type=Path, default=RESULTS_DIR)
+    fakes.add_latency_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    args = parse_args(argv)
+    fakes.configure_environment()
+    rows = run_sweep(args)
+    print_table(rows)
+
+    revision = _git_revision()
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    payload = {
+        "revision": revision,
+        "created_at": stamp,
+        "parameters": {key: str(value) for key, value in vars(args).items()},
+        "objectives": {key: "max" if higher else "min" for key, higher in OBJECTIVES},
+        "results": rows,
+    }
+    args.output.mkdir(parents=True, exist_ok=True)
+    path = args.output / f"sweep-{stamp}-{revision}.json"
+    path.write_text(json.dumps(payload, indent=2))
+    print(f"\nSaved {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
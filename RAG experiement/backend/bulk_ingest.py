@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""Bulk-ingest a directory of PDFs without going through the upload endpoint.
+
+Usage (from ``backend/``)::
+
+    python bulk_ingest.py /path/to/pdfs
+    python bulk_ingest.py /path/to/pdfs --workers 8 --manifest onboarding.jsonl
+
+PDFs are found recursively and deduplicated by SHA-256. Text extraction and
+chunking run in a process pool. Chunks from consecutive documents share
+embedding requests so each one carries a full batch, and each document is
+upserted once all of its chunks are embedded. Every finished document is
+appended to the manifest. Re-running with the same manifest skips files that
+are already ingested, so an interrupted run resumes where it stopped.
+
+Document ids are derived from the file hash. A file that was upserted but not
+yet recorded when a run stopped is ingested again under the same id. Its
+earlier chunks, summaries and vectors are cleared before the new ones are
+upserted, so nothing is orphaned even if the chunk settings changed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import sys
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterator, Optional
+from uuid import UUID
+
+from fastapi import HTTPException
+
+from app.config import get_settings
+from app.services import ingestion
+from app.services.answer_cache import invalidate_document
+from app.services.embeddings import MAX_INPUTS_PER_REQUEST, embed_chunks
+from app.services.summaries import build_summary_index
+from app.services.vector_store import clear_document, upsert_chunks
+
+DEFAULT_MANIFEST = Path("bulk-ingest-manifest.jsonl")
+
+
+@dataclass
+class _Document:
+    path: Path
+    sha256: str
+    chunks: list[str]
+    pages: list[int]
+    page_text: list[tuple[int, str]]
+    document_id: UUID = field(init=False)
+    embeddings: list[Optional[list[float]]] = field(default_factory=list)
+    remaining: int = 0
+
+    def __post_init__(self) -> None:
+        # Derived from the content, so a document re-ingested after an interrupted run keeps its id.
+        self.document_id = ingestion.document_id_for(self.sha256)
+        self.embeddings = [None] * len(self.chunks)
+        self.remaining = len(self.chunks)
+
+
+@dataclass
+class _Totals:
+    documents: int = 0
+    pages: int = 0
+    chunks: int = 0
+    duplicates: int = 0
+    resumed: int = 0
+    failed: int = 0
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for block in iter(lambda: handle.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def find_pdfs(root: Path) -> list[Path]:
+    return sorted(path for path in root.rglob("*") if path.is_file() and path.suffix.lower() == ".pdf")
+
+
+def load_manifest(path: Path) -> dict[str, dict[str, Any]]:
+    """Return manifest records keyed by file hash. A truncated last line is ignored."""
+    records: dict[str, dict[str, Any]] = {}
+    if not path.exists():
+        return records
+    with path.open() as handle:
+        for line in handle:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            records[record["sha256"]] = record
+    return records
+
+
+def _extract(path: str) -> tuple[list[str], list[int], list[tuple[int, str]]]:
+    """Process-pool worker: read, extract and chunk one PDF."""
+    pages = ingestion._extract_text_from_pdf(Path(path).read_bytes())
+    chunks, page_numbers = ingestion.chunk_pages(pages)
+    return chunks, page_numbers, pages
+
+
+class BulkIngester:
+    def __init__(self, manifest: Path, embed_concurrency: int) -> None:
+        self.manifest = manifest.open("a")
+        self.embed_concurrency = max(embed_concurrency, 1)
+        self.totals = _Totals()
+        # (document, chunk index) pairs waiting for an embedding, in arrival order.
+        self._queue: deque[tuple[_Document, int]] = deque()
+        self._open: deque[_Document] = deque()
+        self._embed_pool = ThreadPoolExecutor(max_workers=self.embed_concurrency)
+
+    def record(self, **fields: Any) -> None:
+        self.manifest.write(json.dumps(fields) + "\n")
+        self.manifest.flush()
+
+    def add(self, document: _Document) -> None:
+        self._open.append(document)
+        self._queue.extend((document, idx) for idx in range(len(document.chunks)))
+        if len(self._queue) >= MAX_INPUTS_PER_REQUEST * self.embed_concurrency:
+            self._embed(final=False)
+
+    def finish(self) -> None:
+        self._embed(final=True)
+
+    def close(self) -> None:
+        self._embed_pool.shutdown()
+        self.manifest.close()
+
+    def _embed(self, final: bool) -> None:
+        windows: list[list[tuple[_Document, int]]] = []
+        while len(self._queue) >= MAX_INPUTS_PER_REQUEST or (final and self._queue):
+            size = min(MAX_INPUTS_PER_REQUEST, len(self._queue))
+            windows.append([self._queue.popleft() for _ in range(size)])
+
+        texts = [[document.chunks[idx] for document, idx in window] for window in windows]
+        for window, vectors in zip(windows, self._embed_pool.map(embed_chunks, texts)):
+            for (document, idx), vector in zip(window, vectors):
+                document.embeddings[idx] = vector
+                document.remaining -= 1
+        self._upsert_ready()
+
+    def _upsert_ready(self) -> None:
+        # Documents enter the queue in order, so only a prefix can be complete.
+        while self._open and self._open[0].remaining == 0:
+            document = self._open.popleft()
+            clear_document(document.document_id)
+            upsert_chunks(
+                document_id=document.document_id,
+                chunks=document.chunks,
+                embeddings=document.embeddings,
+                pages=document.pages,
+            )
+            if get_settings().summary_index_enabled:
+                build_summary_index(document.document_id, document.page_text)
+            invalidate_document(document.document_id)
+            self.totals.documents += 1
+            self.totals.pages += len(document.page_text)
+            self.totals.chunks += len(document.chunks)
+            self.record(
+                sha256=document.sha256,
+                path=str(document.path),
+                status="done",
+                document_id=str(document.document_id),
+                pages=len(document.page_text),
+                chunks=len(document.chunks),
+            )
+            print(f"ingested {document.path} -> {document.document_id} ({len(document.chunks)} chunks)")
+
+
+def _extracted(
+    pool: ProcessPoolExecutor, paths: list[tuple[Path, str]], window: int
+) -> Iterator[tuple[Path, str, Future]]:
+    """Yield extraction futures in input order, keeping at most ``window`` in flight."""
+    pending: deque[tuple[Path, str, Future]] = deque()
+    for path, sha256 in paths:
+        pending.append((path, sha256, pool.submit(_extract, str(path))))
+        if len(pending) >= window:
+            yield pending.popleft()
+    while pending:
+        yield pending.popleft()
+
+
+def run(args: argparse.Namespace) -> _Totals:
+    done = {
+        sha256
+        for sha256, record in load_manifest(args.manifest).items()
+        if record["status"] == "done" or (record["status"] == "failed" and not args.retry_failed)
+    }
+
+    ingester = BulkIngester(args.manifest, args.embed_concurrency)
+    todo: list[tuple[Path, str]] = []
+    seen: set[str] = set()
+    for path in find_pdfs(args.directory):
+        sha256 = file_sha256(path)
+        if sha256 in done:
+            ingester.totals.resumed += 1
+        elif sha256 in seen:
+            ingester.totals.duplicates += 1
+        else:
+            seen.add(sha256)
+            todo.append((path, sha256))
+    print(f"{len(todo)} to ingest, {ingester.totals.resumed} already in manifest, {ingester.totals.duplicates} duplicates")
+
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        try:
+            for path, sha256, future in _extracted(pool, todo, args.workers * 2):
+                try:
+                    chunks, pages, page_text = future.result()
+                except Exception as exc:  # noqa: BLE001 - one unreadable PDF must not stop the run
+                    error = exc.detail if isinstance(exc, HTTPException) else f"{type(exc).__name__}: {exc}"
+                    ingester.totals.failed += 1
+                    ingester.record(sha256=sha256, path=str(path), status="failed", error=error)
+                    print(f"skipped {path}: {error}", file=sys.stderr)
+                    continue
+                ingester.add(_Document(path, sha256, chunks, pages, page_text))
+            ingester.finish()
+        finally:
+            # Documents already upserted are in the manifest; the rest are retried on resume.
+            ingester.close()
+    return ingester.totals
+
+
+def parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("directory", type=Path, help="Directory searched recursively for PDFs.")
+    parser.add_argument("--manifest", type=Path, default=DEFAULT_MANIFEST, help="JSONL progress file used to resume.")
+    parser.add_argument("--workers", type=int, default=4, help="Extraction processes.")
+    parser.add_argument("--embed-concurrency", type=int, default=4, help="Embedding requests in flight.")
+    parser.add_argument("--retry-failed", action="store_true", help="Retry files the manifest marks as failed.")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    args = parse_args(argv)
+    started = time.perf_counter()
+    totals = run(args)
+    elapsed = max(time.perf_counter() - started, 1e-9)
+
+    print(
+        f"\n{totals.documents} documents, {totals.pages} pages, {totals.chunks} chunks in {elapsed:.1f}s "
+        f"({totals.pages / elapsed:.1f} pages/s, {totals.chunks / elapsed:.1f} chunks/s); "
+        f"{totals.resumed} resumed, {totals.duplicates} duplicates, {totals.failed} failed"
+    )
+    return 1 if totals.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
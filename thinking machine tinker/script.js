@@ -1,5 +1,6 @@
 // State management
 let fineTunedModel = null;
+let chatSessionId = null;
 let trainingScripts = [];
 
 // Backend configuration
@@ -131,6 +132,10 @@ async function handleFineTune() {
         const endpoint = window.TINKER_TUNE_ENDPOINT || window.TINKER_API_ENDPOINT || TINKER_TUNE_ENDPOINT || TINKER_API_ENDPOINT;
         if (endpoint) {
             const apiRes = await feedTrainingDataToTinker({ rawJsonl: raw, items, normalized: trainingScripts });
+            // The backend queues the job and returns immediately; follow it until the model is ready
+            if (apiRes?.run_id && apiRes?.status && apiRes.status !== 'succeeded') {
+                await waitForTuneJob(apiRes.run_id);
+            }
             // Store details from API
             fineTunedModel = {
                 trainingScripts,
@@ -229,11 +234,40 @@ async function feedTrainingDataToTinker({ rawJsonl, items, normalized }) {
 
     if (contentType.includes('application/json')) {
         const data = await res.json();
+        // A new model starts a new conversation
+        chatSessionId = null;
         return data;
     }
     return { ok: true, raw: await res.text() };
 }
 
+// Follow a queued tune job over server-sent events until it finishes
+function waitForTuneJob(runId) {
+    const endpoint = window.TINKER_TUNE_ENDPOINT || TINKER_TUNE_ENDPOINT;
+    return new Promise((resolve, reject) => {
+        const source = new EventSource(`${endpoint}/${runId}/events`);
+        source.addEventListener('status', (event) => {
+            const job = JSON.parse(event.data);
+            if (job.status === 'succeeded') {
+                source.close();
+                resolve(job);
+            } else if (job.status === 'failed') {
+                source.close();
+                reject(new Error(job.error || 'Fine-tuning failed'));
+            } else if (job.phase === 'training') {
+                const loss = job.loss != null ? `, loss ${job.loss.toFixed(4)}` : '';
+                showStatus('loading', `Training step ${job.step}/${job.total_steps}${loss}...`);
+            } else {
+                showStatus('loading', `Fine-tuning job ${job.phase}...`);
+            }
+        });
+        source.onerror = () => {
+            source.close();
+            reject(new Error('Lost connection to the fine-tuning job'));
+        };
+    });
+}
+
 // Simulate fine-tuning process
 function simulateFineTuning(scripts) {
     return new Promise((resolve) => {
@@ -276,11 +310,16 @@ async function sendMessage() {
     sendBtn.disabled = true;
     
     // Get AI response
+    const botContent = addMessage('bot', '');
     try {
-        const response = await getAIResponse(message);
-        addMessage('bot', response);
+        const response = await getAIResponse(message, (text) => {
+            botContent.textContent += text;
+            chatMessages.scrollTop = chatMessages.scrollHeight;
+        });
+        botContent.textContent = response;
     } catch (error) {
-        addMessage('bot', 'Sorry, I encountered an error. Please try again.');
+        // Replace any partial streamed text in the reply bubble with the error
+        botContent.textContent = 'Sorry, I encountered an error. Please try again.';
         console.error('Chat error:', error);
     } finally {
         sendBtn.disabled = false;
@@ -302,13 +341,14 @@ function addMessage(type, content) {
     
     // Scroll to bottom
     chatMessages.scrollTop = chatMessages.scrollHeight;
+    return messageContent;
 }
 
-// Get AI response (uses Tinker if configured)
-async function getAIResponse(userMessage) {
+// Get AI response (uses Tinker if configured); onText receives streamed text as it arrives
+async function getAIResponse(userMessage, onText) {
     const chatEndpoint = window.TINKER_CHAT_ENDPOINT || TINKER_CHAT_ENDPOINT || '';
     if (chatEndpoint) {
-        const resp = await chatWithTinker({ message: userMessage, runId: fineTunedModel?.id });
+        const resp = await chatWithTinkerStream({ message: userMessage, runId: fineTunedModel?.id, onText });
         return resp;
     }
 
@@ -332,7 +372,7 @@ async function chatWithTinker({ message, runId }) {
         throw new Error('Model is not ready yet. Please wait for fine-tuning to complete.');
     }
 
-    const payload = { message, run_id: runId };
+    const payload = { message, run_id: runId, session_id: chatSessionId };
 
     const res = await fetch(endpoint, {
         method: 'POST',
@@ -348,13 +388,68 @@ async function chatWithTinker({ message, runId }) {
 
     if (contentType.includes('application/json')) {
         const data = await res.json();
+        chatSessionId = data.session_id || null;
         return data.response || data.answer || data.output || JSON.stringify(data);
     }
     return await res.text();
 }
 
+// Stream a reply from the backend's /chat/stream endpoint, falling back to /chat when it is missing
+async function chatWithTinkerStream({ message, runId, onText }) {
+    const endpoint = window.TINKER_CHAT_ENDPOINT || TINKER_CHAT_ENDPOINT;
+    if (!runId) {
+        throw new Error('Model is not ready yet. Please wait for fine-tuning to complete.');
+    }
+
+    const res = await fetch(`${endpoint}/stream`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ message, run_id: runId, session_id: chatSessionId })
+    });
+    if (res.status === 404 && chatSessionId) {
+        // The server forgot the conversation (restart or expiry); start a new one.
+        chatSessionId = null;
+        return chatWithTinkerStream({ message, runId, onText });
+    }
+    if (res.status === 404 || res.status === 405) {
+        return chatWithTinker({ message, runId });
+    }
+    if (!res.ok) {
+        const errText = await res.text().catch(() => '');
+        throw new Error(`Tinker Chat ${res.status}: ${errText}`);
+    }
+
+    const reader = res.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+            const block = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+            const event = (block.match(/^event: (.*)$/m) || [])[1];
+            const data = (block.match(/^data: (.*)$/m) || [])[1];
+            if (!data) continue;
+            const payload = JSON.parse(data);
+            if (event === 'token') {
+                onText && onText(payload.text);
+            } else if (event === 'done') {
+                chatSessionId = payload.session_id || null;
+                return payload.response;
+            } else if (event === 'error') {
+                throw new Error(payload.detail || 'Chat failed');
+            }
+        }
+    }
+    throw new Error('Chat stream ended unexpectedly');
+}
+
 // Reset chat
 function resetChat() {
+    chatSessionId = null;
     // Keep only the initial bot message
     chatMessages.innerHTML = `
         <div class="message bot-message">
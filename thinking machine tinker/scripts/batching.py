@@ -0,0 +1,54 @@
+"""Token-budget batching with length bucketing for the training scripts.
+
+Batches are filled up to a maximum number of tokens rather than a fixed
+number of rows, so a step over short records carries more of them and a step
+over long records fewer. Records are first grouped into buckets of similar
+length, which keeps the records in one batch alike and step cost steady.
+Every epoch reshuffles records within buckets and the order of batches, from
+a fixed seed, so runs are reproducible.
+"""
+
+from __future__ import annotations
+
+import random
+from typing import List, Optional, Sequence
+
+
+class TokenBudgetSampler:
+    def __init__(
+        self,
+        lengths: Sequence[int],
+        max_tokens: int,
+        num_buckets: int = 8,
+        seed: int = 0,
+        max_batch_size: Optional[int] = None,
+    ):
+        self.lengths = list(lengths)
+        self.max_tokens = max_tokens
+        self.seed = seed
+        self.max_batch_size = max_batch_size
+        # Equal-count buckets over the records sorted by length.
+        order = sorted(range(len(self.lengths)), key=self.lengths.__getitem__)
+        size = max(-(-len(order) // max(num_buckets, 1)), 1)
+        self.buckets: List[List[int]] = [order[start : start + size] for start in range(0, len(order), size)]
+
+    def batches(self, epoch: int) -> List[List[int]]:
+        """Record indices for every batch of ``epoch``, in the order to train on them."""
+        rng = random.Random(self.seed * 1_000_003 + epoch)
+        batches: List[List[int]] = []
+        for bucket in self.buckets:
+            members = list(bucket)
+            rng.shuffle(members)
+            batch: List[int] = []
+            tokens = 0
+            for index in members:
+                full = tokens + self.lengths[index] > self.max_tokens
+                if batch and (full or (self.max_batch_size and len(batch) >= self.max_batch_size)):
+                    batches.append(batch)
+                    batch, tokens = [], 0
+                batch.append(index)
+                tokens += self.lengths[index]
+            if batch:
+                batches.append(batch)
+        rng.shuffle(batches)
+        return batches
@@ -0,0 +1,143 @@
+"""Training-pipeline throughput benchmark against the offline Tinker stand-in.
+
+Usage (from the repository root)::
+
+    python scripts/bench_training.py
+    python scripts/bench_training.py --entry async --entry server --repeat 20 --round-trip 0.1
+
+Each entry point trains on the roast pilot set, repeated ``--repeat`` times,
+against ``fake_tinker``. For each one the benchmark reports:
+- wall time, optimizer steps per second and trained tokens per second
+- how much of the trainer's time went to work versus idle gaps spent
+  waiting on the client
+
+Large idle gaps mean the client is not keeping requests queued ahead of the
+trainer.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict
+
+import fake_tinker
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+ROOT = SCRIPTS_DIR.parent
+PILOT = ROOT / "datasets" / "roast" / "data" / "pilot.jsonl"
+ENTRIES = ["working", "simple", "async", "server"]
+
+
+def write_dataset(workdir: Path, repeat: int) -> Path:
+    """Copy the pilot set into ``workdir`` at the relative path the scripts read."""
+    path = workdir / "datasets" / "roast" / "data" / "pilot.jsonl"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    lines = [line for line in PILOT.read_text().splitlines() if line.strip()]
+    path.write_text("\n".join(lines * repeat) + "\n")
+    return path
+
+
+def run_script(module_name: str) -> Callable[[], None]:
+    def run() -> None:
+        sys.modules.pop(module_name, None)
+        module = __import__(module_name)
+        module.main()
+
+    return run
+
+
+def run_server(workdir: Path, dataset: Path, batch_size: int) -> Callable[[], None]:
+    os.environ.setdefault("RUNS_DB_PATH", str(workdir / "runs.sqlite3"))
+    os.environ.setdefault("DATASET_DIR", str(workdir / "dataset_store"))
+
+    def run() -> None:
+        sys.path.insert(0, str(ROOT / "server"))
+        import app
+
+        app.init_registry()
+        info = app.store_dataset_text(dataset.read_text())
+        response = app.tune(app.TuneRequest(dataset_id=info.dataset_id, epochs=2, batch_size=batch_size))
+        while app.run_status(response.run_id).status not in app.TERMINAL_STATUSES:
+            time.sleep(0.01)
+        status = app.run_status(response.run_id)
+        if status.status != "succeeded":
+            raise RuntimeError(status.error)
+
+    return run
+
+
+def measure(name: str, run: Callable[[], None], verbose: bool) -> Dict[str, float]:
+    fake_tinker.RECORDER.reset()
+    output = io.StringIO()
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(sys.stdout if verbose else output):
+        run()
+    # Scripts that never wait on their futures are done only when the trainer is.
+    fake_tinker.drain()
+    wall = time.perf_counter() - started
+    summary = fake_tinker.RECORDER.summary()
+    summary.update(entry=name, wall=wall)
+    return summary
+
+
+def print_table(rows) -> None:
+    header = (
+        f"{'entry':<8} {'wall s':>7} {'steps':>6} {'steps/s':>8} {'tokens/s':>10} "
+        f"{'busy %':>7} {'idle s':>7} {'max gap s':>9}"
+    )
+    print(header)
+    print("-" * len(header))
+    for row in rows:
+        busy = row["busy"] / row["span"] if row["span"] else 0.0
+        print(
+            f"{row['entry']:<8} {row['wall']:>7.2f} {row['steps']:>6} {row['steps'] / row['wall']:>8.2f} "
+            f"{row['tokens'] / row['wall']:>10,.0f} {busy:>7.1%} {row['idle']:>7.2f} {row['max_gap']:>9.3f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entry", action="append", choices=ENTRIES, help="Entry point to run; repeatable. Default: all.")
+    parser.add_argument("--repeat", type=int, default=5, help="Copies of the pilot set to train on.")
+    parser.add_argument("--batch-size", type=int, default=8, help="Batch size for the server entry point.")
+    parser.add_argument("--round-trip", type=float, default=fake_tinker.Latency.round_trip)
+    parser.add_argument("--forward-backward", type=float, default=fake_tinker.Latency.forward_backward)
+    parser.add_argument("--per-token", type=float, default=fake_tinker.Latency.forward_backward_per_token)
+    parser.add_argument("--optim-step", type=float, default=fake_tinker.Latency.optim_step)
+    parser.add_argument("--verbose", action="store_true", help="Show the entry points' own output.")
+    args = parser.parse_args()
+
+    fake_tinker.install(
+        fake_tinker.Latency(
+            round_trip=args.round_trip,
+            forward_backward=args.forward_backward,
+            forward_backward_per_token=args.per_token,
+            optim_step=args.optim_step,
+            save=0.0,
+        )
+    )
+    os.environ.setdefault("TINKER_API_KEY", "fake")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        dataset = write_dataset(workdir, args.repeat)
+        os.chdir(workdir)
+        runners = {
+            "working": run_script("train_working"),
+            "simple": run_script("train_simple"),
+            "async": run_script("train_roastbot_async"),
+            "server": run_server(workdir, dataset, args.batch_size),
+        }
+        rows = [measure(name, runners[name], args.verbose) for name in args.entry or ENTRIES]
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+"""Offline stand-in for the Tinker SDK, for profiling our side of the training pipeline.
+
+``install()`` registers fake ``tinker``, ``tinker.types`` and ``tinker_cookbook``
+modules in ``sys.modules``, so the training scripts and ``server/app.py``
+run unchanged without network access or an API key. The fake trainer runs
+one operation at a time, like a remote GPU worker. Each operation waits
+half a round trip before it starts, takes a configurable base plus
+per-token time, and its result arrives half a round trip after it ends.
+Losses and sampled tokens are deterministic.
+
+Every trainer operation is recorded, so a benchmark can measure how long
+the trainer sat idle waiting for the client (see ``bench_training.py``).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import hashlib
+import sys
+import threading
+import time
+import types as pytypes
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+
+@dataclass
+class Latency:
+    round_trip: float = 0.05
+    forward_backward: float = 0.10
+    forward_backward_per_token: float = 2e-6
+    optim_step: float = 0.02
+    save: float = 0.2
+    sample: float = 0.05
+    sample_per_token: float = 1e-3
+
+
+@dataclass
+class Recorder:
+    """Trainer operations as (name, start, end, tokens), in the order they ran."""
+
+    ops: List[Tuple[str, float, float, int]] = field(default_factory=list)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def add(self, name: str, start: float, end: float, tokens: int = 0) -> None:
+        with self.lock:
+            self.ops.append((name, start, end, tokens))
+
+    def reset(self) -> None:
+        with self.lock:
+            self.ops.clear()
+
+    def summary(self) -> Dict[str, float]:
+        with self.lock:
+            ops = sorted(self.ops, key=lambda op: op[1])
+        training = [op for op in ops if op[0] in ("forward_backward", "optim_step")]
+        if not training:
+            return {"steps": 0, "tokens": 0, "busy": 0.0, "idle": 0.0, "max_gap": 0.0, "span": 0.0}
+        gaps = [max(nxt[1] - prev[2], 0.0) for prev, nxt in zip(training, training[1:])]
+        return {
+            "steps": sum(op[0] == "optim_step" for op in training),
+            "tokens": sum(op[3] for op in training),
+            "busy": sum(op[2] - op[1] for op in training),
+            "idle": sum(gaps),
+            "max_gap": max(gaps, default=0.0),
+            "span": training[-1][2] - training[0][1],
+        }
+
+
+LATENCY = Latency()
+RECORDER = Recorder()
+TRAINERS: List["_Trainer"] = []
+
+
+class _Trainer:
+    """Serial worker; each submitted operation runs after the previous one finishes."""
+
+    def __init__(self) -> None:
+        self.pool = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="fake-trainer")
+        TRAINERS.append(self)
+
+    def submit(self, name: str, cost: float, tokens: int, result: Any) -> "Future":
+        arrives = time.perf_counter() + LATENCY.round_trip / 2
+        future = Future()
+
+        def run() -> None:
+            delay = arrives - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            start = time.perf_counter()
+            time.sleep(cost)
+            RECORDER.add(name, start, time.perf_counter(), tokens)
+            threading.Timer(LATENCY.round_trip / 2, future.set_result, args=(result,)).start()
+
+        self.pool.submit(run)
+        return future
+
+
+class Future(concurrent.futures.Future):
+    """A concurrent future that also exposes its result's attributes, as some scripts expect."""
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.result(), name)
+
+
+def drain() -> None:
+    """Wait until every trainer has run everything submitted to it, awaited or not."""
+    while TRAINERS:
+        TRAINERS.pop().pool.shutdown(wait=True)
+
+
+def _digest(tokens: List[int]) -> int:
+    return int.from_bytes(hashlib.sha256(repr(tokens).encode()).digest()[:4], "big")
+
+
+# ---------- tinker.types ----------
+class ModelInput:
+    def __init__(self, tokens: List[int]):
+        self.tokens = list(tokens)
+
+    @classmethod
+    def from_ints(cls, tokens: List[int]) -> "ModelInput":
+        return cls(tokens)
+
+    def to_ints(self) -> List[int]:
+        return list(self.tokens)
+
+    @property
+    def length(self) -> int:
+        return len(self.tokens)
+
+
+class Datum:
+    def __init__(self, model_input: Optional[ModelInput] = None, loss_fn_inputs: Optional[dict] = None, **kwargs):
+        self.model_input = model_input
+        self.loss_fn_inputs = loss_fn_inputs or {}
+        # Older scripts pass input_ids / loss_weights directly.
+        self.extra = kwargs
+
+    @property
+    def num_tokens(self) -> int:
+        if self.model_input is not None:
+            return self.model_input.length
+        return len(self.extra.get("input_ids", ()))
+
+
+class _Params:
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+class AdamParams(_Params):
+    pass
+
+
+class SamplingParams(_Params):
+    pass
+
+
+# ---------- tinker ----------
+class FakeTokenizer:
+    """Byte-level tokenizer with a BOS and an EOS token, batch-callable like HF fast tokenizers."""
+
+    bos_token_id = 1
+    eos_token_id = 2
+    _offset = 3
+
+    def encode(self, text: str, add_special_tokens: bool = True) -> List[int]:
+        ids = [byte + self._offset for byte in text.encode()]
+        return [self.bos_token_id] + ids if add_special_tokens else ids
+
+    def decode(self, tokens: List[int]) -> str:
+        return bytes(t - self._offset for t in tokens if t >= self._offset).decode(errors="replace")
+
+    def __call__(self, texts: List[str], add_special_tokens: bool = True) -> Dict[str, List[List[int]]]:
+        return {"input_ids": [self.encode(text, add_special_tokens) for text in texts]}
+
+
+class SamplingClient:
+    def __init__(self, model_path: Optional[str] = None):
+        self.model_path = model_path
+        self.tokenizer = FakeTokenizer()
+        self.pool = concurrent.futures.ThreadPoolExecutor(max_workers=32, thread_name_prefix="fake-sampler")
+
+    def get_tokenizer(self) -> FakeTokenizer:
+        return self.tokenizer
+
+    def _sample(self, prompt: ModelInput, sampling_params: Any, num_samples: int):
+        params = sampling_params if isinstance(sampling_params, dict) else vars(sampling_params)
+        count = int(params.get("max_tokens", 16))
+        time.sleep(LATENCY.round_trip + LATENCY.sample + LATENCY.sample_per_token * count)
+        seed = _digest(prompt.to_ints())
+        words = self.tokenizer.encode(" roasted", add_special_tokens=False)
+        sequences = [
+            pytypes.SimpleNamespace(
+                tokens=[words[(seed + index + i) % len(words)] for i in range(count)], stop_reason="length"
+            )
+            for index in range(num_samples)
+        ]
+        return pytypes.SimpleNamespace(sequences=sequences, samples=sequences)
+
+    def sample(self, prompt: ModelInput, sampling_params: Any, num_samples: int = 1) -> concurrent.futures.Future:
+        future = Future()
+        inner = self.pool.submit(self._sample, prompt, sampling_params, num_samples)
+        inner.add_done_callback(lambda done: future.set_result(done.result()))
+        return future
+
+    async def sample_async(self, prompt: ModelInput, sampling_params: Any, num_samples: int = 1):
+        return await asyncio.wrap_future(self.sample(prompt, sampling_params, num_samples))
+
+
+class TrainingClient:
+    def __init__(self, base_model: str):
+        self.base_model = base_model
+        self.trainer = _Trainer()
+        self.steps = 0
+
+    def get_tokenizer(self) -> FakeTokenizer:
+        return FakeTokenizer()
+
+    def forward_backward(self, data: List[Datum], loss_fn: str = "cross_entropy") -> Future:
+        tokens = sum(datum.num_tokens for datum in data)
+        loss = 2.0 / (1 + 0.05 * self.steps)
+        result = pytypes.SimpleNamespace(metrics={"loss:mean": loss}, mean_loss=loss)
+        cost = LATENCY.forward_backward + LATENCY.forward_backward_per_token * tokens
+        return self.trainer.submit("forward_backward", cost, tokens, result)
+
+    def optim_step(self, adam_params: Any) -> Future:
+        self.steps += 1
+        return self.trainer.submit("optim_step", LATENCY.optim_step, 0, pytypes.SimpleNamespace())
+
+    def forward_backward_async(self, data: List[Datum], loss_fn: str = "cross_entropy") -> asyncio.Future:
+        return asyncio.wrap_future(self.forward_backward(data, loss_fn))
+
+    def optim_step_async(self, adam_params: Any) -> asyncio.Future:
+        return asyncio.wrap_future(self.optim_step(adam_params))
+
+    def save_weights_for_sampler(self, name: str) -> Future:
+        path = f"tinker://fake/{self.base_model}/{name}"
+        return self.trainer.submit("save", LATENCY.save, 0, pytypes.SimpleNamespace(path=path))
+
+    def save_weights_and_get_sampling_client(self, name: str) -> SamplingClient:
+        return SamplingClient(self.save_weights_for_sampler(name).result().path)
+
+
+class ServiceClient:
+    def __init__(self, api_key: Optional[str] = None, **kwargs):
+        self.api_key = api_key
+
+    def get_server_capabilities(self):
+        return pytypes.SimpleNamespace(supported_models=["meta-llama/Llama-3.2-1B", "meta-llama/Llama-3.1-8B-Instruct"])
+
+    def create_lora_training_client(self, base_model: str, **kwargs) -> TrainingClient:
+        return TrainingClient(base_model)
+
+    def create_sampling_client(self, model_path: Optional[str] = None, **kwargs) -> SamplingClient:
+        return SamplingClient(model_path)
+
+
+# ---------- tinker_cookbook ----------
+class BaseRenderer:
+    """Plain "Role: content" chat format; only assistant content carries loss weight."""
+
+    def __init__(self, tokenizer):
+        self.tokenizer = tokenizer
+
+    def build_supervised_example(self, messages: List[dict]) -> Tuple[List[int], List[float]]:
+        tokens = [self.tokenizer.bos_token_id]
+        weights = [0.0]
+        for message in messages:
+            header = self.tokenizer.encode(f"{message['role'].title()}: ", add_special_tokens=False)
+            body = self.tokenizer.encode(f"{message['content']}\n\n", add_special_tokens=False)
+            weight = 1.0 if message["role"] == "assistant" else 0.0
+            tokens += header + body
+            weights += [0.0] * len(header) + [weight] * len(body)
+        return tokens, weights
+
+    def build_generation_prompt(self, messages: List[dict]) -> ModelInput:
+        tokens, _ = self.build_supervised_example(messages)
+        return ModelInput(tokens + self.tokenizer.encode("Assistant: ", add_special_tokens=False))
+
+    def parse_response(self, sequence) -> str:
+        return self.tokenizer.decode(sequence.tokens)
+
+
+def _module(name: str, **attrs: Any) -> pytypes.ModuleType:
+    module = pytypes.ModuleType(name)
+    module.__dict__.update(attrs)
+    sys.modules[name] = module
+    return module
+
+
+def install(latency: Optional[Latency] = None) -> Recorder:
+    """Replace tinker and tinker_cookbook in sys.modules with the fakes. Import them afterwards."""
+    global LATENCY
+    if latency is not None:
+        LATENCY = latency
+    types_module = _module(
+        "tinker.types",
+        Datum=Datum,
+        ModelInput=ModelInput,
+        AdamParams=AdamParams,
+        SamplingParams=SamplingParams,
+    )
+    _module(
+        "tinker",
+        types=types_module,
+        Datum=Datum,
+        ModelInput=ModelInput,
+        AdamParams=AdamParams,
+        SamplingParams=SamplingParams,
+        ServiceClient=ServiceClient,
+        TrainingClient=TrainingClient,
+        SamplingClient=SamplingClient,
+    )
+    renderers = _module("tinker_cookbook.renderers", BaseRenderer=BaseRenderer)
+    tokenizer_utils = _module("tinker_cookbook.tokenizer_utils", get_tokenizer=lambda name: FakeTokenizer())
+    _module("tinker_cookbook", renderers=renderers, tokenizer_utils=tokenizer_utils)
+    RECORDER.reset()
+    return RECORDER
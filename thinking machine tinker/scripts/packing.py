@@ -0,0 +1,132 @@
+"""Sequence packing for supervised fine-tuning examples.
+
+Short examples are concatenated into sequences of up to ``max_length`` tokens
+so each training step carries fewer, fuller sequences. Examples are
+``(tokens, weights)`` pairs with one weight per token, as produced by
+``renderer.build_supervised_example`` and by the server's tokenizer. The
+weight of each example's first token is forced to zero, and so is the weight
+of any separator, so no loss is taken on predicting across a boundary.
+
+Attention is not masked between examples in a packed sequence; a separator
+(for example the EOS token) gives the model an explicit boundary.
+
+Usage (from the repository root)::
+
+    python scripts/packing.py --max-length 2048 --batch-size 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import bisect
+import math
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, List, Sequence, Tuple
+
+Example = Tuple[List[int], List[float]]
+
+
+@dataclass
+class PackingStats:
+    examples: int
+    sequences: int
+    tokens: int
+    max_length: int
+
+    @property
+    def efficiency(self) -> float:
+        """Share of the packed sequences' capacity filled with tokens."""
+        return self.tokens / (self.sequences * self.max_length) if self.sequences else 0.0
+
+    def steps(self, batch_size: int) -> Tuple[int, int]:
+        """Optimizer steps per epoch before and after packing."""
+        return math.ceil(self.examples / batch_size), math.ceil(self.sequences / batch_size)
+
+    def report(self, batch_size: int) -> str:
+        before, after = self.steps(batch_size)
+        reduction = 1 - after / before if before else 0.0
+        return (
+            f"{self.examples} examples -> {self.sequences} sequences of <= {self.max_length} tokens, "
+            f"{self.efficiency:.1%} full; {before} -> {after} steps per epoch at batch size {batch_size} "
+            f"({reduction:.0%} fewer)"
+        )
+
+
+def _as_list(values) -> list:
+    return values.tolist() if hasattr(values, "tolist") else list(values)
+
+
+def pack_examples(
+    examples: Iterable[Tuple[Sequence[int], Sequence[float]]],
+    max_length: int,
+    separator: Sequence[int] = (),
+) -> Tuple[List[Example], PackingStats]:
+    """Pack examples into sequences of at most ``max_length`` tokens, best-fit decreasing.
+
+    Examples longer than ``max_length`` are kept whole as sequences of their
+    own. Empty examples are dropped.
+    """
+    items = [(_as_list(tokens), _as_list(weights)) for tokens, weights in examples]
+    items = [(tokens, weights) for tokens, weights in items if tokens]
+    separator = list(separator)
+
+    bins: List[List[int]] = []  # example indices per packed sequence
+    # (remaining capacity, bin) for bins that can still take an example, sorted, so the
+    # tightest bin that fits is found by bisection instead of scanning every bin.
+    open_bins: List[Tuple[int, int]] = []
+    for index in sorted(range(len(items)), key=lambda i: len(items[i][0]), reverse=True):
+        size = len(items[index][0])
+        position = bisect.bisect_left(open_bins, (len(separator) + size, -1))
+        if position < len(open_bins):
+            remaining, target = open_bins.pop(position)
+            bins[target].append(index)
+            remaining -= len(separator) + size
+        else:
+            target = len(bins)
+            bins.append([index])
+            remaining = max_length - size
+        if remaining > len(separator):
+            bisect.insort(open_bins, (remaining, target))
+
+    packed: List[Example] = []
+    for members in bins:
+        tokens: List[int] = []
+        weights: List[float] = []
+        for index in members:
+            if tokens:
+                tokens.extend(separator)
+                weights.extend([0.0] * len(separator))
+            example_tokens, example_weights = items[index]
+            tokens.extend(example_tokens)
+            weights.extend([0.0] + [float(w) for w in example_weights[1:]])
+        packed.append((tokens, weights))
+
+    stats = PackingStats(
+        examples=len(items),
+        sequences=len(packed),
+        tokens=sum(len(tokens) for tokens, _ in packed),
+        max_length=max_length,
+    )
+    return packed, stats
+
+
+def main() -> None:
+    from renderers_roast import build_supervised_batch, get_renderer, iter_records
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dataset", type=Path, default=Path("datasets/roast/data/pilot.jsonl"))
+    parser.add_argument("--model", default="meta-llama/Llama-3.1-8B-Instruct")
+    parser.add_argument("--max-length", type=int, default=2048)
+    parser.add_argument("--batch-size", type=int, default=8)
+    args = parser.parse_args()
+
+    renderer = get_renderer(args.model)
+    examples = list(build_supervised_batch(renderer, iter_records(args.dataset)))
+    separator = [renderer.tokenizer.eos_token_id] if getattr(renderer.tokenizer, "eos_token_id", None) is not None else []
+    _, stats = pack_examples(examples, args.max_length, separator)
+    print(stats.report(args.batch_size))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""Encode texts across spawned worker processes.
+
+For tokenizers without a batch API (HF fast tokenizers already encode
+batches in parallel in Rust). Workers are started with the ``spawn`` method,
+so a multi-threaded parent such as the server is never forked, and each
+worker receives the tokenizer once, in its initializer, rather than with
+every chunk.
+"""
+
+from __future__ import annotations
+
+import math
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, List, Optional, Sequence, Tuple
+
+_TOKENIZER: Optional[Any] = None
+
+
+def _init(tokenizer: Any) -> None:
+    global _TOKENIZER
+    _TOKENIZER = tokenizer
+
+
+def _encode(args: Tuple[List[str], bool]) -> List[List[int]]:
+    texts, add_special_tokens = args
+    return [_TOKENIZER.encode(text, add_special_tokens=add_special_tokens) for text in texts]
+
+
+def encode_parallel(
+    tokenizer: Any,
+    batches: Sequence[Tuple[List[str], bool]],
+    workers: int,
+    chunks_per_worker: int = 4,
+) -> List[List[List[int]]]:
+    """Encode each ``(texts, add_special_tokens)`` batch; results keep the input order."""
+    jobs: List[Tuple[int, Tuple[List[str], bool]]] = []
+    for position, (texts, add_special_tokens) in enumerate(batches):
+        size = max(math.ceil(len(texts) / (workers * chunks_per_worker)), 1)
+        jobs.extend((position, (texts[start : start + size], add_special_tokens)) for start in range(0, len(texts), size))
+
+    results: List[List[List[int]]] = [[] for _ in batches]
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init, initargs=(tokenizer,)) as pool:
+        for (position, _), encoded in zip(jobs, pool.map(_encode, [job for _, job in jobs])):
+            results[position].extend(encoded)
+    return results
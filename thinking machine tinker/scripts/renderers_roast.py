@@ -5,10 +5,15 @@ from __future__ import annotations
 import json
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Iterable, Iterator, List, Tuple
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
 
 from tinker_cookbook import renderers, tokenizer_utils
 
+from packing import pack_examples
+
+# Bump when rendering changes; compiled token shards are keyed on it.
+RENDERER_VERSION = 1
+
 SYSTEM_TEMPLATE = """You are RoastBot, a stand-up comedian delivering playful roasts. Keep it witty, avoid protected-class insults, and stay on the fun side of edgy.
 Guidelines:
 - Keep length <= 4 sentences.
@@ -56,12 +61,18 @@ def iter_records(path: Path) -> Iterator[RoastRecord]:
 
 
 def build_supervised_batch(
-    renderer: RoastRenderer, records: Iterable[RoastRecord]
+    renderer: RoastRenderer,
+    records: Iterable[RoastRecord],
+    pack_length: Optional[int] = None,
+    separator: Sequence[int] = (),
 ) -> Iterator[Tuple[List[int], List[float]]]:
-    for record in records:
-        messages = renderer.apply_metadata(record)
-        tokens, weights = renderer.build_supervised_example(messages)
-        yield tokens, weights
+    """Yield (tokens, weights) per record, or packed sequences of up to ``pack_length`` tokens."""
+    examples = (renderer.build_supervised_example(renderer.apply_metadata(record)) for record in records)
+    if pack_length is None:
+        yield from examples
+        return
+    packed, _ = pack_examples(examples, pack_length, separator)
+    yield from packed
 
 
 if __name__ == "__main__":
@@ -0,0 +1,182 @@
+"""Compile roast datasets into memory-mapped token shards, and read them back.
+
+Usage (from the repository root)::
+
+    python scripts/token_shards.py datasets/roast/data/pilot.jsonl
+    python scripts/token_shards.py datasets/roast/data/*.jsonl --workers 8 --shard-examples 50000
+
+Records are rendered and tokenized once, in parallel, into shards of
+``.npy`` files under ``datasets/roast/compiled/<key>/``:
+- ``tokens`` (uint32), all examples back to back
+- ``weights`` (float16), one weight per token
+- ``offsets`` (int64), where each example starts, plus a final end offset
+
+The key hashes the source files, the tokenizer (base model) and
+``renderers_roast.RENDERER_VERSION``, so changing any of them compiles a
+fresh set. ``TokenShards`` memory-maps the shards. Examples are zero-copy
+slices, so only the pages a batch touches are read and datasets larger
+than RAM work.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import count, islice
+from pathlib import Path
+from typing import Deque, Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+DEFAULT_OUTPUT = Path("datasets/roast/compiled")
+DEFAULT_MODEL = "meta-llama/Llama-3.1-8B-Instruct"
+MANIFEST = "manifest.json"
+
+
+def compile_key(sources: Sequence[Path], model_name: str) -> str:
+    from renderers_roast import RENDERER_VERSION
+
+    digest = hashlib.sha256(f"{model_name}\0renderer-v{RENDERER_VERSION}".encode())
+    for source in sources:
+        with open(source, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+    return digest.hexdigest()[:16]
+
+
+def _compile_shard(lines: List[str], prefix: str, model_name: str) -> Tuple[int, int]:
+    """Process-pool worker: render and tokenize one shard's records and write its arrays."""
+    from renderers_roast import RoastRecord, get_renderer
+
+    renderer = get_renderer(model_name)
+    examples = []
+    for line in lines:
+        data = json.loads(line)
+        record = RoastRecord(messages=data["messages"], metadata=data["metadata"])
+        examples.append(renderer.build_supervised_example(renderer.apply_metadata(record)))
+
+    lengths = np.fromiter((len(tokens) for tokens, _ in examples), dtype=np.int64, count=len(examples))
+    offsets = np.zeros(len(examples) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    tokens = np.lib.format.open_memmap(f"{prefix}.tokens.npy", mode="w+", dtype=np.uint32, shape=(int(offsets[-1]),))
+    weights = np.lib.format.open_memmap(f"{prefix}.weights.npy", mode="w+", dtype=np.float16, shape=(int(offsets[-1]),))
+    for (example_tokens, example_weights), start, end in zip(examples, offsets[:-1], offsets[1:]):
+        tokens[start:end] = example_tokens
+        weights[start:end] = example_weights
+    tokens.flush()
+    weights.flush()
+    np.save(f"{prefix}.offsets.npy", offsets)
+    return len(examples), int(offsets[-1])
+
+
+def _record_lines(sources: Sequence[Path]) -> Iterator[str]:
+    for source in sources:
+        with open(source) as f:
+            for line in f:
+                if line.strip():
+                    yield line
+
+
+def compile_shards(
+    sources: Sequence[Path],
+    model_name: str = DEFAULT_MODEL,
+    output: Path = DEFAULT_OUTPUT,
+    workers: int = os.cpu_count() or 1,
+    shard_examples: int = 50000,
+) -> Path:
+    """Compile ``sources`` unless an up-to-date compile exists. Returns its directory."""
+    directory = Path(output) / compile_key(sources, model_name)
+    if (directory / MANIFEST).exists():
+        return directory
+    directory.mkdir(parents=True, exist_ok=True)
+
+    lines = _record_lines(sources)
+    pending: Deque[Tuple[str, Future]] = deque()
+    shards = []
+    with ProcessPoolExecutor(max_workers=max(workers, 1)) as pool:
+        # At most two shards per worker are in flight, so memory stays bounded for any dataset size.
+        for index in count():
+            chunk = list(islice(lines, shard_examples))
+            if not chunk:
+                break
+            name = f"shard-{index:05d}"
+            pending.append((name, pool.submit(_compile_shard, chunk, str(directory / name), model_name)))
+            while len(pending) >= 2 * max(workers, 1):
+                shards.append(_shard_entry(*pending.popleft()))
+        while pending:
+            shards.append(_shard_entry(*pending.popleft()))
+
+    manifest = {
+        "model": model_name,
+        "sources": [str(source) for source in sources],
+        "examples": sum(shard["examples"] for shard in shards),
+        "tokens": sum(shard["tokens"] for shard in shards),
+        "shards": shards,
+    }
+    # Written last: a directory without a manifest is an interrupted compile and is redone.
+    (directory / MANIFEST).write_text(json.dumps(manifest, indent=2))
+    return directory
+
+
+def _shard_entry(name: str, future: Future) -> dict:
+    examples, tokens = future.result()
+    return {"name": name, "examples": examples, "tokens": tokens}
+
+
+class TokenShards:
+    """Read-only view over compiled shards. ``shards[i]`` is (tokens, weights) as memmap slices."""
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self.manifest = json.loads((self.directory / MANIFEST).read_text())
+        self.tokens: List[np.ndarray] = []
+        self.weights: List[np.ndarray] = []
+        self.offsets: List[np.ndarray] = []
+        for shard in self.manifest["shards"]:
+            prefix = self.directory / shard["name"]
+            self.tokens.append(np.load(f"{prefix}.tokens.npy", mmap_mode="r"))
+            self.weights.append(np.load(f"{prefix}.weights.npy", mmap_mode="r"))
+            self.offsets.append(np.load(f"{prefix}.offsets.npy"))
+        counts = np.array([len(offsets) - 1 for offsets in self.offsets], dtype=np.int64)
+        self._starts = np.concatenate([[0], np.cumsum(counts)])
+        self.lengths = np.concatenate([np.diff(offsets) for offsets in self.offsets]) if self.offsets else np.zeros(0)
+
+    def __len__(self) -> int:
+        return int(self._starts[-1])
+
+    def __getitem__(self, index: int) -> Tuple[np.ndarray, np.ndarray]:
+        shard = int(np.searchsorted(self._starts, index, side="right")) - 1
+        local = index - int(self._starts[shard])
+        start, end = self.offsets[shard][local], self.offsets[shard][local + 1]
+        return self.tokens[shard][start:end], self.weights[shard][start:end]
+
+
+def load_or_compile(sources: Sequence[Path], model_name: str = DEFAULT_MODEL, **kwargs) -> TokenShards:
+    return TokenShards(compile_shards(sources, model_name, **kwargs))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("sources", nargs="+", type=Path, help="JSONL files of roast records.")
+    parser.add_argument("--model", default=DEFAULT_MODEL, help="Base model whose tokenizer to use.")
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--shard-examples", type=int, default=50000, help="Records per shard.")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    directory = compile_shards(args.sources, args.model, args.output, args.workers, args.shard_examples)
+    manifest = json.loads((directory / MANIFEST).read_text())
+    print(
+        f"{manifest['examples']} examples, {manifest['tokens']} tokens in {len(manifest['shards'])} shards "
+        f"-> {directory} ({time.perf_counter() - started:.1f}s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
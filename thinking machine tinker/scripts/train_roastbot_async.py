@@ -4,7 +4,9 @@ from __future__ import annotations
 
 import asyncio
 import os
+import statistics
 import sys
+import time
 from pathlib import Path
 from typing import List
 
@@ -12,7 +14,9 @@ from typing import List
 sys.path.insert(0, str(Path(__file__).parent))
 
 from tinker import Datum, ServiceClient
-from renderers_roast import get_renderer, iter_records
+from batching import TokenBudgetSampler
+from renderers_roast import get_renderer
+from token_shards import load_or_compile
 
 
 async def train_async():
@@ -25,7 +29,9 @@ async def train_async():
 
     BASE_MODEL = "meta-llama/Llama-3.1-8B-Instruct"
     DATASET_PATH = Path("datasets/roast/data/pilot.jsonl")
-    BATCH_SIZE = 8
+    MAX_BATCH_TOKENS = 8192  # tokens per step; the row count per batch varies
+    NUM_LENGTH_BUCKETS = 8
+    SEED = 0
     NUM_EPOCHS = 3
     LEARNING_RATE = 1e-4
     LORA_RANK = 64
@@ -43,28 +49,20 @@ async def train_async():
     # Prepare data
     print(f"Loading dataset from {DATASET_PATH}...")
     renderer = get_renderer(BASE_MODEL)
-    batches: List[List[Datum]] = []
-    current_batch = []
-
-    for record in iter_records(DATASET_PATH):
-        messages = renderer.apply_metadata(record)
-        tokens, weights = renderer.build_supervised_example(messages)
-
-        datum = Datum(
-            input_ids=tokens,
-            loss_weights=weights,
+    # Rendered and tokenized once per dataset, tokenizer and renderer version; later runs just map the shards.
+    shards = load_or_compile([DATASET_PATH], BASE_MODEL)
+    lengths: List[int] = shards.lengths.tolist()
+
+    def make_datum(index: int) -> Datum:
+        tokens, weights = shards[index]
+        return Datum(
+            input_ids=tokens.tolist(),
+            loss_weights=weights.tolist(),
             loss_fn="cross_entropy",
         )
-        current_batch.append(datum)
-
-        if len(current_batch) >= BATCH_SIZE:
-            batches.append(current_batch)
-            current_batch = []
 
-    if current_batch:
-        batches.append(current_batch)
-
-    print(f"Prepared {len(batches)} batches")
+    sampler = TokenBudgetSampler(lengths, MAX_BATCH_TOKENS, num_buckets=NUM_LENGTH_BUCKETS, seed=SEED)
+    print(f"Prepared {len(shards)} examples, {len(sampler.batches(0))} batches of <= {MAX_BATCH_TOKENS} tokens")
 
     # Async training loop with pipelining
     adam_params = {
@@ -81,8 +79,13 @@ async def train_async():
 
         # Pipeline: overlap forward_backward and optim_step
         pending_optim = None
+        epoch_start = time.perf_counter()
+        step_times: List[float] = []
+        epoch_tokens = 0
 
-        for batch_idx, batch in enumerate(batches):
+        for batch_idx, indices in enumerate(sampler.batches(epoch)):
+            step_start = time.perf_counter()
+            batch = [make_datum(i) for i in indices]
             # Submit forward_backward asynchronously
             fb_future = training_client.forward_backward_async(
                 data=batch,
@@ -100,6 +103,8 @@ async def train_async():
             pending_optim = training_client.optim_step_async(adam_params)
 
             total_steps += 1
+            epoch_tokens += sum(lengths[i] for i in indices)
+            step_times.append(time.perf_counter() - step_start)
 
             # Log progress
             if total_steps % 10 == 0:
@@ -110,6 +115,13 @@ async def train_async():
         if pending_optim is not None:
             await pending_optim
 
+        elapsed = time.perf_counter() - epoch_start
+        spread = statistics.pstdev(step_times) if len(step_times) > 1 else 0.0
+        print(
+            f"  {len(step_times)} steps, {epoch_tokens / elapsed:,.0f} tokens/s, "
+            f"step time {statistics.mean(step_times):.2f}s +/- {spread:.2f}s"
+        )
+
     # Save final model
     final_name = f"roastbot_async_epoch_{NUM_EPOCHS}"
     print(f"\nSaving final model: {final_name}")
@@ -1,15 +1,38 @@
+import asyncio
+import concurrent.futures
+import hashlib
+import itertools
+import json
+import math
 import os
+import random
+import sys
+import sqlite3
+import tempfile
+import threading
+import time
 import uuid
-from typing import List, Optional, Dict, Any
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional, Dict, Any, Set, Tuple
 
-from fastapi import FastAPI, HTTPException
+import numpy as np
+
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field, model_validator
 
 # Tinker SDK
 import tinker
 from tinker import types
 
+# Shared with the training scripts.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+from packing import pack_examples
+from parallel_tokenize import encode_parallel
+
 app = FastAPI(title="Tinker Backend", version="0.1.0")
 
 # Allow local dev from file:// or any origin
@@ -21,143 +44,1048 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# In-memory store (for demo; replace with DB for prod)
+# Live run state; finished runs are also persisted to RUNS_DB_PATH and reloaded on startup.
 RUNS: Dict[str, Dict[str, Any]] = {}
+RUNS_LOCK = threading.Lock()
+
+RUNS_DB_PATH = os.getenv("RUNS_DB_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "runs.sqlite3"))
+# Sampling clients kept alive at once; evicted ones are recreated from their sampling_path.
+SAMPLING_CACHE_SIZE = int(os.getenv("SAMPLING_CACHE_SIZE", "8"))
+SAMPLING_CACHE_IDLE_SECONDS = float(os.getenv("SAMPLING_CACHE_IDLE_SECONDS", "1800"))
+# Chats update last_used_at in memory; it is written to RUNS_DB_PATH on eviction and at this interval.
+LAST_USED_FLUSH_SECONDS = float(os.getenv("LAST_USED_FLUSH_SECONDS", "60"))
+# Most recently used runs whose sampling clients are created at startup.
+PREWARM_RUNS = int(os.getenv("PREWARM_RUNS", "0"))
+
+# Chat prompts for the same run arriving within this window are sampled together.
+CHAT_BATCH_WINDOW_MS = float(os.getenv("CHAT_BATCH_WINDOW_MS", "5"))
+CHAT_MAX_BATCH = int(os.getenv("CHAT_MAX_BATCH", "16"))
+CHAT_STOP = ["\n\n", "\nUser:"]
+# Prompt plus reply must fit in this many tokens; the oldest turns of a conversation are dropped to make room.
+CHAT_CONTEXT_TOKENS = int(os.getenv("CHAT_CONTEXT_TOKENS", "4096"))
+CHAT_MAX_SESSIONS = int(os.getenv("CHAT_MAX_SESSIONS", "1000"))
+CHAT_SESSION_IDLE_SECONDS = float(os.getenv("CHAT_SESSION_IDLE_SECONDS", "3600"))
+# Streamed replies are sampled in chunks that start small, for a fast first token, and double up to the max.
+CHAT_STREAM_FIRST_CHUNK = int(os.getenv("CHAT_STREAM_FIRST_CHUNK", "8"))
+CHAT_STREAM_MAX_CHUNK = int(os.getenv("CHAT_STREAM_MAX_CHUNK", "64"))
+
+# Tune jobs run on their own small pool so they never take threads from /api/chat.
+TUNE_MAX_WORKERS = int(os.getenv("TUNE_MAX_WORKERS", "4"))
+TUNE_MAX_JOBS_PER_MODEL = int(os.getenv("TUNE_MAX_JOBS_PER_MODEL", "2"))
+TUNE_MAX_QUEUED = int(os.getenv("TUNE_MAX_QUEUED", "32"))
+# Training steps submitted ahead of the oldest unfinished one, so the trainer never idles on a round trip.
+TUNE_PIPELINE_DEPTH = int(os.getenv("TUNE_PIPELINE_DEPTH", "2"))
+TUNE_EXECUTOR = ThreadPoolExecutor(max_workers=TUNE_MAX_WORKERS, thread_name_prefix="tune")
+TUNE_QUEUE: deque = deque()  # run_ids waiting for a worker, oldest first
+RUNNING_BY_MODEL: Dict[str, int] = {}
+
+# Uploaded datasets and their tokenized forms, named by content hash.
+DATASET_DIR = os.getenv("DATASET_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "dataset_store"))
+
+# Datasets at least this large are encoded across TOKENIZE_WORKERS spawned processes when the
+# tokenizer has no batch API (fast tokenizers already batch in parallel). 1 keeps it in-process.
+TOKENIZE_PROCESS_THRESHOLD = int(os.getenv("TOKENIZE_PROCESS_THRESHOLD", "20000"))
+TOKENIZE_WORKERS = int(os.getenv("TOKENIZE_WORKERS", "1"))
+
+TERMINAL_STATUSES = {"succeeded", "failed"}
 
 # ---------- Schemas ----------
 class TuneRequest(BaseModel):
-    jsonl: str = Field(..., description="Training data, one JSON object per line")
+    jsonl: Optional[str] = Field(None, description="Training data, one JSON object per line")
+    dataset_id: Optional[str] = Field(None, description="A dataset uploaded to /api/datasets, instead of `jsonl`")
     base_model: str = Field("meta-llama/Llama-3.2-1B", description="Base model to fine-tune")
-    steps: int = Field(4, ge=1, le=64, description="Number of training update steps")
+    steps: int = Field(
+        4, ge=1, le=64, description="Number of training update steps; ignored when `epochs` is given"
+    )
+    epochs: Optional[int] = Field(None, ge=1, le=64, description="Passes over the training data, instead of a fixed `steps`")
+    batch_size: int = Field(32, ge=1, le=1024, description="Examples per optimizer step")
+    pack_length: Optional[int] = Field(
+        None, ge=16, le=32768, description="Pack examples into sequences of up to this many tokens"
+    )
+    pack_separator: bool = Field(False, description="Put an EOS token between packed examples")
+
+    @model_validator(mode="after")
+    def check_data(self):
+        if (self.jsonl is None) == (self.dataset_id is None):
+            raise ValueError("Provide exactly one of `jsonl` or `dataset_id`.")
+        return self
 
 class TuneResponse(BaseModel):
     run_id: str
+    status: str
+    dataset_id: str
     sampling_path: Optional[str]
     model_id: Optional[str]
     steps: int
 
+class TuneStatus(BaseModel):
+    run_id: str
+    status: str = Field(..., description="queued, running, succeeded or failed")
+    phase: str = Field(..., description="queued, tokenizing, training, saving or ready")
+    base_model: str
+    dataset_id: Optional[str] = None
+    epoch: int
+    total_epochs: int
+    step: int
+    total_steps: int
+    loss: Optional[float] = None
+    error: Optional[str] = None
+    sampling_path: Optional[str] = None
+    packed_sequences: Optional[int] = None
+    packing_efficiency: Optional[float] = None
+
+class DatasetInfo(BaseModel):
+    dataset_id: str
+    rows: int
+    bytes: int
+
 class ChatRequest(BaseModel):
     run_id: str
     message: str
+    session_id: Optional[str] = Field(None, description="Continue this conversation; omit to start a new one")
     max_tokens: int = 256
     temperature: float = 0.2
 
 class ChatResponse(BaseModel):
     response: str
+    session_id: str
+
+# ---------- Run registry ----------
+# Run fields written to SQLite. Sampling clients and the current epoch and phase stay in memory.
+PERSISTED_FIELDS = [
+    "status",
+    "base_model",
+    "dataset_id",
+    "total_epochs",
+    "batch_size",
+    "pack_length",
+    "total_steps",
+    "step",
+    "loss",
+    "error",
+    "sampling_path",
+    "created_at",
+    "finished_at",
+    "last_used_at",
+]
+
+
+def db_connect() -> sqlite3.Connection:
+    conn = sqlite3.connect(RUNS_DB_PATH, timeout=30)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def init_registry() -> None:
+    columns = ", ".join(
+        f"{name} {'REAL' if name.endswith('_at') or name == 'loss' else 'TEXT'}" for name in PERSISTED_FIELDS
+    )
+    with db_connect() as conn:
+        conn.execute(f"CREATE TABLE IF NOT EXISTS runs (run_id TEXT PRIMARY KEY, {columns})")
+        existing = {row["name"] for row in conn.execute("PRAGMA table_info(runs)")}
+        for name in PERSISTED_FIELDS:
+            if name not in existing:
+                conn.execute(f"ALTER TABLE runs ADD COLUMN {name}")
+
+
+def save_run(run_id: str, run: Dict[str, Any]) -> None:
+    names = ", ".join(PERSISTED_FIELDS)
+    placeholders = ", ".join("?" for _ in PERSISTED_FIELDS)
+    with db_connect() as conn:
+        conn.execute(
+            f"INSERT OR REPLACE INTO runs (run_id, {names}) VALUES (?, {placeholders})",
+            [run_id] + [run.get(name) for name in PERSISTED_FIELDS],
+        )
+
+
+def save_last_used(times: Dict[str, float]) -> None:
+    if not times:
+        return
+    with db_connect() as conn:
+        conn.executemany(
+            "UPDATE runs SET last_used_at = ? WHERE run_id = ?", [(used, run_id) for run_id, used in times.items()]
+        )
+
+
+def load_runs() -> None:
+    """Load persisted runs into RUNS. Jobs cut off by a restart are marked failed."""
+    with db_connect() as conn:
+        rows = conn.execute("SELECT * FROM runs").fetchall()
+    for row in rows:
+        run = {name: row[name] for name in PERSISTED_FIELDS}
+        for name in ("total_epochs", "batch_size", "total_steps", "step"):
+            run[name] = int(run[name] or 0)
+        run["pack_length"] = int(run["pack_length"]) if run["pack_length"] else None
+        if run["status"] not in TERMINAL_STATUSES:
+            run.update(status="failed", error="Server restarted before the run finished.", finished_at=time.time())
+            save_run(row["run_id"], run)
+        succeeded = run["status"] == "succeeded"
+        run.update(
+            phase="ready" if succeeded else run["status"],
+            epoch=run["total_epochs"] if succeeded else 0,
+            version=0,
+        )
+        with RUNS_LOCK:
+            RUNS.setdefault(row["run_id"], run)
+
+
+class SamplingClientCache:
+    """LRU cache of live sampling clients, bounded in size and idle time.
+
+    Entries also carry when their run last served a chat. Those times are
+    saved to the registry when an entry is evicted or on ``flush()``, so the
+    chat path never writes to SQLite.
+    """
+
+    def __init__(self, max_size: int, idle_seconds: float):
+        self.max_size = max(max_size, 1)
+        self.idle_seconds = idle_seconds
+        # run_id -> (client, monotonic time of last access, last_used_at)
+        self._clients: "OrderedDict[str, Tuple[Any, float, Optional[float]]]" = OrderedDict()
+        # last_used_at values not yet written, including runs evicted since their last chat
+        self._unsaved: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def get(self, run_id: str, sampling_path: str):
+        with self._lock:
+            evicted = self._evict_idle()
+            entry = self._clients.pop(run_id, None)
+            if entry is not None:
+                self._clients[run_id] = (entry[0], time.monotonic(), entry[2])
+        save_last_used(evicted)
+        if entry is not None:
+            return entry[0]
+        # Created outside the lock so a slow connection does not block other runs.
+        client = tinker.ServiceClient().create_sampling_client(model_path=sampling_path)
+        self.put(run_id, client)
+        return client
+
+    def put(self, run_id: str, client: Any) -> None:
+        with self._lock:
+            entry = self._clients.pop(run_id, None)
+            self._clients[run_id] = (client, time.monotonic(), entry[2] if entry else None)
+            evicted: Dict[str, float] = {}
+            while len(self._clients) > self.max_size:
+                evicted.update(self._pop_oldest())
+        save_last_used(evicted)
+
+    def touch(self, run_id: str) -> None:
+        """Record a chat on ``run_id``, in memory only."""
+        now = time.time()
+        with self._lock:
+            entry = self._clients.get(run_id)
+            if entry is not None:
+                self._clients[run_id] = (entry[0], entry[1], now)
+            # Kept even if the entry was evicted since get(), so the next flush still saves it.
+            self._unsaved[run_id] = now
+        with RUNS_LOCK:
+            RUNS[run_id]["last_used_at"] = now
+
+    def flush(self) -> None:
+        with self._lock:
+            times, self._unsaved = self._unsaved, {}
+        save_last_used(times)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._clients)
+
+    def _pop_oldest(self) -> Dict[str, float]:
+        run_id, _ = self._clients.popitem(last=False)
+        if run_id in self._unsaved:
+            return {run_id: self._unsaved.pop(run_id)}
+        return {}
+
+    def _evict_idle(self) -> Dict[str, float]:
+        cutoff = time.monotonic() - self.idle_seconds
+        evicted: Dict[str, float] = {}
+        while self._clients and next(iter(self._clients.values()))[1] < cutoff:
+            evicted.update(self._pop_oldest())
+        return evicted
+
+
+SAMPLING_CLIENTS = SamplingClientCache(SAMPLING_CACHE_SIZE, SAMPLING_CACHE_IDLE_SECONDS)
+
+
+def prewarm_sampling_clients(limit: int) -> None:
+    with RUNS_LOCK:
+        recent = sorted(
+            (
+                (run.get("last_used_at") or run.get("finished_at") or 0, run_id, run["sampling_path"])
+                for run_id, run in RUNS.items()
+                if run["status"] == "succeeded" and run["sampling_path"]
+            ),
+            reverse=True,
+        )[: min(limit, SAMPLING_CLIENTS.max_size)]
+    for _, run_id, sampling_path in reversed(recent):
+        try:
+            SAMPLING_CLIENTS.get(run_id, sampling_path)
+        except Exception as e:
+            print(f"Prewarming sampling client for {run_id} failed: {e}")
 
-# ---------- Helpers ----------
 
-def parse_jsonl(text: str) -> List[Any]:
-    items = []
-    for i, line in enumerate(l for l in text.splitlines() if l.strip()):
+def flush_last_used_periodically() -> None:
+    while True:
+        time.sleep(LAST_USED_FLUSH_SECONDS)
         try:
-            import json
-            items.append(json.loads(line))
+            SAMPLING_CLIENTS.flush()
+        except sqlite3.Error as e:
+            print(f"Saving last_used_at failed: {e}")
+
+
+@app.on_event("startup")
+def startup() -> None:
+    init_registry()
+    load_runs()
+    threading.Thread(target=flush_last_used_periodically, daemon=True).start()
+    if PREWARM_RUNS > 0 and os.getenv("TINKER_API_KEY"):
+        threading.Thread(target=prewarm_sampling_clients, args=(PREWARM_RUNS,), daemon=True).start()
+
+
+@app.on_event("shutdown")
+def shutdown() -> None:
+    SAMPLING_CLIENTS.flush()
+
+
+# ---------- Chat batching ----------
+async def sample_async(
+    sampling_client, prompt_tokens: List[int], max_tokens: int, temperature: float, num_samples: int
+):
+    prompt = types.ModelInput.from_ints(prompt_tokens)
+    params = types.SamplingParams(max_tokens=max_tokens, temperature=temperature, stop=CHAT_STOP)
+    if hasattr(sampling_client, "sample_async"):
+        return await sampling_client.sample_async(prompt=prompt, sampling_params=params, num_samples=num_samples)
+    future = sampling_client.sample(prompt=prompt, sampling_params=params, num_samples=num_samples)
+    if isinstance(future, concurrent.futures.Future):
+        return await asyncio.wrap_future(future)
+    return await asyncio.to_thread(future.result)
+
+
+class ChatBatcher:
+    """Collects the chat prompts for one run that arrive within a short window.
+
+    All requests in a window are sent at once as overlapping futures. Requests
+    with the same prompt and settings share one call with ``num_samples`` set
+    to their count, and each caller gets its own sequence back.
+    """
+
+    def __init__(self, run_id: str, window_seconds: float, max_batch: int):
+        self.run_id = run_id
+        self.window_seconds = window_seconds
+        self.max_batch = max(max_batch, 1)
+        self.pending: List[Tuple[Any, List[int], int, float, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        # The loop only keeps weak references to tasks, so in-flight groups are held here.
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def sample(self, sampling_client, prompt_tokens: List[int], max_tokens: int, temperature: float):
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+        self.pending.append((sampling_client, prompt_tokens, max_tokens, temperature, waiter))
+        if len(self.pending) >= self.max_batch:
+            self.flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window_seconds, self.flush)
+        return await waiter
+
+    def flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if CHAT_BATCHERS.get(self.run_id) is self:
+            del CHAT_BATCHERS[self.run_id]
+
+        groups: Dict[Tuple[int, Tuple[int, ...], int, float], List[asyncio.Future]] = {}
+        clients: Dict[int, Any] = {}
+        for sampling_client, prompt_tokens, max_tokens, temperature, waiter in self.pending:
+            key = (id(sampling_client), tuple(prompt_tokens), max_tokens, temperature)
+            groups.setdefault(key, []).append(waiter)
+            clients[id(sampling_client)] = sampling_client
+        self.pending = []
+        for (client_id, prompt_tokens, max_tokens, temperature), waiters in groups.items():
+            task = asyncio.ensure_future(
+                self._sample_group(clients[client_id], list(prompt_tokens), max_tokens, temperature, waiters)
+            )
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    @staticmethod
+    async def _sample_group(sampling_client, prompt_tokens, max_tokens, temperature, waiters) -> None:
+        try:
+            result = await sample_async(sampling_client, prompt_tokens, max_tokens, temperature, len(waiters))
         except Exception as e:
-            raise HTTPException(status_code=400, detail=f"Invalid JSONL at line {i+1}: {e}")
-    return items
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.set_exception(e)
+            return
+        for waiter, sequence in zip(waiters, result.sequences):
+            if not waiter.done():
+                waiter.set_result(sequence)
+        # Fewer sequences than requested: fail the rest rather than leave them waiting.
+        for waiter in waiters[len(result.sequences) :]:
+            if not waiter.done():
+                waiter.set_exception(
+                    RuntimeError(f"Sampler returned {len(result.sequences)} of {len(waiters)} sequences.")
+                )
 
 
-def make_datum_from_pair(prompt: str, completion: str, tokenizer) -> types.Datum:
-    prompt_tokens = tokenizer.encode(prompt, add_special_tokens=True)
-    prompt_weights = [0] * len(prompt_tokens)
-    comp_tokens = tokenizer.encode(f" {completion}\n\n", add_special_tokens=False)
-    comp_weights = [1] * len(comp_tokens)
+# Open batch per run. A batcher is removed once flushed, so idle runs hold nothing.
+CHAT_BATCHERS: Dict[str, ChatBatcher] = {}
 
-    tokens = prompt_tokens + comp_tokens
-    weights = prompt_weights + comp_weights
 
-    input_tokens = tokens[:-1]
-    target_tokens = tokens[1:]
-    weights = weights[1:]
+def chat_batcher(run_id: str) -> ChatBatcher:
+    batcher = CHAT_BATCHERS.get(run_id)
+    if batcher is None:
+        batcher = CHAT_BATCHERS[run_id] = ChatBatcher(run_id, CHAT_BATCH_WINDOW_MS / 1000, CHAT_MAX_BATCH)
+    return batcher
 
-    return types.Datum(
-        model_input=types.ModelInput.from_ints(tokens=input_tokens),
-        loss_fn_inputs=dict(weights=weights, target_tokens=target_tokens),
-    )
 
+# ---------- Chat sessions ----------
+class ChatSession:
+    """A conversation with one run, kept as already-encoded tokens.
 
-def build_training_batch(items: List[Any], tokenizer) -> List[types.Datum]:
-    batch: List[types.Datum] = []
-    for it in items:
-        if isinstance(it, dict):
-            if "prompt" in it and "completion" in it:
-                prompt = str(it["prompt"]).rstrip("\n")
-                completion = str(it["completion"]).rstrip("\n")
-                datum = make_datum_from_pair(prompt, completion, tokenizer)
-            elif "input" in it and "output" in it:
-                prompt = f"Input: {str(it['input']).rstrip('\n')}\nOutput:"
-                completion = str(it["output"]).rstrip("\n")
-                datum = make_datum_from_pair(prompt, completion, tokenizer)
-            else:
-                # Fallback: stringified object
-                prompt = f"Instruction: {it}\nResponse:"
-                completion = ""
-                datum = make_datum_from_pair(prompt, completion, tokenizer)
+    Every turn is encoded once, when it is added, and old turns are dropped
+    from the front when the prompt and reply would exceed the context budget.
+    """
+
+    def __init__(self, session_id: str, run_id: str, tokenizer):
+        self.session_id = session_id
+        self.run_id = run_id
+        self.tokenizer = tokenizer
+        self.prefix: List[int] = tokenizer.encode("", add_special_tokens=True)
+        self.history: List[int] = []
+        self.turn_lengths: deque = deque()
+        self.pending: List[int] = []
+        self.lock = asyncio.Lock()
+
+    def prompt_for(self, message: str, max_tokens: int) -> List[int]:
+        self.pending = self.tokenizer.encode(f"User: {message}\nAssistant:", add_special_tokens=False)
+        budget = CHAT_CONTEXT_TOKENS - max_tokens - len(self.prefix) - len(self.pending)
+        while self.turn_lengths and len(self.history) > budget:
+            del self.history[: self.turn_lengths.popleft()]
+        return self.prefix + self.history + self.pending
+
+    def add_reply(self, reply: str) -> None:
+        turn = self.pending + self.tokenizer.encode(f" {reply}\n\n", add_special_tokens=False)
+        self.history.extend(turn)
+        self.turn_lengths.append(len(turn))
+        self.pending = []
+
+
+# Only touched from the event loop, so no lock. Least recently used first.
+CHAT_SESSIONS: "OrderedDict[str, Tuple[ChatSession, float]]" = OrderedDict()
+
+
+def chat_session(session_id: Optional[str], run_id: str, tokenizer: Any = None) -> ChatSession:
+    """The open session ``session_id``, or a new one using ``tokenizer`` when it is None."""
+    cutoff = time.monotonic() - CHAT_SESSION_IDLE_SECONDS
+    while CHAT_SESSIONS and next(iter(CHAT_SESSIONS.values()))[1] < cutoff:
+        CHAT_SESSIONS.popitem(last=False)
+
+    if session_id is None:
+        session = ChatSession(str(uuid.uuid4()), run_id, tokenizer)
+    else:
+        entry = CHAT_SESSIONS.pop(session_id, None)
+        if entry is None:
+            raise HTTPException(status_code=404, detail="Unknown or expired session_id. Start a new conversation.")
+        session = entry[0]
+        if session.run_id != run_id:
+            CHAT_SESSIONS[session_id] = entry
+            raise HTTPException(status_code=409, detail="session_id belongs to a different run.")
+    CHAT_SESSIONS[session.session_id] = (session, time.monotonic())
+    while len(CHAT_SESSIONS) > max(CHAT_MAX_SESSIONS, 1):
+        CHAT_SESSIONS.popitem(last=False)
+    return session
+
+
+# ---------- Chat streaming ----------
+class StopScanner:
+    """Turns the growing decoded reply into deltas that are safe to send.
+
+    Text that could still turn into a stop sequence, or a half-decoded
+    character, is held back until the next tokens settle it. Nothing at or
+    after the first stop sequence is ever emitted.
+    """
+
+    def __init__(self, stops: List[str]):
+        self.stops = stops
+        self.text = ""
+        self.emitted = 0
+        self.stopped = False
+
+    def feed(self, decoded: str, final: bool = False) -> str:
+        text = decoded.lstrip()
+        cuts = [index for index in (text.find(stop) for stop in self.stops) if index >= 0]
+        if cuts:
+            self.stopped = True
+            end = min(cuts)
+        elif final:
+            end = len(text)
         else:
-            prompt = f"Instruction: {it}\nResponse:"
-            completion = ""
-            datum = make_datum_from_pair(prompt, completion, tokenizer)
-        batch.append(datum)
+            end = len(text.rstrip("\ufffd"))
+            hold = max(
+                (size for stop in self.stops for size in range(1, len(stop)) if text[:end].endswith(stop[:size])),
+                default=0,
+            )
+            end -= hold
+        self.text = text[:end] if self.stopped or final else text
+        delta = text[self.emitted : end]
+        self.emitted = max(self.emitted, end)
+        return delta
+
+
+async def sample_chunks(run_id: str, sampling_client, prompt_tokens: List[int], max_tokens: int, temperature: float):
+    """Yield the reply's tokens a chunk at a time, continuing from everything sampled so far."""
+    generated: List[int] = []
+    size = max(CHAT_STREAM_FIRST_CHUNK, 1)
+    while len(generated) < max_tokens:
+        count = min(size, max_tokens - len(generated))
+        sequence = await chat_batcher(run_id).sample(sampling_client, prompt_tokens + generated, count, temperature)
+        generated.extend(sequence.tokens)
+        yield sequence.tokens
+        if len(sequence.tokens) < count or getattr(sequence, "stop_reason", None) == "stop":
+            return
+        size = min(size * 2, max(CHAT_STREAM_MAX_CHUNK, 1))
+
+
+def sse_event(event: str, payload: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+
+# ---------- Helpers ----------
+
+def parse_jsonl_line(line: bytes, line_number: int) -> Any:
+    try:
+        return json.loads(line)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid JSONL at line {line_number}: {e}")
+
+
+def example_to_pair(it: Any) -> Tuple[str, str]:
+    """Map one JSONL record to a (prompt, completion) pair."""
+    if isinstance(it, dict):
+        if "prompt" in it and "completion" in it:
+            return str(it["prompt"]).rstrip("\n"), str(it["completion"]).rstrip("\n")
+        if "input" in it and "output" in it:
+            input_text = str(it["input"]).rstrip("\n")
+            return f"Input: {input_text}\nOutput:", str(it["output"]).rstrip("\n")
+    # Fallback: stringified object
+    return f"Instruction: {it}\nResponse:", ""
+
+
+def _encode_texts(tokenizer, texts: List[str], add_special_tokens: bool) -> List[List[int]]:
+    # HF fast tokenizers encode a whole list in one call, in parallel in Rust; anything else goes one by one.
+    if getattr(tokenizer, "is_fast", False):
+        return tokenizer(texts, add_special_tokens=add_special_tokens)["input_ids"]
+    return [tokenizer.encode(text, add_special_tokens=add_special_tokens) for text in texts]
+
+
+def tokenize_pairs(
+    pairs: List[Tuple[str, str]], tokenizer
+) -> Tuple[List[List[int]], List[List[int]]]:
+    """Encode all prompts and all completions, batched or across processes when that helps."""
+    prompts = [prompt for prompt, _ in pairs]
+    completions = [f" {completion}\n\n" for _, completion in pairs]
+    if (
+        TOKENIZE_WORKERS > 1
+        and len(pairs) >= TOKENIZE_PROCESS_THRESHOLD
+        and not getattr(tokenizer, "is_fast", False)
+    ):
+        prompt_ids, completion_ids = encode_parallel(
+            tokenizer, [(prompts, True), (completions, False)], TOKENIZE_WORKERS
+        )
+        return prompt_ids, completion_ids
+    return _encode_texts(tokenizer, prompts, True), _encode_texts(tokenizer, completions, False)
+
+
+def flatten_token_ids(
+    prompt_ids: List[List[int]], completion_ids: List[List[int]]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """One flat token array plus the lengths of its prompt, completion, prompt, ... pieces."""
+    pieces = [ids for pair in zip(prompt_ids, completion_ids) for ids in pair]
+    lengths = np.fromiter((len(ids) for ids in pieces), dtype=np.int64, count=len(pieces))
+    tokens = np.fromiter(itertools.chain.from_iterable(pieces), dtype=np.int64, count=int(lengths.sum()))
+    return tokens, lengths
+
+
+def datums_from_arrays(tokens: np.ndarray, lengths: np.ndarray) -> List[types.Datum]:
+    """Build shifted inputs, targets and weights for every example from one flat token array."""
+    lengths = lengths.astype(np.int64)
+    # Prompt tokens get weight 0 and completion tokens weight 1.
+    weights = np.repeat(np.tile(np.array([0, 1], dtype=np.int64), len(lengths) // 2), lengths)
+    ends = np.cumsum(lengths[1::2] + lengths[0::2])
+    starts = ends - lengths[1::2] - lengths[0::2]
+
+    batch: List[types.Datum] = []
+    for start, end in zip(starts.tolist(), ends.tolist()):
+        batch.append(
+            types.Datum(
+                model_input=types.ModelInput.from_ints(tokens=tokens[start : end - 1].tolist()),
+                loss_fn_inputs=dict(
+                    weights=weights[start + 1 : end].tolist(),
+                    target_tokens=tokens[start + 1 : end].tolist(),
+                ),
+            )
+        )
     return batch
 
 
-# ---------- Endpoints ----------
-@app.post("/api/tune", response_model=TuneResponse)
-def tune(req: TuneRequest):
-    if not os.getenv("TINKER_API_KEY"):
-        raise HTTPException(status_code=500, detail="TINKER_API_KEY is not set on server")
+def examples_from_arrays(tokens: np.ndarray, lengths: np.ndarray) -> List[Tuple[List[int], List[int]]]:
+    """Split a flat token array back into per-example (tokens, weights) lists."""
+    examples = []
+    offset = 0
+    flat = tokens.tolist()
+    for prompt_length, completion_length in zip(lengths[0::2].tolist(), lengths[1::2].tolist()):
+        end = offset + prompt_length + completion_length
+        examples.append((flat[offset:end], [0] * prompt_length + [1] * completion_length))
+        offset = end
+    return examples
+
+
+def datums_from_examples(examples: List[Tuple[List[int], List[float]]]) -> List[types.Datum]:
+    return [
+        types.Datum(
+            model_input=types.ModelInput.from_ints(tokens=tokens[:-1]),
+            loss_fn_inputs=dict(weights=weights[1:], target_tokens=tokens[1:]),
+        )
+        for tokens, weights in examples
+    ]
+
+
+# ---------- Dataset store ----------
+def dataset_path(dataset_id: str) -> str:
+    return os.path.join(DATASET_DIR, f"{dataset_id}.jsonl")
+
+
+def info_path(dataset_id: str) -> str:
+    return os.path.join(DATASET_DIR, f"{dataset_id}.json")
+
+
+def tokenized_path(dataset_id: str, base_model: str) -> str:
+    # Keyed by base model, which determines the tokenizer.
+    model_key = hashlib.sha256(base_model.encode()).hexdigest()[:16]
+    return os.path.join(DATASET_DIR, f"{dataset_id}.{model_key}.npz")
+
+
+def dataset_info(dataset_id: str) -> DatasetInfo:
+    if len(dataset_id) != 64 or not all(c in "0123456789abcdef" for c in dataset_id):
+        raise HTTPException(status_code=404, detail="Unknown dataset_id.")
+    try:
+        with open(info_path(dataset_id)) as f:
+            return DatasetInfo(**json.load(f))
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Unknown dataset_id.")
+
+
+class DatasetWriter:
+    """Hashes, validates and spools a JSONL upload chunk by chunk.
+
+    Nothing is kept in memory beyond the current partial line. On commit the
+    file is stored under its SHA-256, so uploading the same data twice yields
+    the same dataset_id.
+    """
+
+    def __init__(self):
+        os.makedirs(DATASET_DIR, exist_ok=True)
+        fd, self.tmp_path = tempfile.mkstemp(dir=DATASET_DIR, suffix=".part")
+        self.file = os.fdopen(fd, "wb")
+        self.digest = hashlib.sha256()
+        self.buffer = b""
+        self.lines = 0
+        self.rows = 0
+        self.size = 0
+
+    def write(self, chunk: bytes) -> None:
+        self.digest.update(chunk)
+        self.file.write(chunk)
+        self.size += len(chunk)
+        *lines, self.buffer = (self.buffer + chunk).split(b"\n")
+        for line in lines:
+            self._check(line)
+
+    def _check(self, line: bytes) -> None:
+        self.lines += 1
+        if line.strip():
+            parse_jsonl_line(line, self.lines)
+            self.rows += 1
+
+    def commit(self) -> DatasetInfo:
+        try:
+            self._check(self.buffer)
+            self.file.close()
+            if not self.rows:
+                raise HTTPException(status_code=400, detail="Training data is empty.")
+            info = DatasetInfo(dataset_id=self.digest.hexdigest(), rows=self.rows, bytes=self.size)
+            # The metadata file marks a complete dataset, so it is written last and atomically.
+            if not os.path.exists(info_path(info.dataset_id)):
+                os.replace(self.tmp_path, dataset_path(info.dataset_id))
+                fd, tmp_info = tempfile.mkstemp(dir=DATASET_DIR, suffix=".json.part")
+                with os.fdopen(fd, "w") as f:
+                    f.write(info.model_dump_json())
+                os.replace(tmp_info, info_path(info.dataset_id))
+            return info
+        finally:
+            self.discard()
+
+    def discard(self) -> None:
+        self.file.close()
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+
+def store_dataset_text(text: str) -> DatasetInfo:
+    data = text.encode()
+    dataset_id = hashlib.sha256(data).hexdigest()
+    if os.path.exists(info_path(dataset_id)):
+        return dataset_info(dataset_id)
+    writer = DatasetWriter()
+    try:
+        writer.write(data)
+    except BaseException:
+        writer.discard()
+        raise
+    return writer.commit()
+
+
+def load_token_arrays(dataset_id: str, base_model: str, tokenizer) -> Tuple[np.ndarray, np.ndarray]:
+    """Flat tokens and piece lengths for a stored dataset, tokenized only the first time per model."""
+    cache_path = tokenized_path(dataset_id, base_model)
+    if os.path.exists(cache_path):
+        with np.load(cache_path) as cached:
+            return cached["tokens"], cached["lengths"]
+
+    with open(dataset_path(dataset_id), "rb") as f:
+        pairs = [
+            example_to_pair(parse_jsonl_line(line, number))
+            for number, line in enumerate(f, start=1)
+            if line.strip()
+        ]
+    tokens, lengths = flatten_token_ids(*tokenize_pairs(pairs, tokenizer))
+    fd, tmp_path = tempfile.mkstemp(dir=DATASET_DIR, suffix=".npz.part")
+    with os.fdopen(fd, "wb") as f:
+        np.savez(f, tokens=tokens.astype(np.int32), lengths=lengths.astype(np.int32))
+    os.replace(tmp_path, cache_path)
+    return tokens, lengths
+
 
-    items = parse_jsonl(req.jsonl)
+# ---------- Tune jobs ----------
+def extract_loss(result: Any) -> Optional[float]:
+    """Best-effort mean loss from a forward_backward result."""
+    metrics = getattr(result, "metrics", None) or {}
+    for key, value in metrics.items():
+        if "loss" in key:
+            try:
+                return float(value)
+            except (TypeError, ValueError):
+                return None
+    return None
+
+
+def update_run(run_id: str, **fields: Any) -> None:
+    with RUNS_LOCK:
+        run = RUNS[run_id]
+        run.update(fields)
+        run["version"] += 1
+        snapshot = dict(run) if "status" in fields else None
+    if snapshot is not None:
+        save_run(run_id, snapshot)
+
+
+def run_status(run_id: str) -> TuneStatus:
+    with RUNS_LOCK:
+        run = RUNS.get(run_id)
+        if not run:
+            raise HTTPException(status_code=404, detail="Unknown run_id.")
+        return TuneStatus(
+            run_id=run_id,
+            status=run["status"],
+            phase=run["phase"],
+            base_model=run["base_model"],
+            dataset_id=run["dataset_id"],
+            epoch=run["epoch"],
+            total_epochs=run["total_epochs"],
+            step=run["step"],
+            total_steps=run["total_steps"],
+            loss=run["loss"],
+            error=run["error"],
+            sampling_path=run["sampling_path"],
+            packed_sequences=run.get("packed_sequences"),
+            packing_efficiency=run.get("packing_efficiency"),
+        )
+
+
+def iter_minibatches(batch: List[types.Datum], batch_size: int, epochs: int):
+    """Yield (epoch, mini-batch) pairs, reshuffling the examples every epoch."""
+    order = list(range(len(batch)))
+    for epoch in range(epochs):
+        random.Random(epoch).shuffle(order)
+        for start in range(0, len(order), batch_size):
+            yield epoch, [batch[i] for i in order[start : start + batch_size]]
+
+
+def run_tune_job(run_id: str) -> None:
+    with RUNS_LOCK:
+        run = RUNS[run_id]
+        base_model, batch_size, epochs = run["base_model"], run["batch_size"], run["total_epochs"]
+        max_steps, total_steps = run["max_steps"], run["total_steps"]
+        dataset_id, pack_length, pack_separator = run["dataset_id"], run["pack_length"], run["pack_separator"]
+    update_run(run_id, status="running", phase="tokenizing", started_at=time.time())
 
     service_client = tinker.ServiceClient()
-    training_client = service_client.create_lora_training_client(base_model=req.base_model)
+    training_client = service_client.create_lora_training_client(base_model=base_model)
     tokenizer = training_client.get_tokenizer()
 
-    batch = build_training_batch(items, tokenizer)
+    tokens, lengths = load_token_arrays(dataset_id, base_model, tokenizer)
+    if pack_length:
+        eos = getattr(tokenizer, "eos_token_id", None)
+        separator = [eos] if pack_separator and eos is not None else []
+        packed, stats = pack_examples(examples_from_arrays(tokens, lengths), pack_length, separator)
+        batch = datums_from_examples(packed)
+        steps_per_epoch = math.ceil(len(batch) / batch_size)
+        if max_steps:
+            epochs = math.ceil(max_steps / steps_per_epoch)
+        else:
+            total_steps = epochs * steps_per_epoch
+        update_run(
+            run_id,
+            total_epochs=epochs,
+            total_steps=total_steps,
+            packed_sequences=stats.sequences,
+            packing_efficiency=stats.efficiency,
+        )
+    else:
+        batch = datums_from_arrays(tokens, lengths)
 
-    import numpy as np
+    update_run(run_id, phase="training")
+    adam = types.AdamParams(learning_rate=1e-4)
+    # Steps N+1.. are queued on the trainer before step N's results are awaited.
+    in_flight: deque = deque()
+    step = 0
 
-    for _ in range(req.steps):
-        fwb = training_client.forward_backward(batch, "cross_entropy")
-        opt = training_client.optim_step(types.AdamParams(learning_rate=1e-4))
-        # block until applied
-        _ = fwb.result()
+    def finish_oldest() -> None:
+        nonlocal step
+        epoch, fwb, opt = in_flight.popleft()
+        fwb_result = fwb.result()
         _ = opt.result()
+        step += 1
+        update_run(run_id, epoch=epoch + 1, step=step, loss=extract_loss(fwb_result))
+
+    for epoch, minibatch in itertools.islice(iter_minibatches(batch, batch_size, epochs), total_steps):
+        fwb = training_client.forward_backward(minibatch, "cross_entropy")
+        opt = training_client.optim_step(adam)
+        in_flight.append((epoch, fwb, opt))
+        if len(in_flight) > TUNE_PIPELINE_DEPTH:
+            finish_oldest()
+    while in_flight:
+        finish_oldest()
 
     # Save weights for sampling and get a client
+    update_run(run_id, phase="saving")
     save_resp = training_client.save_weights_for_sampler(name="final").result()
     sampling_path = save_resp.path
-    sampling_client = service_client.create_sampling_client(model_path=sampling_path)
+    SAMPLING_CLIENTS.put(run_id, service_client.create_sampling_client(model_path=sampling_path))
+
+    update_run(
+        run_id,
+        status="succeeded",
+        phase="ready",
+        sampling_path=sampling_path,
+        finished_at=time.time(),
+    )
+
+
+def execute_tune_job(run_id: str, base_model: str) -> None:
+    try:
+        run_tune_job(run_id)
+    except Exception as e:
+        update_run(run_id, status="failed", error=str(e), finished_at=time.time())
+    finally:
+        with RUNS_LOCK:
+            RUNNING_BY_MODEL[base_model] -= 1
+        dispatch_tune_jobs()
+
+
+def dispatch_tune_jobs() -> None:
+    """Start queued jobs, oldest first, while their base model is under its cap."""
+    to_start = []
+    with RUNS_LOCK:
+        for run_id in list(TUNE_QUEUE):
+            run = RUNS[run_id]
+            if RUNNING_BY_MODEL.get(run["base_model"], 0) >= TUNE_MAX_JOBS_PER_MODEL:
+                continue
+            TUNE_QUEUE.remove(run_id)
+            RUNNING_BY_MODEL[run["base_model"]] = RUNNING_BY_MODEL.get(run["base_model"], 0) + 1
+            to_start.append((run_id, run["base_model"]))
+    for args in to_start:
+        TUNE_EXECUTOR.submit(execute_tune_job, *args)
+
+
+# ---------- Endpoints ----------
+@app.post("/api/tune", response_model=TuneResponse, status_code=202)
+def tune(req: TuneRequest):
+    if not os.getenv("TINKER_API_KEY"):
+        raise HTTPException(status_code=500, detail="TINKER_API_KEY is not set on server")
+
+    dataset = store_dataset_text(req.jsonl) if req.jsonl is not None else dataset_info(req.dataset_id)
+
+    steps_per_epoch = math.ceil(dataset.rows / req.batch_size)
+    if req.epochs:
+        epochs, max_steps = req.epochs, None
+        total_steps = epochs * steps_per_epoch
+    else:
+        epochs, max_steps = math.ceil(req.steps / steps_per_epoch), req.steps
+        total_steps = max_steps
 
     run_id = str(uuid.uuid4())
-    RUNS[run_id] = {
-        "sampling_path": sampling_path,
-        "sampling_client": sampling_client,
-        "base_model": req.base_model,
-    }
+    with RUNS_LOCK:
+        if len(TUNE_QUEUE) >= TUNE_MAX_QUEUED:
+            raise HTTPException(status_code=429, detail="Too many tune jobs queued. Try again later.")
+        RUNS[run_id] = {
+            "status": "queued",
+            "phase": "queued",
+            "base_model": req.base_model,
+            "dataset_id": dataset.dataset_id,
+            "epoch": 0,
+            "total_epochs": epochs,
+            "max_steps": max_steps,
+            "batch_size": req.batch_size,
+            "pack_length": req.pack_length,
+            "pack_separator": req.pack_separator,
+            "step": 0,
+            "total_steps": total_steps,
+            "loss": None,
+            "error": None,
+            "sampling_path": None,
+            "created_at": time.time(),
+            "finished_at": None,
+            "last_used_at": None,
+            "version": 0,
+        }
+        TUNE_QUEUE.append(run_id)
+        snapshot = dict(RUNS[run_id])
+    save_run(run_id, snapshot)
+    dispatch_tune_jobs()
 
-    return TuneResponse(run_id=run_id, sampling_path=sampling_path, model_id=run_id, steps=req.steps)
+    return TuneResponse(
+        run_id=run_id,
+        status="queued",
+        dataset_id=dataset.dataset_id,
+        sampling_path=None,
+        model_id=run_id,
+        steps=total_steps,
+    )
 
 
-@app.post("/api/chat", response_model=ChatResponse)
-def chat(req: ChatRequest):
+@app.post("/api/datasets", response_model=DatasetInfo, status_code=201)
+async def upload_dataset(request: Request):
+    """Store a JSONL dataset sent as the raw request body, streamed and validated line by line."""
+    writer = DatasetWriter()
+    try:
+        async for chunk in request.stream():
+            await asyncio.to_thread(writer.write, chunk)
+    except BaseException:
+        writer.discard()
+        raise
+    return await asyncio.to_thread(writer.commit)
+
+
+@app.get("/api/datasets/{dataset_id}", response_model=DatasetInfo)
+def get_dataset(dataset_id: str):
+    return dataset_info(dataset_id)
+
+
+@app.get("/api/tune/{run_id}", response_model=TuneStatus)
+def tune_status(run_id: str):
+    return run_status(run_id)
+
+
+@app.get("/api/tune/{run_id}/events")
+async def tune_events(run_id: str):
+    """Server-sent events with the job's status on every change, until it finishes."""
+    run_status(run_id)  # 404 before the stream starts
+
+    async def stream():
+        seen = -1
+        last_sent = time.monotonic()
+        while True:
+            with RUNS_LOCK:
+                version = RUNS[run_id]["version"]
+            if version != seen:
+                seen = version
+                status = run_status(run_id)
+                yield f"event: status\ndata: {status.model_dump_json()}\n\n"
+                last_sent = time.monotonic()
+                if status.status in TERMINAL_STATUSES:
+                    return
+            elif time.monotonic() - last_sent > 15:
+                yield ": keep-alive\n\n"
+                last_sent = time.monotonic()
+            await asyncio.sleep(0.25)
+
+    return StreamingResponse(stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+async def prepare_chat(req: ChatRequest) -> Tuple[Any, ChatSession]:
     run = RUNS.get(req.run_id)
     if not run:
         raise HTTPException(status_code=404, detail="Unknown run_id. Fine-tune first.")
+    if run["status"] != "succeeded":
+        raise HTTPException(status_code=409, detail=f"Run is {run['status']}; wait for fine-tuning to finish.")
+
+    sampling_client = await asyncio.to_thread(SAMPLING_CLIENTS.get, req.run_id, run["sampling_path"])
+    SAMPLING_CLIENTS.touch(req.run_id)
+    # Loading a tokenizer can read or download files, so it stays off the event loop.
+    tokenizer = await asyncio.to_thread(sampling_client.get_tokenizer) if req.session_id is None else None
+    return sampling_client, chat_session(req.session_id, req.run_id, tokenizer)
+
+
+@app.post("/api/chat", response_model=ChatResponse)
+async def chat(req: ChatRequest):
+    sampling_client, session = await prepare_chat(req)
+    async with session.lock:
+        prompt_tokens = session.prompt_for(req.message, req.max_tokens)
+        sequence = await chat_batcher(req.run_id).sample(
+            sampling_client, prompt_tokens, req.max_tokens, req.temperature
+        )
+        text = session.tokenizer.decode(sequence.tokens).strip()
+        session.add_reply(text)
+    return ChatResponse(response=text, session_id=session.session_id)
+
 
-    sampling_client = run["sampling_client"]
+@app.post("/api/chat/stream")
+async def chat_stream(req: ChatRequest):
+    """Server-sent `token` events with decoded text as it is sampled, then `done` with the full reply."""
+    sampling_client, session = await prepare_chat(req)
 
-    # Build a simple prompt
-    prompt_text = f"User: {req.message}\nAssistant:"
+    async def stream():
+        scanner = StopScanner(CHAT_STOP)
+        generated: List[int] = []
+        async with session.lock:
+            prompt_tokens = session.prompt_for(req.message, req.max_tokens)
+            try:
+                async for tokens in sample_chunks(
+                    req.run_id, sampling_client, prompt_tokens, req.max_tokens, req.temperature
+                ):
+                    generated.extend(tokens)
+                    delta = scanner.feed(session.tokenizer.decode(generated))
+                    if delta:
+                        yield sse_event("token", {"text": delta})
+                    if scanner.stopped:
+                        break
+                if not scanner.stopped:
+                    delta = scanner.feed(session.tokenizer.decode(generated), final=True)
+                    if delta:
+                        yield sse_event("token", {"text": delta})
+            except Exception as e:
+                yield sse_event("error", {"detail": str(e)})
+                return
+            reply = scanner.text.strip()
+            session.add_reply(reply)
+        yield sse_event("done", {"response": reply, "session_id": session.session_id})
 
-    tokenizer = sampling_client.get_tokenizer()
-    prompt = types.ModelInput.from_ints(tokenizer.encode(prompt_text, add_special_tokens=True))
+    return StreamingResponse(stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
 
-    params = types.SamplingParams(max_tokens=req.max_tokens, temperature=req.temperature, stop=["\n\n", "\nUser:"])
-    future = sampling_client.sample(prompt=prompt, sampling_params=params, num_samples=1)
-    result = future.result()
 
-    seq = result.sequences[0].tokens
-    text = tokenizer.decode(seq)
-    return ChatResponse(response=text.strip())
+@app.delete("/api/chat/sessions/{session_id}", status_code=204)
+async def end_chat_session(session_id: str):
+    CHAT_SESSIONS.pop(session_id, None)
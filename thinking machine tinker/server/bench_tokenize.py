@@ -0,0 +1,165 @@
+"""Benchmark the tune path's dataset preparation against the original per-example implementation.
+
+Usage (from ``server/``):
+
+    python bench_tokenize.py --rows 20000
+    python bench_tokenize.py --rows 100000 --model meta-llama/Llama-3.2-1B --workers 8
+    python bench_tokenize.py --offline --tokenizer-file path/to/tokenizer.json
+
+Rows are synthesized from the roast pilot dataset and stored the way
+``/api/tune`` stores them, in a temporary DATASET_DIR. Each run times what a
+tune job does: ``load_token_arrays`` (on a cold cache: parse, tokenize and
+write the cache; on a warm one: read it) followed by ``datums_from_arrays``.
+The legacy path is the original one-example-at-a-time implementation, kept
+here for comparison. With ``--workers`` above 1 the spawned-process path is
+timed as well.
+
+``--offline`` runs against ``scripts/fake_tinker.py`` instead of the real SDK.
+Its byte-level tokenizer has no batch API, so both paths encode one text at a
+time. ``--tokenizer-file`` loads a ``tokenizer.json`` as a Hugging Face fast
+tokenizer (needs ``transformers``), which exercises the batched path without
+network access.
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, List
+
+ROOT = Path(__file__).resolve().parent.parent
+DATASET_PATH = ROOT / "datasets" / "roast" / "data" / "pilot.jsonl"
+
+
+def legacy_make_datum_from_pair(prompt: str, completion: str, tokenizer, types):
+    prompt_tokens = tokenizer.encode(prompt, add_special_tokens=True)
+    prompt_weights = [0] * len(prompt_tokens)
+    comp_tokens = tokenizer.encode(f" {completion}\n\n", add_special_tokens=False)
+    comp_weights = [1] * len(comp_tokens)
+
+    tokens = prompt_tokens + comp_tokens
+    weights = prompt_weights + comp_weights
+
+    return types.Datum(
+        model_input=types.ModelInput.from_ints(tokens=tokens[:-1]),
+        loss_fn_inputs=dict(weights=weights[1:], target_tokens=tokens[1:]),
+    )
+
+
+def legacy_build_training_batch(items: List[Any], tokenizer, example_to_pair) -> list:
+    from tinker import types
+
+    return [legacy_make_datum_from_pair(*example_to_pair(it), tokenizer, types) for it in items]
+
+
+def synthesize_rows(count: int) -> List[dict]:
+    seeds = []
+    with DATASET_PATH.open() as f:
+        for line in f:
+            if line.strip():
+                messages = json.loads(line)["messages"]
+                user = next(m["content"] for m in messages if m["role"] == "user")
+                assistant = next(m["content"] for m in messages if m["role"] == "assistant")
+                seeds.append((user, assistant))
+    return [
+        {"prompt": f"{seeds[i % len(seeds)][0]} (#{i})", "completion": seeds[i % len(seeds)][1]}
+        for i in range(count)
+    ]
+
+
+def load_tokenizer(args):
+    if args.tokenizer_file:
+        from transformers import PreTrainedTokenizerFast
+
+        return PreTrainedTokenizerFast(tokenizer_file=str(args.tokenizer_file), bos_token="<s>")
+    from tinker_cookbook import tokenizer_utils
+
+    return tokenizer_utils.get_tokenizer(args.model)
+
+
+def tune_path(app, dataset_id: str, model: str, tokenizer, cold: bool = True) -> list:
+    """Dataset preparation as in run_tune_job without packing, by default on a cold cache."""
+    cache_path = app.tokenized_path(dataset_id, model)
+    if cold and os.path.exists(cache_path):
+        os.remove(cache_path)
+    return app.datums_from_arrays(*app.load_token_arrays(dataset_id, model, tokenizer))
+
+
+def timed(label: str, rows: int, fn: Callable[[], list], repeat: int) -> list:
+    """Run ``fn`` ``repeat`` times with the collector paused and report the fastest run."""
+    best = float("inf")
+    for _ in range(repeat):
+        batch = None
+        gc.collect()
+        gc.disable()
+        try:
+            started = time.perf_counter()
+            batch = fn()
+            best = min(best, time.perf_counter() - started)
+        finally:
+            gc.enable()
+    print(f"{label:<28} {best:>8.2f}s {rows / best:>12,.0f} rows/s")
+    return batch
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--model", default="meta-llama/Llama-3.2-1B", help="Model whose tokenizer to load.")
+    parser.add_argument("--tokenizer-file", type=Path, help="tokenizer.json to load instead of --model's tokenizer.")
+    parser.add_argument("--offline", action="store_true", help="Use scripts/fake_tinker.py instead of the Tinker SDK.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per path; the fastest is reported.")
+    parser.add_argument("--workers", type=int, default=1, help="Also time TOKENIZE_WORKERS spawned processes.")
+    args = parser.parse_args()
+
+    if args.offline:
+        sys.path.insert(0, str(ROOT / "scripts"))
+        import fake_tinker
+
+        fake_tinker.install()
+    workdir = tempfile.TemporaryDirectory()
+    os.environ["DATASET_DIR"] = workdir.name
+    import app
+
+    tokenizer = load_tokenizer(args)
+    text = "".join(json.dumps(item) + "\n" for item in synthesize_rows(args.rows))
+    dataset_id = app.store_dataset_text(text).dataset_id
+    print(f"{args.rows} rows, tokenizer {type(tokenizer).__name__}, batch API: {getattr(tokenizer, 'is_fast', False)}")
+
+    legacy = timed(
+        "legacy (per example)",
+        args.rows,
+        lambda: legacy_build_training_batch(
+            [json.loads(line) for line in text.splitlines()], tokenizer, app.example_to_pair
+        ),
+        args.repeat,
+    )
+    app.TOKENIZE_WORKERS = 1
+    results = [
+        timed("tune path, cold cache", args.rows, lambda: tune_path(app, dataset_id, args.model, tokenizer), args.repeat),
+        timed(
+            "tune path, warm cache",
+            args.rows,
+            lambda: tune_path(app, dataset_id, args.model, tokenizer, cold=False),
+            args.repeat,
+        ),
+    ]
+    if args.workers > 1:
+        app.TOKENIZE_WORKERS = args.workers
+        app.TOKENIZE_PROCESS_THRESHOLD = 0
+        label = f"tune path, cold, {args.workers} procs"
+        results.append(timed(label, args.rows, lambda: tune_path(app, dataset_id, args.model, tokenizer), args.repeat))
+
+    for batch in results:
+        for datum_a, datum_b in zip(legacy, batch):
+            assert datum_a.loss_fn_inputs == datum_b.loss_fn_inputs, "outputs differ"
+            assert datum_a.model_input.to_ints() == datum_b.model_input.to_ints(), "outputs differ"
+    workdir.cleanup()
+
+
+if __name__ == "__main__":
+    main()